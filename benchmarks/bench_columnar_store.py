@@ -0,0 +1,122 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Benchmarks the memory and lookup times of `Store` against `ColumnarStore`.
+
+Usage:
+    $ python benchmarks/bench_columnar_store.py [--sizes 100000 1000000] [--lookups 1000]
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from proxyscrape.scrapers import country_codes  # noqa: E402
+from proxyscrape.shared import Proxy  # noqa: E402
+from proxyscrape.stores import ColumnarStore, Store, numpy  # noqa: E402
+
+COUNTRIES = sorted(country_codes.items())
+TYPES = ['http', 'https', 'socks4', 'socks5']
+SOURCES = ['anonymous-proxy', 'free-proxy-list', 'socks-proxy', 'ssl-proxy', 'uk-proxy', 'us-proxy']
+
+FILTERS = [
+    ('none', None),
+    ('code', {'code': {'us', }}),
+    ('code+type', {'code': {'us', 'ca', 'gb'}, 'type': {'https', }}),
+    ('code+type+anon', {'code': {'us', }, 'type': {'http', }, 'anonymous': {True, }}),
+]
+
+
+def generate_proxies(size, seed=0):
+    rand = random.Random(seed)
+    proxies = []
+    for _ in range(size):
+        code, country = rand.choice(COUNTRIES)
+        proxies.append(Proxy('%d.%d.%d.%d' % tuple(rand.randint(1, 254) for _ in range(4)),
+                             str(rand.choice((80, 1080, 3128, 8080, rand.randint(1024, 65535)))),
+                             code.lower(), country.lower(), rand.random() < 0.5, rand.choice(TYPES),
+                             rand.choice(SOURCES)))
+    return proxies
+
+
+def measure(cls, size, lookups):
+    gc.collect()
+
+    # Proxies are created while tracing, so the ones kept alive by `Store` count towards its memory
+    tracemalloc.start()
+    proxies = generate_proxies(size)
+    start = time.time()
+    store = cls()
+    store.update_store(store.add_store(), proxies)
+    build_time = time.time() - start
+    del proxies
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    results = []
+    for name, filter_opts in FILTERS:
+        start = time.time()
+        for _ in range(lookups):
+            store.get_proxy(filter_opts)
+        proxy_time = (time.time() - start) / lookups
+
+        start = time.time()
+        matched = len(store.get_proxies(filter_opts) or ())
+        proxies_time = time.time() - start
+
+        results.append((name, proxy_time, proxies_time, matched))
+
+    return current, build_time, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000], help='numbers of proxies')
+    parser.add_argument('--lookups', type=int, default=1000, help='number of get_proxy calls per filter')
+    args = parser.parse_args()
+
+    print('Columnar filtering uses {}'.format('NumPy' if numpy is not None else 'the array module'))
+    print('(build times are inflated by tracing allocations)')
+    print('{:>9} {:<14} {:>10} {:>10} {:<16} {:>16} {:>16} {:>9}'.format(
+        'proxies', 'store', 'MiB', 'build (s)', 'filter', 'get_proxy (us)', 'get_proxies (s)', 'matched'))
+
+    for size in args.sizes:
+        for cls in (Store, ColumnarStore):
+            current, build_time, results = measure(cls, size, args.lookups)
+
+            for name, proxy_time, proxies_time, matched in results:
+                print('{:>9,} {:<14} {:>10.1f} {:>10.2f} {:<16} {:>16.1f} {:>16.3f} {:>9,}'.format(
+                    size, cls.__name__, current / 2.0 ** 20, build_time, name, proxy_time * 1e6, proxies_time,
+                    matched))
+
+
+if __name__ == '__main__':
+    main()
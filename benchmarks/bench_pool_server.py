@@ -0,0 +1,162 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Benchmarks the round-trip latency and throughput of `get_proxy(...)` through a `PoolServer`.
+
+Usage:
+    $ python benchmarks/bench_pool_server.py [--clients 1 8 32 64] [--duration 3] [--size 10000] [--transports unix tcp]
+
+The server runs in its own process, as it would as a daemon, and each client in its own process with its own
+connection, retrieving proxies back to back for the duration. The time of `Collector.get_proxy(...)` called in process
+is given for comparison.
+"""
+
+from __future__ import print_function
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_columnar_store import FILTERS, generate_proxies  # noqa: E402
+from proxyscrape import add_resource, create_collector  # noqa: E402
+from proxyscrape.client import PoolClient  # noqa: E402
+from proxyscrape.server import PoolServer  # noqa: E402
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+
+def create_bench_collector(name, size):
+    proxies = set(generate_proxies(size))
+    add_resource(name, lambda: proxies, 'http')
+    collector = create_collector(name, resources=name)
+    collector.refresh_proxies()
+    return collector
+
+
+def serve(address, size, ready):
+    server = PoolServer(create_bench_collector('bench-server', size), address)
+    ready.set()
+    server.serve_forever()
+
+
+def run_client(address, filter_opts, duration, ready, start, results):
+    client = PoolClient(address)
+    client.get_proxy(filter_opts)
+    ready.put(None)
+    start.wait()
+
+    latencies = []
+    end = _timer() + duration
+    now = _timer()
+    while now < end:
+        client.get_proxy(filter_opts)
+        then, now = now, _timer()
+        latencies.append(now - then)
+
+    client.close()
+    results.put(latencies)
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def measure(address, clients, filter_opts, duration):
+    ready, start, results = multiprocessing.Queue(), multiprocessing.Event(), multiprocessing.Queue()
+    args = (address, filter_opts, duration, ready, start, results)
+    processes = [multiprocessing.Process(target=run_client, args=args) for _ in range(clients)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get()
+
+    start.set()
+    latencies = []
+    for _ in processes:
+        latencies.extend(results.get())
+    for process in processes:
+        process.join()
+
+    latencies.sort()
+    return len(latencies) / float(duration), percentile(latencies, 0.5), percentile(latencies, 0.99)
+
+
+def measure_in_process(collector, filter_opts, lookups=10000):
+    start = _timer()
+    for _ in range(lookups):
+        collector.get_proxy(filter_opts)
+    return (_timer() - start) / lookups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32, 64], help='numbers of concurrent clients')
+    parser.add_argument('--duration', type=float, default=3, help='seconds each client retrieves proxies for')
+    parser.add_argument('--size', type=int, default=10000, help='number of proxies served')
+    parser.add_argument('--transports', nargs='+', default=['unix', 'tcp'], choices=['unix', 'tcp'])
+    parser.add_argument('--filters', nargs='+', default=['none', 'code+type'], choices=[name for name, _ in FILTERS])
+    args = parser.parse_args()
+
+    filters = [(name, filter_opts) for name, filter_opts in FILTERS if name in args.filters]
+    directory = tempfile.mkdtemp()
+
+    try:
+        collector = create_bench_collector('bench-in-process', args.size)
+        for name, filter_opts in filters:
+            print('in process, filter {}: {:.1f} us per get_proxy'.format(
+                name, measure_in_process(collector, filter_opts) * 1e6))
+
+        print('{:<9} {:<16} {:>8} {:>12} {:>9} {:>9}'.format(
+            'transport', 'filter', 'clients', 'requests/s', 'p50 (us)', 'p99 (us)'))
+
+        for transport in args.transports:
+            if transport == 'unix':
+                address = os.path.join(directory, 'pool.sock')
+            else:
+                address = ('127.0.0.1', 8899)
+
+            ready = multiprocessing.Event()
+            server = multiprocessing.Process(target=serve, args=(address, args.size, ready))
+            server.start()
+            ready.wait()
+
+            try:
+                for name, filter_opts in filters:
+                    for clients in args.clients:
+                        throughput, p50, p99 = measure(address, clients, filter_opts, args.duration)
+                        print('{:<9} {:<16} {:>8} {:>12,.0f} {:>9.1f} {:>9.1f}'.format(
+                            transport, name, clients, throughput, p50 * 1e6, p99 * 1e6))
+            finally:
+                server.terminate()
+                server.join()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
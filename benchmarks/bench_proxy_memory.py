@@ -0,0 +1,116 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Benchmarks the memory used by proxies, comparing `Proxy` with the namedtuple it replaced.
+
+Fields are built as fresh strings for each proxy, as they are when parsed from a page. Memory is measured both after
+building the proxies and after accessing the (host, port) of each, as the blacklist, leases and strategies do.
+
+Usage:
+    $ python benchmarks/bench_proxy_memory.py [--sizes 100000 1000000]
+"""
+
+from __future__ import print_function
+
+import argparse
+from collections import namedtuple
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from proxyscrape.scrapers import country_codes  # noqa: E402
+from proxyscrape.shared import Proxy  # noqa: E402
+
+NamedTupleProxy = namedtuple('NamedTupleProxy', ['host', 'port', 'code', 'country', 'anonymous', 'type', 'source'])
+
+COUNTRIES = sorted(country_codes.items())
+TYPES = ['http', 'https', 'socks4', 'socks5']
+SOURCES = ['anonymous-proxy', 'free-proxy-list', 'socks-proxy', 'ssl-proxy', 'uk-proxy', 'us-proxy']
+
+
+def generate_rows(size, seed=0):
+    rand = random.Random(seed)
+    for _ in range(size):
+        code, country = rand.choice(COUNTRIES)
+        yield ('%d.%d.%d.%d' % tuple(rand.randint(1, 254) for _ in range(4)),
+               str(rand.choice((80, 1080, 3128, 8080, rand.randint(1024, 65535)))),
+               ''.join(code.lower()),
+               ''.join(country.lower()),
+               rand.random() < 0.5,
+               ''.join(rand.choice(TYPES)),
+               ''.join(rand.choice(SOURCES)))
+
+
+def measure(cls, size):
+    gc.collect()
+
+    # Fields are allocated while tracing, so strings kept alive by the records count towards their memory
+    tracemalloc.start()
+    start = time.time()
+    proxies = set(cls(*row) for row in generate_rows(size))
+    elapsed = time.time() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+
+    for proxy in proxies:
+        proxy[0], proxy[1]
+    gc.collect()
+    accessed, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.time()
+    for proxy in proxies:
+        hash(proxy)
+    hash_time = time.time() - start
+
+    start = time.time()
+    for proxy in proxies:
+        proxy[0], proxy[1]
+    access_time = time.time() - start
+
+    return current, accessed, elapsed, hash_time, access_time, len(proxies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000], help='numbers of proxies')
+    args = parser.parse_args()
+
+    print('{:>9} {:<16} {:>8} {:>12} {:>15} {:>10} {:>9} {:>11}'.format(
+        'proxies', 'record', 'MiB', 'bytes/proxy', 'after access', 'build (s)', 'hash (s)', 'access (s)'))
+    print('(build times include generating the fields, and are inflated by tracing allocations)')
+
+    for size in args.sizes:
+        for cls in (NamedTupleProxy, Proxy):
+            current, accessed, elapsed, hash_time, access_time, count = measure(cls, size)
+            print('{:>9,} {:<16} {:>8.1f} {:>12.0f} {:>15.0f} {:>10.2f} {:>9.3f} {:>11.3f}'.format(
+                size, cls.__name__, current / 2.0 ** 20, current / float(count), accessed / float(count), elapsed,
+                hash_time, access_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Benchmarks the memory, update, and lookup times of `Store` against `SQLiteStore`.
+
+Usage:
+    $ python benchmarks/bench_sqlite_store.py [--sizes 10000 1000000 5000000] [--lookups 1000] [--path proxies.db]
+
+Memory is that of the Python heap, so excludes SQLite's page cache (a few MiB by default), which is why the size of the
+database on disk is given as well.
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_columnar_store import FILTERS, generate_proxies  # noqa: E402
+from proxyscrape.stores import SQLiteStore, Store  # noqa: E402
+
+
+def create_store(cls, path):
+    return cls(path) if cls is SQLiteStore and path else cls()
+
+
+def measure(cls, size, lookups, path):
+    gc.collect()
+
+    # Proxies are created while tracing, so the ones kept alive by `Store` count towards its memory
+    tracemalloc.start()
+    proxies = generate_proxies(size)
+    removed = random.Random(0).sample(proxies, 100)
+    start = time.time()
+    store = create_store(cls, path)
+    id = store.add_store()
+    store.update_store(id, proxies)
+    update_time = time.time() - start
+    del proxies
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    disk_size = 0
+    if cls is SQLiteStore:
+        disk_size = sum(os.path.getsize(store.path + suffix) for suffix in ('', '-wal')
+                        if os.path.exists(store.path + suffix))
+
+    results = []
+    for name, filter_opts in FILTERS:
+        start = time.time()
+        for _ in range(lookups):
+            store.get_proxy(filter_opts)
+        results.append((name, (time.time() - start) / lookups))
+
+    start = time.time()
+    store.remove_proxies(id, removed)
+    remove_time = time.time() - start
+
+    if cls is SQLiteStore:
+        store.close()
+
+    return current, disk_size, update_time, remove_time, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 1000000, 5000000], help='numbers of proxies')
+    parser.add_argument('--lookups', type=int, default=1000, help='number of get_proxy calls per filter')
+    parser.add_argument('--path', help='path of the database (defaults to a temporary file)')
+    args = parser.parse_args()
+
+    print('(update times are inflated by tracing allocations)')
+    print('{:>9} {:<12} {:>10} {:>10} {:>11} {:>11} {:<16} {:>15}'.format(
+        'proxies', 'store', 'heap MiB', 'disk MiB', 'update (s)', 'remove (ms)', 'filter', 'get_proxy (us)'))
+
+    for size in args.sizes:
+        for cls in (Store, SQLiteStore):
+            current, disk_size, update_time, remove_time, results = measure(cls, size, args.lookups, args.path)
+
+            for name, proxy_time in results:
+                print('{:>9,} {:<12} {:>10.1f} {:>10.1f} {:>11.2f} {:>11.1f} {:<16} {:>15.1f}'.format(
+                    size, cls.__name__, current / 2.0 ** 20, disk_size / 2.0 ** 20, update_time, remove_time * 1e3,
+                    name, proxy_time * 1e6))
+
+
+if __name__ == '__main__':
+    main()
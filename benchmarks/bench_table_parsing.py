@@ -0,0 +1,94 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Benchmarks parsing proxy tables with the streaming parser and with BeautifulSoup.
+
+The saved fixture pages only hold a few rows, so their rows are repeated to build pages of realistic size.
+
+Usage:
+    $ python benchmarks/bench_table_parsing.py [--rows 300] [--repeat 20]
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from proxyscrape.parsers import parse_table_rows  # noqa: E402
+
+MOCK_PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests', 'mock_pages')
+FIXTURES = ['anonymous-proxy.html', 'free-proxy-list-proxy.html', 'socks-proxy.html', 'ssl-proxy.html',
+            'uk-proxy.html', 'us-proxy.html']
+
+
+def build_page(fixture, rows):
+    with open(os.path.join(MOCK_PAGES, fixture), 'r') as f:
+        page = f.read()
+
+    body = re.search(r'<tbody>(.*)</tbody>', page, re.S)
+    fixture_rows = re.findall(r'<tr>.*?</tr>', body.group(1), re.S)
+    repeated = ''.join(fixture_rows[i % len(fixture_rows)] for i in range(rows))
+
+    # Trailing content after the table, as found on the actual sites
+    trailer = '<div>' + '<p>footer</p>' * rows + '</div>'
+    return (page[:body.start(1)] + repeated + page[body.end(1):]).replace('</body>', trailer + '</body>')
+
+
+def parse_streaming(page):
+    return parse_table_rows(page, 'proxylisttable')
+
+
+def parse_soup(page):
+    soup = BeautifulSoup(page, 'html.parser')
+    table = soup.find('table', {'id': 'proxylisttable'})
+    return [[cell.text for cell in row.find_all('td')] for row in table.find('tbody').find_all('tr')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=300, help='rows per page (default: 300)')
+    parser.add_argument('--repeat', type=int, default=20, help='parses per page and parser (default: 20)')
+    args = parser.parse_args()
+
+    print('{:<28} {:>16} {:>16} {:>8}'.format('page', 'streaming rows/s', 'soup rows/s', 'speedup'))
+
+    for fixture in FIXTURES:
+        page = build_page(fixture, args.rows)
+        assert parse_streaming(page) == parse_soup(page)
+
+        streaming = timeit.timeit(lambda: parse_streaming(page), number=args.repeat)
+        soup = timeit.timeit(lambda: parse_soup(page), number=args.repeat)
+        total_rows = args.rows * args.repeat
+
+        print('{:<28} {:>16,.0f} {:>16,.0f} {:>7.1f}x'.format(
+            fixture, total_rows / streaming, total_rows / soup, soup / streaming))
+
+
+if __name__ == '__main__':
+    main()
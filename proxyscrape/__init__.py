@@ -35,6 +35,9 @@ The main library components are:
 This exports:
     - add_resource(...) adds a new resource to be scraped
     - add_resource_type(...) adds a new resource type
+    - add_table_resource(...) adds a new resource scraping proxies from a table on a web page
+    - configure_session(...) configures the pooled session used to request proxy lists
+    - create_async_collector(...) creates a new collector retrieving proxies from asyncio coroutines (Python 3.5+)
     - create_collector(...) create a new collector to scrape resources
     - get_collector(...) retrieves a created collector
     - get_resource_type(...) retrieves all defined resource types
@@ -43,6 +46,8 @@ This exports:
 
 from __future__ import absolute_import
 
+import sys
+
 from .errors import (
     ProxyScrapeBaseException,
     CollectorAlreadyDefinedError,
@@ -51,6 +56,9 @@ from .errors import (
     InvalidHTMLError,
     InvalidResourceError,
     InvalidResourceTypeError,
+    InvalidStoreError,
+    InvalidStrategyError,
+    PoolServerError,
     RequestNotOKError,
     ResourceAlreadyDefinedError,
     ResourceTypeAlreadyDefinedError
@@ -63,7 +71,18 @@ from .proxyscrape import (
 from .scrapers import (
     add_resource,
     add_resource_type,
+    add_table_resource,
     get_resource_types,
-    get_resources
+    get_resources,
+    TableSpec
+)
+from .shared import (
+    configure_session,
+    Proxy
 )
-from .shared import Proxy
+
+if sys.version_info >= (3, 5):
+    from .aio import (
+        AsyncCollector,
+        create_async_collector
+    )
@@ -0,0 +1,175 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Asynchronous collectors for asyncio applications (Python 3.5+)."""
+
+__all__ = ['AsyncCollector', 'create_async_collector']
+
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+import weakref
+
+from .proxyscrape import _MAX_REFRESH_WORKERS, _add_collector, _RefreshBatch, Collector
+
+
+def _get_loop():
+    get_running_loop = getattr(asyncio, 'get_running_loop', None)
+    return get_running_loop() if get_running_loop is not None else asyncio.get_event_loop()
+
+
+def create_async_collector(name, resource_types=None, refresh_interval=3600, resources=None, elite=False,
+                           external_url=None, **kwargs):
+    """Creates a new asynchronous collector to scrape and retrieve proxies from coroutines.
+
+    Takes the same arguments as `create_collector(...)`, and the collector can likewise be retrieved later on via
+    `proxyscrape.get_collector(...)`.
+
+    :param name:
+        An identifier for the collector.
+    :param resource_types:
+        (optional) The resource types to to scrape. Can either be a single or sequence of resource types. Either
+        `resource_types` or `resources` should be defined (but not necessarily both).
+    :param refresh_interval:
+        The amount of time (in seconds) between refreshing the resources.
+    :param resources:
+        (optional) The resources to scrape. Can either be a single or sequence of resources. Either `resource_types` or
+        `resources` should be defined (but not necessarily both).
+    :type name: string
+    :type resource_types: iterable or string or None
+    :type refresh_interval: int
+    :type resources: iterable or string or None
+    :return:
+        The initialized collector.
+    :rtype: AsyncCollector
+    :raises CollectorAlreadyDefinedError:
+        If `name` is already a defined collector.
+    """
+    create = partial(AsyncCollector, resource_types, refresh_interval, resources, elite, external_url, **kwargs)
+    return _add_collector(name, create)
+
+
+class AsyncCollector(Collector):
+    """A proxy collector for retrieving proxies from coroutines without blocking the event loop.
+
+    Resources are refreshed (i.e. requested and parsed) in a pool of threads, while the awaiting coroutines yield to
+    the event loop. Coroutines needing the same resource refreshed await a single refresh of it. Proxies are kept in the
+    same store as the synchronous methods, which remain available.
+
+    Takes the same arguments as `Collector`.
+    """
+    def __init__(self, *args, **kwargs):
+        super(AsyncCollector, self).__init__(*args, **kwargs)
+
+        # Executor refreshing resources, created on first use
+        self._refresh_executor = None
+        self._refresh_executor_lock = Lock()
+        # Maps each event loop to the futures of the refreshes in progress, keyed by resource name and forcing
+        self._refresh_futures = weakref.WeakKeyDictionary()
+
+    def _get_refresh_executor(self):
+        # Event loops on different threads may share the collector, so the executor is created under a lock
+        if self._refresh_executor is None:
+            with self._refresh_executor_lock:
+                if self._refresh_executor is None:
+                    workers = self.refresh_workers or min(max(len(self._resource_map), 1), _MAX_REFRESH_WORKERS)
+                    self._refresh_executor = ThreadPoolExecutor(workers)
+
+        return self._refresh_executor
+
+    async def _arefresh_resources(self, force, filter_opts=None):
+        resources = self._get_refreshed_resources(force, filter_opts)
+
+        if not resources:
+            return
+
+        loop = _get_loop()
+        futures = self._refresh_futures.setdefault(loop, {})
+
+        started = [(name, resource) for name, resource in resources if (name, force) not in futures]
+        batch = _RefreshBatch(len(started), self._save_refreshed_proxies)
+
+        for name, resource in started:
+            key = (name, force)
+            future = loop.run_in_executor(self._get_refresh_executor(), self._refresh_batched_resource, resource,
+                                          force, batch)
+            future.add_done_callback(lambda _, key=key: futures.pop(key, None))
+            futures[key] = future
+
+        awaited = [futures[(name, force)] for name, _ in resources]
+
+        # Refreshes still in progress past the timeout are left to finish, as are those whose awaiting coroutine is
+        # cancelled (waiting doesn't cancel them)
+        done, _ = await asyncio.wait(awaited, timeout=self.refresh_timeout)
+
+        for future in done:
+            future.result()
+
+    async def aget_proxy(self, filter_opts=None, key=None):
+        """Retrieves a single proxy, as with `get_proxy(...)`, without blocking the event loop on refreshes.
+
+        :param filter_opts:
+            (optional) Options to filter proxies retrieved by collector.
+        :param key:
+            (optional) The key to retrieve the assigned proxy of, such as a session or account identifier.
+        :type filter_opts: dict or None
+        :type key: hashable or None
+        :return:
+            The retrieved proxy or None if no proxy found.
+        :rtype: Proxy or None
+        :raises InvalidFilterOptionError:
+            If `filter_opts` is not a dictionary or defines an invalid filter.
+        """
+        combined_filter_opts = self._compile_filter(filter_opts)
+
+        await self._arefresh_resources(False, combined_filter_opts)
+        return self._select_proxy(combined_filter_opts, key)
+
+    async def aget_proxies(self, filter_opts=None):
+        """Retrieves proxies, as with `get_proxies(...)`, without blocking the event loop on refreshes.
+
+        :param filter_opts:
+            (optional) Options to filter proxies retrieved by collector.
+        :type filter_opts: dict or None
+        :return:
+            The retrieved proxies or None if no proxy found.
+        :rtype: tuple of Proxy or None
+        :raises InvalidFilterOptionError:
+            If `filter_opts` is not a dictionary or defines an invalid filter.
+        """
+        combined_filter_opts = self._compile_filter(filter_opts)
+
+        await self._arefresh_resources(False, combined_filter_opts)
+        return self._retrieve_proxies(combined_filter_opts)
+
+    async def arefresh_proxies(self, force=True):
+        """Refreshes the proxies, as with `refresh_proxies(...)`, without blocking the event loop.
+
+        :param force:
+            Whether to force a refresh. If True, a refresh is always performed; otherwise it is only done if a refresh
+            hasn't occurred within the collector's `refresh_interval`. Defaults to True.
+        :type force: bool
+        """
+        await self._arefresh_resources(force)
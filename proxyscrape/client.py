@@ -0,0 +1,321 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""A client retrieving proxies from a pool server, mirroring the API of `Collector`."""
+
+__all__ = ['PoolClient']
+
+
+import socket
+from threading import Lock, local
+
+from . import errors
+from .errors import PoolServerError, ProxyScrapeBaseException
+from .server import _OK, _decode, _encode, _frame, _read_frame
+from .shared import Proxy, is_iterable
+
+
+# Built-in errors raised by the collector methods, which are raised again by the client
+_BUILTIN_ERRORS = {
+    'KeyError': KeyError,
+    'TypeError': TypeError,
+    'ValueError': ValueError
+}
+
+
+def _get_error(name):
+    error = getattr(errors, name, None)
+
+    if isinstance(error, type) and issubclass(error, ProxyScrapeBaseException):
+        return error
+    return _BUILTIN_ERRORS.get(name, PoolServerError)
+
+
+def _encode_addresses(proxies):
+    if proxies is None:
+        return None
+    if not is_iterable(proxies):
+        proxies = (proxies, )
+    return [(p[0], p[1]) for p in proxies]
+
+
+def _decode_proxy(fields):
+    return None if fields is None else Proxy(*fields)
+
+
+class _Connection:
+    """A connection to a pool server, sending a request and reading its response at a time."""
+    def __init__(self, address, timeout):
+        if isinstance(address, str):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            try:
+                self._socket.connect(address)
+            except socket.error:
+                self._socket.close()
+                raise
+        else:
+            self._socket = socket.create_connection(tuple(address), timeout)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        self._file = self._socket.makefile('rb')
+
+    def call(self, request):
+        self._socket.sendall(_frame(request))
+        response = _read_frame(self._file.read)
+
+        if response is None:
+            raise PoolServerError('The connection was closed by the pool server')
+
+        return response
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+
+class PoolClient:
+    """A client of a pool server, retrieving proxies from the server's collector.
+
+    The methods are those of `Collector` (except for leases and snapshots), called on the collector of the server, so
+    the filter, blacklist and health state are shared by every client. Proxies given to the methods only need their
+    host and port, except for `remove_proxy(...)`, which needs every field. Keys given to `get_proxy(...)` should be
+    strings or numbers.
+
+    Each thread uses its own connection, opened on its first call and kept open for later ones. A call whose connection
+    fails raises the error, and the next one opens a new connection.
+
+    :param address:
+        The address of the server, either the path of a UNIX socket or a (host, port) combination of a TCP socket.
+    :param timeout:
+        (optional) The maximum amount of time (in seconds) to wait on connecting, sending a request or receiving its
+        response. Defaults to None (no limit).
+    :type address: string or tuple
+    :type timeout: float or None
+    """
+    def __init__(self, address, timeout=None):
+        self.address = address
+        self.timeout = timeout
+
+        self._local = local()
+        self._connections = set()
+        self._connections_lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _call(self, method, *args):
+        connection = getattr(self._local, 'connection', None)
+
+        # Connections closed by `close()` are replaced
+        if connection is None or connection not in self._connections:
+            connection = self._local.connection = _Connection(self.address, self.timeout)
+            with self._connections_lock:
+                self._connections.add(connection)
+
+        try:
+            response = _decode(connection.call(_encode([method, args])))
+        except Exception:
+            self._close_connection(connection)
+            raise
+
+        if response[0] == _OK:
+            return response[1]
+
+        raise _get_error(response[1])(response[2])
+
+    def _close_connection(self, connection):
+        with self._connections_lock:
+            self._connections.discard(connection)
+        connection.close()
+
+    def available_at(self, filter_opts=None):
+        """Retrieves the earliest time at which `get_proxy(...)` can retrieve a proxy, given the rate limit.
+
+        :param filter_opts:
+            (optional) Options to filter proxies retrieved by collector.
+        :type filter_opts: dict or None
+        :return:
+            The time (as given by `time.time()` on the server), or None if no proxy found.
+        :rtype: float or None
+        :raises InvalidFilterOptionError:
+            If `filter_opts` is not a dictionary or defines an invalid filter.
+        """
+        return self._call('available_at', filter_opts)
+
+    def apply_filter(self, filter_opts):
+        """Applies a filter to the collector for retrieving proxies matching specific criteria.
+
+        :param filter_opts:
+            Options to filter proxies retrieved by the collector.
+        :type filter_opts: dict
+        :raises InvalidFilterOptionError:
+            If `filter_opts` is not a dictionary or defines an invalid filter.
+        """
+        self._call('apply_filter', filter_opts)
+
+    def blacklist_proxy(self, proxies=None, host=None, port=None):
+        """Blacklists a specific a proxy from being retrieved.
+
+        Either a single or sequence of proxies should be given, or a host and port number combination.
+
+        :param proxies:
+            (optional) A single or sequence of proxies to blacklist.
+        :param host:
+            (optional) The host IP of the proxy.
+        :param port:
+            (optional) The port number of the proxy.
+        :type proxies: Proxy or iterable or None
+        :type host: str or None
+        :type port: str or None
+        :raises ValueError:
+            If neither proxies nor host and port are given.
+        """
+        self._call('blacklist_proxy', _encode_addresses(proxies), host, port)
+
+    def clear_blacklist(self):
+        """Clears the blacklist."""
+        self._call('clear_blacklist')
+
+    def clear_filter(self):
+        """Clears the filter."""
+        self._call('clear_filter')
+
+    def close(self):
+        """Closes the connections of every thread."""
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+
+        for connection in connections:
+            connection.close()
+
+    def get_proxy(self, filter_opts=None, key=None):
+        """Retrieves a single proxy.
+
+        :param filter_opts:
+            (optional) Options to filter proxies retrieved by collector.
+        :param key:
+            (optional) The key to retrieve the assigned proxy of, such as a session or account identifier.
+        :type filter_opts: dict or None
+        :type key: string or int or None
+        :return:
+            The retrieved proxy or None if no proxy found.
+        :rtype: Proxy or None
+        :raises InvalidFilterOptionError:
+            If `filter_opts` is not a dictionary or defines an invalid filter.
+        """
+        return _decode_proxy(self._call('get_proxy', filter_opts, key))
+
+    def get_proxies(self, filter_opts=None):
+        """Retrieves proxies.
+
+        :param filter_opts:
+            (optional) Options to filter proxies retrieved by collector.
+        :type filter_opts: dict or None
+        :return:
+            The retrieved proxies or None if no proxy found.
+        :rtype: tuple of Proxy or None
+        :raises InvalidFilterOptionError:
+            If `filter_opts` is not a dictionary or defines an invalid filter.
+        """
+        proxies = self._call('get_proxies', filter_opts)
+        return None if proxies is None else tuple(Proxy(*fields) for fields in proxies)
+
+    def get_resource_states(self):
+        """Retrieves the circuit breaker state of each resource.
+
+        :return:
+            The state of each resource, keyed by resource name.
+        :rtype: dict
+        """
+        return self._call('get_resource_states')
+
+    def refresh_proxies(self, force=True):
+        """Refreshes the proxies.
+
+        :param force:
+            Whether to force a refresh. If True, a refresh is always performed; otherwise it is only done if a refresh
+            hasn't occurred within the collector's `refresh_interval`. Defaults to True.
+        :type force: bool
+        """
+        self._call('refresh_proxies', force)
+
+    def remove_blacklist(self, proxies=None, host=None, port=None):
+        """Removes proxies from the blacklist.
+
+        Either a single or sequence of proxies should be given, or a host and port number combination.
+
+        :param proxies:
+            (optional) A single or sequence of proxies to blacklist.
+        :param host:
+            (optional) The host IP of the proxy.
+        :param port:
+            (optional) The port number of the proxy.
+        :type proxies: Proxy or iterable or None
+        :type host: str or None
+        :type port: str or None
+        :raises ValueError:
+            If neither proxies nor host and port are given.
+        """
+        self._call('remove_blacklist', _encode_addresses(proxies), host, port)
+
+    def remove_proxy(self, proxies):
+        """Removes a proxy from the internal store of the collector.
+
+        :param proxies:
+            A single or sequence of proxies to remove from the internal store.
+        :type proxies: Proxy or iterable
+        :raises InvalidResourceTypeError:
+            If any of the proxies specified have an invalid source (i.e. resource type).
+        """
+        if proxies is None:
+            return
+
+        if not is_iterable(proxies):
+            proxies = (proxies, )
+
+        self._call('remove_proxy', [list(p) for p in proxies])
+
+    def report_failure(self, proxy):
+        """Reports a failed request through a proxy, lowering its health.
+
+        :param proxy:
+            The proxy.
+        :type proxy: Proxy
+        """
+        self._call('report_failure', (proxy[0], proxy[1]))
+
+    def report_success(self, proxy, latency=None):
+        """Reports a successful request through a proxy, raising its health.
+
+        :param proxy:
+            The proxy.
+        :param latency:
+            (optional) The time (in seconds) the request took. Slower proxies are less healthy.
+        :type proxy: Proxy
+        :type latency: float or None
+        """
+        self._call('report_success', (proxy[0], proxy[1]), latency)
@@ -49,6 +49,18 @@ class InvalidResourceTypeError(ProxyScrapeBaseException):
     """Invalid Resource Type Error."""
 
 
+class InvalidStoreError(ProxyScrapeBaseException):
+    """Invalid Store Error."""
+
+
+class InvalidStrategyError(ProxyScrapeBaseException):
+    """Invalid Strategy Error."""
+
+
+class PoolServerError(ProxyScrapeBaseException):
+    """Pool Server Error."""
+
+
 class RequestNotOKError(ProxyScrapeBaseException):
     """Request Not OK Error."""
 
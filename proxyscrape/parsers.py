@@ -0,0 +1,152 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+__all__ = ['parse_table_rows']
+
+
+try:
+    from html.parser import HTMLParser
+except ImportError:  # Python 2
+    from HTMLParser import HTMLParser
+
+
+class _TableEnd(Exception):
+    """Raised to stop parsing once the body of the table has been read."""
+
+
+class _TableParser(HTMLParser):
+    """Collects the text of each cell in the body of the table with the given id.
+
+    Tables nested within the target table are skipped over, and parsing is stopped as soon as the body of the target
+    table is closed.
+    """
+    def __init__(self, table_id):
+        HTMLParser.__init__(self)
+        self._table_id = table_id
+
+        # Nesting depth of tables within the target table (0 if outside of it)
+        self._depth = 0
+        self._in_body = False
+        self._row = None
+        self._cell = None
+
+        self.found_body = False
+        self.rows = []
+
+    def _end_cell(self):
+        if self._cell is not None:
+            self._row.append(''.join(self._cell))
+            self._cell = None
+
+    def _end_row(self):
+        if self._row is not None:
+            self._end_cell()
+            self.rows.append(self._row)
+            self._row = None
+
+    def handle_starttag(self, tag, attrs):
+        if not self._depth:
+            if tag == 'table' and dict(attrs).get('id') == self._table_id:
+                self._depth = 1
+            return
+
+        if tag == 'table':
+            self._depth += 1
+        elif self._depth > 1:
+            return
+        elif tag == 'tbody':
+            self._in_body = self.found_body = True
+        elif not self._in_body:
+            return
+        elif tag == 'tr':
+            self._end_row()
+            self._row = []
+        elif tag in ('td', 'th') and self._row is not None:
+            self._end_cell()
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if not self._depth:
+            return
+
+        if tag == 'table':
+            self._depth -= 1
+            if not self._depth:
+                self._end_row()
+                raise _TableEnd()
+        elif self._depth > 1 or not self._in_body:
+            return
+        elif tag in ('td', 'th'):
+            self._end_cell()
+        elif tag == 'tr':
+            self._end_row()
+        elif tag == 'tbody':
+            self._end_row()
+            raise _TableEnd()
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    # Python 2 doesn't convert character references into data
+    def handle_entityref(self, name):
+        self.handle_data(self.unescape('&%s;' % name))
+
+    def handle_charref(self, name):
+        self.handle_data(self.unescape('&#%s;' % name))
+
+
+def parse_table_rows(content, table_id):
+    """Parses the rows in the body of a table.
+
+    The page is parsed as a stream of events, with no document tree being built, and parsing stops once the body of
+    the table is closed.
+
+    :param content:
+        The page, either as bytes, a string, or a file-like object.
+    :param table_id:
+        The id of the table.
+    :type content: bytes or string or file
+    :type table_id: string
+    :return:
+        The text of each cell for every row in the body of the table, or None if the table (or its body) isn't found.
+    :rtype: list or None
+    """
+    if hasattr(content, 'read'):
+        content = content.read()
+
+    if isinstance(content, bytes) and not isinstance(content, str):
+        content = content.decode('utf-8', 'replace')
+
+    parser = _TableParser(table_id)
+
+    try:
+        parser.feed(content)
+        parser.close()
+    except _TableEnd:
+        pass
+
+    if not parser.found_body:
+        return None
+
+    return parser.rows
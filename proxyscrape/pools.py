@@ -0,0 +1,361 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Pools of proxies shared between processes through memory-mapped files.
+
+A single process (the refresher) publishes its proxies with a `PoolPublisher`, and collectors of other processes read
+them through a `SharedPoolStore`, without copying them or requesting any resource themselves.
+
+A pool is made up of a header file holding the version of the latest pool, and a segment file per version holding the
+pool as packed records. Publishing writes the segment of the next version before bumping the version in the header,
+which readers check with a read of the mapped header whenever they match proxies. The segment of the previous version
+is then removed, though readers that mapped it keep reading it until they move on to the new version. Placing the pool
+under a memory-backed file system (such as /dev/shm) keeps it entirely in shared memory.
+"""
+
+import io
+import json
+import mmap
+import os
+import struct
+from threading import Lock
+import uuid
+
+from .shared import Proxy, _intern, _pack_address, _write_atomically
+from .stores import Store, _IndexedSet, _Partitions
+
+
+# The header of a pool: its magic and the version of the latest segment
+_HEADER = struct.Struct('=8sQ')
+_HEADER_MAGIC = b'PXPOOLHD'
+
+# The header of a segment: its magic, the number of records, and the offset and size of its table (a JSON encoding of
+# the distinct fields, irregular addresses, and partitions of the records). The header is followed by the packed
+# addresses of the records, then by the indexes of their fields.
+_SEGMENT_HEADER = struct.Struct('=8sQQQ')
+_SEGMENT_MAGIC = b'PXPOOL01'
+_ADDRESS = struct.Struct('=Q')
+_FIELDS = struct.Struct('=I')
+
+# Flags an address as the index of an irregular (host, port), i.e. which can't be packed
+_IRREGULAR = 1 << 63
+
+# Number of records packed at a time when encoding a segment
+_PACK_CHUNK_SIZE = 65536
+
+
+def _segment_path(path, version):
+    return '{}.{}'.format(path, version)
+
+
+def _pack(struct_format, values):
+    for start in range(0, len(values), _PACK_CHUNK_SIZE):
+        chunk = values[start:start + _PACK_CHUNK_SIZE]
+        yield struct.pack('={}{}'.format(len(chunk), struct_format), *chunk)
+
+
+def _encode_segment(proxies):
+    # Returns the chunks of a segment holding the proxies, with the records of each partition sorted by address
+    fields_indexes = {}
+    irregular = []
+    partitions = {}
+
+    for proxy in set(proxies):
+        address = getattr(proxy, '_address', None)
+        if address is None:
+            address = _pack_address(proxy[0], proxy[1])
+
+        if isinstance(address, tuple):
+            irregular.append(list(address))
+            address = _IRREGULAR | (len(irregular) - 1)
+
+        fields = tuple(proxy)[2:]
+        index = fields_indexes.setdefault(fields, len(fields_indexes))
+        partitions.setdefault(_Partitions._key(proxy), []).append((address, index))
+
+    addresses = []
+    indexes = []
+    table_partitions = []
+    for key, records in partitions.items():
+        records.sort()
+        table_partitions.append([list(key), len(addresses), len(addresses) + len(records)])
+        addresses.extend(address for address, _ in records)
+        indexes.extend(index for _, index in records)
+
+    table = json.dumps({
+        'fields': [list(fields) for fields in sorted(fields_indexes, key=fields_indexes.get)],
+        'irregular': irregular,
+        'partitions': table_partitions
+    }, separators=(',', ':')).encode('utf-8')
+
+    table_offset = _SEGMENT_HEADER.size + (_ADDRESS.size + _FIELDS.size) * len(addresses)
+    yield _SEGMENT_HEADER.pack(_SEGMENT_MAGIC, len(addresses), table_offset, len(table))
+
+    for chunk in _pack('Q', addresses):
+        yield chunk
+    for chunk in _pack('I', indexes):
+        yield chunk
+
+    yield table
+
+
+def _map(path, length=0):
+    with io.open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ)
+
+
+class _Segment:
+    """A published pool of proxies, mapped into memory."""
+    def __init__(self, path):
+        self._buffer = buffer = _map(path)
+        magic, self.size, table_offset, table_size = _SEGMENT_HEADER.unpack_from(buffer, 0)
+
+        if magic != _SEGMENT_MAGIC or len(buffer) != table_offset + table_size:
+            raise ValueError('{} is not a segment of a pool'.format(path))
+
+        self._indexes_offset = _SEGMENT_HEADER.size + _ADDRESS.size * self.size
+
+        table = json.loads(buffer[table_offset:table_offset + table_size].decode('utf-8'))
+        self.fields = [tuple(_intern(value) for value in fields) for fields in table['fields']]
+        self.irregular = [tuple(address) for address in table['irregular']]
+        self.irregular_addresses = {address: _IRREGULAR | index for index, address in enumerate(self.irregular)}
+        self.partitions = [(tuple(key), start, end) for key, start, end in table['partitions']]
+
+    def address(self, index):
+        return _ADDRESS.unpack_from(self._buffer, _SEGMENT_HEADER.size + _ADDRESS.size * index)[0]
+
+    def proxy(self, index):
+        address = self.address(index)
+        fields = self.fields[_FIELDS.unpack_from(self._buffer, self._indexes_offset + _FIELDS.size * index)[0]]
+
+        if address & _IRREGULAR:
+            return Proxy(*(self.irregular[address & ~_IRREGULAR] + fields))
+        return Proxy._from_address(address, *fields)
+
+
+class _Records:
+    """A partition of proxies read from the records `start` to `end - 1` of a segment, which are sorted by address."""
+    __slots__ = ('_segment', '_start', '_end')
+
+    def __init__(self, segment, start, end):
+        self._segment = segment
+        self._start = start
+        self._end = end
+
+    def __contains__(self, proxy):
+        address = getattr(proxy, '_address', None)
+        if address is None:
+            address = _pack_address(proxy[0], proxy[1])
+
+        if isinstance(address, tuple):
+            address = self._segment.irregular_addresses.get(address)
+            if address is None:
+                return False
+
+        # Bisects the addresses for the first record of the proxy's address, after which any other records of the
+        # address (i.e. of other sources) follow
+        low, high = self._start, self._end
+        while low < high:
+            middle = (low + high) // 2
+            if self._segment.address(middle) < address:
+                low = middle + 1
+            else:
+                high = middle
+
+        while low < self._end and self._segment.address(low) == address:
+            if self._segment.proxy(low) == proxy:
+                return True
+            low += 1
+
+        return False
+
+    def __getitem__(self, index):
+        return self._segment.proxy(self._start + index)
+
+    def __iter__(self):
+        return (self._segment.proxy(index) for index in range(self._start, self._end))
+
+    def __len__(self):
+        return self._end - self._start
+
+    def copy(self):
+        # Removing proxies copies the partition into memory, as segments are read-only
+        copy = _IndexedSet()
+        for proxy in self:
+            copy.add(proxy)
+        return copy
+
+
+class PoolPublisher:
+    """Publishes pools of proxies for the collectors of other processes to read via a `SharedPoolStore`.
+
+    A single process should publish to a given path. Versions continue from the last pool published to it.
+
+    :param path:
+        The path of the pool's header, next to which the segments of the pool are written.
+    :type path: string
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = Lock()
+        self._header = None
+
+    def _map_header(self):
+        # Maps the existing header to update it in place, so readers that mapped it see new versions, creating it first
+        # if there's no valid header
+        try:
+            with io.open(self.path, 'rb') as f:
+                header = f.read(_HEADER.size)
+        except (IOError, OSError):
+            header = b''
+
+        if len(header) != _HEADER.size or _HEADER.unpack(header)[0] != _HEADER_MAGIC:
+            _write_atomically(self.path, [_HEADER.pack(_HEADER_MAGIC, 0)])
+
+        with io.open(self.path, 'r+b') as f:
+            return mmap.mmap(f.fileno(), _HEADER.size)
+
+    def publish(self, proxies):
+        """Publishes a pool of proxies, replacing the previous one.
+
+        :param proxies:
+            The proxies of the pool.
+        :type proxies: iterable
+        :return:
+            The version of the published pool.
+        :rtype: int
+        :raises IOError:
+            If the pool couldn't be written.
+        """
+        with self._lock:
+            if self._header is None:
+                self._header = self._map_header()
+
+            version = _HEADER.unpack_from(self._header, 0)[1] + 1
+            _write_atomically(_segment_path(self.path, version), _encode_segment(proxies))
+            _HEADER.pack_into(self._header, 0, _HEADER_MAGIC, version)
+
+            try:
+                os.remove(_segment_path(self.path, version - 1))
+            except OSError:
+                pass
+
+            return version
+
+
+class SharedPoolStore(Store):
+    """An internal store reading the pool of proxies published by another process's `PoolPublisher`.
+
+    Proxies are read straight from the mapped segment of the latest pool, which is checked for whenever proxies are
+    matched. Every store added shares the pool, and proxies removed from it are only removed from this process's view
+    of the pool until a new one is published. Updating a store does nothing, as pools are only updated by their
+    publisher.
+
+    :param path:
+        The path of the pool's header.
+    :type path: string
+    """
+    def __init__(self, path):
+        Store.__init__(self)
+        self.path = path
+        self._header = None
+        self._pool_id = uuid.uuid4()
+        self._pool_version = None
+        self._stores = {self._pool_id: _Partitions()}
+
+    def _sync(self):
+        # Maps the latest pool if a new one was published
+        header = self._header
+        if header is None:
+            try:
+                header = self._header = _map(self.path, _HEADER.size)
+            except (IOError, OSError, ValueError):
+                # Not published yet
+                return
+
+        magic, version = _HEADER.unpack_from(header, 0)
+        if version == self._pool_version or magic != _HEADER_MAGIC:
+            return
+
+        with self._lock:
+            if version == self._pool_version:
+                return
+
+            try:
+                segment = _Segment(_segment_path(self.path, version))
+            except (IOError, OSError, ValueError):
+                # Already replaced by a newer pool, which is mapped on a later check
+                return
+
+            partitions = _Partitions()
+            for key, start, end in segment.partitions:
+                partitions._add_partition(key, _Records(segment, start, end))
+
+            self._pool_version = version
+            self._publish(self._pool_id, partitions)
+
+    def _match(self, filter_opts):
+        self._sync()
+        return Store._match(self, filter_opts)
+
+    @property
+    def pool_version(self):
+        """The version of the pool being read, or None if no pool was published yet.
+
+        :rtype: int or None
+        """
+        self._sync()
+        return self._pool_version
+
+    @property
+    def version(self):
+        """The version of the proxies, which increases whenever they change.
+
+        :rtype: int
+        """
+        self._sync()
+        return self._version
+
+    def add_store(self):
+        """Returns the identifier of the pool, which every store shares.
+
+        :return:
+            The unique identifier of the pool.
+        :rtype: uuid
+        """
+        return self._pool_id
+
+    def remove_proxies(self, id, proxies):
+        """Removes proxies from this process's view of the pool, until a new pool is published.
+
+        :param id:
+            The unique identifier of the store.
+        :param proxies:
+            The proxies to remove.
+        :type id: uuid
+        :type proxies: iterable
+        """
+        self._sync()
+        Store.remove_proxies(self, id, proxies)
+
+    def update_store(self, id, proxies):
+        """Does nothing, as the pool is only updated by its publisher."""
@@ -23,25 +23,68 @@
 __all__ = ['create_collector', 'get_collector']
 
 
-from threading import Lock
+from collections import OrderedDict
+from functools import partial
+from heapq import heapify, heappop, heappush
+from itertools import count
+from multiprocessing.pool import ThreadPool
+import multiprocessing
+from threading import Condition, Lock
+import time
 
 from .errors import (
     CollectorAlreadyDefinedError,
     CollectorNotFoundError,
     InvalidFilterOptionError,
     InvalidResourceError,
-    InvalidResourceTypeError
+    InvalidResourceTypeError,
+    InvalidStoreError,
+    InvalidStrategyError
 )
-from .scrapers import RESOURCE_MAP, RESOURCE_TYPE_MAP, ProxyResource, get_didsoft_proxies
-from .stores import Store, FILTER_OPTIONS
-from .shared import is_iterable
+from .scrapers import (
+    RESOURCE_ATTRIBUTE_MAP,
+    RESOURCE_MAP,
+    RESOURCE_TIMEOUT_MAP,
+    RESOURCE_TYPE_MAP,
+    ProxyResource,
+    get_didsoft_proxies
+)
+from .stores import (
+    ColumnarStore,
+    ConsistentHashing,
+    HealthScores,
+    SQLiteStore,
+    Store,
+    WeightedStrategy,
+    FILTER_OPTIONS,
+    STRATEGIES,
+    compile_filter
+)
+from .pools import PoolPublisher, SharedPoolStore
+from .shared import _host_port, is_iterable
+from .snapshots import load_snapshot, save_snapshot
 
 
 # Module-level references to collectors
 COLLECTORS = {}
 _collector_lock = Lock()
 
-def create_collector(name, resource_types=None, refresh_interval=3600, resources=None, elite=False, external_url=None):
+# Default upper bound on the number of resources refreshed concurrently by a collector
+_MAX_REFRESH_WORKERS = 8
+
+# Number of compiled filters kept by a collector
+_MAX_COMPILED_FILTERS = 128
+
+# Number of released leases whose expiries are left in a collector's heap before it's rebuilt
+_MAX_STALE_LEASE_EXPIRIES = 64
+
+# Number of times a rate limited collector draws a proxy whose token was concurrently taken before giving up
+_MAX_RATE_LIMIT_ATTEMPTS = 8
+
+def create_collector(name, resource_types=None, refresh_interval=3600, resources=None, elite=False, external_url=None,
+                     background_refresh=False, max_staleness=None, refresh_workers=None, refresh_timeout=None,
+                     store='memory', rate_limit=None, rate_burst=1, strategy='random', snapshot=None, shared_pool=None,
+                     refresher=False):
     """Creates a new collector to scrape and retrieve proxies.
 
     Collectors are stored at the module level. A collector should be creates at the start of the application, and can be
@@ -58,10 +101,58 @@ def create_collector(name, resource_types=None, refresh_interval=3600, resources
     :param resources:
         (optional) The resources to scrape. Can either be a single or sequence of resources. Either `resource_types` or
         `resources` should be defined (but not necessarily both).
+    :param background_refresh:
+        (optional) Whether expired resources are refreshed in the background. If True, proxies retrieved before the
+        refresh completes come from the last refreshed pool instead of waiting on the refresh. Defaults to False.
+    :param max_staleness:
+        (optional) The amount of time (in seconds) past the `refresh_interval` for which proxies may still be served
+        while refreshing in the background. Past this, retrieving proxies waits on the refresh. Defaults to None (no
+        limit).
+    :param refresh_workers:
+        (optional) The maximum number of resources refreshed concurrently. Defaults to None (one per resource, up to 8).
+    :param refresh_timeout:
+        (optional) The maximum amount of time (in seconds) to wait on refreshing resources. Resources still refreshing
+        past this are left to finish in the background. Defaults to None (no limit).
+    :param store:
+        (optional) The backend storing retrieved proxies, either 'memory' (proxy objects), 'columnar' (typed arrays,
+        for pools of millions of proxies), 'sqlite' (a temporary SQLite database, for pools larger than memory), or a
+        `Store` instance such as `SQLiteStore(path)`. Defaults to 'memory'.
+    :param rate_limit:
+        (optional) The maximum number of times per second each proxy is retrieved via `get_proxy(...)`. Defaults to
+        None (no limit).
+    :param rate_burst:
+        (optional) The number of times a proxy can be retrieved in a row before `rate_limit` applies. Defaults to 1.
+    :param strategy:
+        (optional) How a proxy is selected among the matching ones, either 'random', 'round-robin' (in turn), 'lru'
+        (least recently retrieved first), or 'weighted' (at random in proportion to the health reported via
+        `report_success(...)` and `report_failure(...)`). Defaults to 'random'.
+    :param snapshot:
+        (optional) The path of a snapshot the retrieved proxies are saved to after every refresh. If it exists when the
+        collector is created, the proxies are loaded from it and only the resources whose proxies were refreshed over
+        `refresh_interval` ago are scraped again. Defaults to None (no snapshot).
+    :param shared_pool:
+        (optional) The path of a pool of proxies shared between processes. The collector of a single process (created
+        with `refresher=True`) refreshes the resources and publishes its proxies to the pool after every refresh, while
+        the collectors of other processes read them from the pool (without copying them) instead of refreshing the
+        resources themselves. Defaults to None (no shared pool).
+    :param refresher:
+        (optional) Whether the collector refreshes the resources and publishes its proxies to `shared_pool`, rather
+        than reading them from it. Defaults to False.
     :type name: string
     :type resource_types: iterable or string or None
     :type refresh_interval: int
     :type resources: iterable or string or None
+    :type background_refresh: bool
+    :type max_staleness: int or None
+    :type refresh_workers: int or None
+    :type refresh_timeout: int or None
+    :type store: string or Store
+    :type rate_limit: float or None
+    :type rate_burst: int
+    :type strategy: string
+    :type snapshot: string or None
+    :type shared_pool: string or None
+    :type refresher: bool
     :return:
         The initialized collector.
     :rtype: Collector
@@ -71,7 +162,22 @@ def create_collector(name, resource_types=None, refresh_interval=3600, resources
         If 'resources' is not a valid resource.
     :raises InvalidResourceTypeError:
         If 'resource_type' is not a valid resource type.
+    :raises InvalidStoreError:
+        If 'store' is not a valid store.
+    :raises InvalidStrategyError:
+        If 'strategy' is not a valid strategy.
+    :raises ValueError:
+        If 'rate_limit' or 'rate_burst' isn't positive.
     """
+    return _add_collector(name, partial(Collector, resource_types, refresh_interval, resources, elite, external_url,
+                                        background_refresh=background_refresh, max_staleness=max_staleness,
+                                        refresh_workers=refresh_workers, refresh_timeout=refresh_timeout, store=store,
+                                        rate_limit=rate_limit, rate_burst=rate_burst, strategy=strategy,
+                                        snapshot=snapshot, shared_pool=shared_pool, refresher=refresher))
+
+
+def _add_collector(name, create):
+    # Creates a collector via the given function and stores it under the name
     if name in COLLECTORS:
         raise CollectorAlreadyDefinedError('{} is already defined as a collector'.format(name))
 
@@ -79,7 +185,7 @@ def create_collector(name, resource_types=None, refresh_interval=3600, resources
         # Ensure not added by the time entered lock
         if name in COLLECTORS:
             raise CollectorAlreadyDefinedError('{} is already defined as a collector'.format(name))
-        collector = Collector(resource_types, refresh_interval, resources, elite, external_url)
+        collector = create()
         COLLECTORS[name] = collector
         return collector
 
@@ -101,6 +207,139 @@ def get_collector(name):
     raise CollectorNotFoundError('{} is not a defined collector'.format(name))
 
 
+class ProxyLease:
+    """A lease on a proxy retrieved via `Collector.lease_proxy(...)`.
+
+    The proxy isn't leased to anyone else until the lease is released or expires. Used as a context manager, the lease
+    returns its proxy and is released on exit.
+
+    :param collector:
+        The collector the proxy was leased from.
+    :param proxy:
+        The leased proxy.
+    :param expires:
+        The time at which the lease expires, or None if it doesn't.
+    :type collector: Collector
+    :type proxy: Proxy
+    :type expires: float or None
+    """
+    def __init__(self, collector, proxy, expires):
+        self.proxy = proxy
+        self.expires = expires
+        self._collector = collector
+
+    def __enter__(self):
+        return self.proxy
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    @property
+    def expired(self):
+        """Whether the lease has expired.
+
+        :rtype: bool
+        """
+        return self.expires is not None and time.time() >= self.expires
+
+    def release(self):
+        """Releases the lease, allowing the proxy to be leased again. Releasing more than once does nothing."""
+        self._collector._release_lease(self)
+
+
+class _ProxyExclusions:
+    """The proxies which can't be retrieved, as the blacklist of a store lookup (e.g. blacklisted or already leased)."""
+    __slots__ = ('_blacklist', '_excluded')
+
+    def __init__(self, blacklist, excluded):
+        self._blacklist = blacklist
+        self._excluded = excluded
+
+    def __contains__(self, item):
+        return item in self._excluded or item in self._blacklist
+
+    def __len__(self):
+        return len(self._excluded) + len(self._blacklist)
+
+
+class _LeaseWaiters:
+    """The callers waiting to lease a proxy matching the same filter."""
+    __slots__ = ('condition', 'filter_opts', 'count')
+
+    def __init__(self, lock, filter_opts):
+        self.condition = Condition(lock)
+        self.filter_opts = filter_opts
+        self.count = 0
+
+    def matches(self, proxy):
+        return all(getattr(proxy, attr, None) in values for attr, values in self.filter_opts.items())
+
+
+class _RefreshBatch:
+    """Counts down the refreshes of a batch of resources, calling back once the last one finishes if any refreshed."""
+    __slots__ = ('_callback', '_lock', '_refreshed', '_remaining')
+
+    def __init__(self, size, callback):
+        self._callback = callback
+        self._lock = Lock()
+        self._refreshed = False
+        self._remaining = size
+
+    def done(self, refreshed):
+        with self._lock:
+            self._refreshed = self._refreshed or refreshed
+            self._remaining -= 1
+            last = self._remaining == 0
+
+        if last and self._refreshed:
+            self._callback()
+
+
+class _TokenBuckets:
+    """Per-proxy token buckets, allowing each proxy to be taken `rate` times per second with bursts of up to `burst`.
+
+    Each bucket is kept as the single time at which it's full again (i.e. the generic cell rate algorithm), so buckets
+    are refilled lazily by comparing against the current time, and full buckets are the same as missing ones and are
+    dropped once they're common enough.
+    """
+    def __init__(self, rate, burst=1):
+        if rate <= 0 or burst < 1:
+            raise ValueError('The rate and burst of rate limits must be positive')
+
+        self._interval = 1.0 / rate
+        self._tolerance = (burst - 1) * self._interval
+        # Maps the (host, port) of each proxy taken recently to the time its bucket is full
+        self._full_at = {}
+        self._lock = Lock()
+        self._prune_size = 1024
+
+    def __contains__(self, key):
+        # Whether the proxy has no token, as the blacklist of a store lookup
+        return self.available_at(key) > time.time()
+
+    def __len__(self):
+        return len(self._full_at)
+
+    def available_at(self, key):
+        """Returns the time from which the proxy has a token."""
+        full_at = self._full_at.get(key)
+        return 0 if full_at is None else full_at - self._tolerance
+
+    def take(self, key, now):
+        """Takes a token of the proxy, returning whether it had one."""
+        with self._lock:
+            full_at = self._full_at.get(key, now)
+            if full_at - self._tolerance > now:
+                return False
+
+            self._full_at[key] = max(full_at, now) + self._interval
+
+            if len(self._full_at) > self._prune_size:
+                self._full_at = {k: t for k, t in self._full_at.items() if t > now}
+                self._prune_size = max(1024, 2 * len(self._full_at))
+            return True
+
+
 class Collector:
     """A proxy collector for retrieving proxies.
 
@@ -113,19 +352,121 @@ class Collector:
     :param resources:
         (optional) The resources to scrape. Can either be a single or sequence of resources. Either `resource_types` or
         `resources` should be defined (but not necessarily both).
+    :param background_refresh:
+        (optional) Whether expired resources are refreshed in the background. If True, proxies retrieved before the
+        refresh completes come from the last refreshed pool instead of waiting on the refresh. Defaults to False.
+    :param max_staleness:
+        (optional) The amount of time (in seconds) past the `refresh_interval` for which proxies may still be served
+        while refreshing in the background. Past this, retrieving proxies waits on the refresh. Defaults to None (no
+        limit).
+    :param refresh_workers:
+        (optional) The maximum number of resources refreshed concurrently. Defaults to None (one per resource, up to 8).
+    :param refresh_timeout:
+        (optional) The maximum amount of time (in seconds) to wait on refreshing resources. Resources still refreshing
+        past this are left to finish in the background. Defaults to None (no limit).
+    :param store:
+        (optional) The backend storing retrieved proxies, either 'memory' (proxy objects), 'columnar' (typed arrays,
+        for pools of millions of proxies), 'sqlite' (a temporary SQLite database, for pools larger than memory), or a
+        `Store` instance such as `SQLiteStore(path)`. Defaults to 'memory'.
+    :param rate_limit:
+        (optional) The maximum number of times per second each proxy is retrieved via `get_proxy(...)`. Defaults to
+        None (no limit).
+    :param rate_burst:
+        (optional) The number of times a proxy can be retrieved in a row before `rate_limit` applies. Defaults to 1.
+    :param strategy:
+        (optional) How a proxy is selected among the matching ones, either 'random', 'round-robin' (in turn), 'lru'
+        (least recently retrieved first), or 'weighted' (at random in proportion to the health reported via
+        `report_success(...)` and `report_failure(...)`). Defaults to 'random'.
+    :param snapshot:
+        (optional) The path of a snapshot the retrieved proxies are saved to after every refresh. If it exists when the
+        collector is created, the proxies are loaded from it and only the resources whose proxies were refreshed over
+        `refresh_interval` ago are scraped again. Defaults to None (no snapshot).
+    :param shared_pool:
+        (optional) The path of a pool of proxies shared between processes. The collector of a single process (created
+        with `refresher=True`) refreshes the resources and publishes its proxies to the pool after every refresh, while
+        the collectors of other processes read them from the pool (without copying them) instead of refreshing the
+        resources themselves. Defaults to None (no shared pool).
+    :param refresher:
+        (optional) Whether the collector refreshes the resources and publishes its proxies to `shared_pool`, rather
+        than reading them from it. Defaults to False.
     :type resource_types: iterable or string or None
     :type refresh_interval: int
     :type resources: iterable or string or None
+    :type background_refresh: bool
+    :type max_staleness: int or None
+    :type refresh_workers: int or None
+    :type refresh_timeout: int or None
+    :type store: string or Store
+    :type rate_limit: float or None
+    :type rate_burst: int
+    :type strategy: string
+    :type snapshot: string or None
+    :type shared_pool: string or None
+    :type refresher: bool
     :raises InvalidResourceError:
         If 'resources' is not a valid resource.
     :raises InvalidResourceTypeError:
         If 'resource_type' is not a valid resource type.
+    :raises InvalidStoreError:
+        If 'store' is not a valid store.
+    :raises InvalidStrategyError:
+        If 'strategy' is not a valid strategy.
+    :raises ValueError:
+        If 'rate_limit' or 'rate_burst' isn't positive.
     """
-    def __init__(self, resource_types, refresh_interval, resources, elite, external_url):
-        self._store = Store()
+    def __init__(self, resource_types, refresh_interval, resources, elite, external_url, background_refresh=False,
+                 max_staleness=None, refresh_workers=None, refresh_timeout=None, store='memory', rate_limit=None,
+                 rate_burst=1, strategy='random', snapshot=None, shared_pool=None, refresher=False):
+        # Collectors reading a shared pool keep no proxies of their own
+        self.shared_pool = shared_pool
+        self.refresher = refresher
+        self._reads_shared_pool = shared_pool is not None and not refresher
+        self._pool_publisher = PoolPublisher(shared_pool) if shared_pool is not None and refresher else None
+        # Pools are read from the store and published one at a time, along with the store version last published
+        self._publish_lock = Lock()
+        self._published_version = None
+        # Health of the proxies, as reported by the collector's users
+        self._scores = HealthScores()
+        self._strategy = self._create_strategy(strategy)
+        # Hash rings assigning keys given to get_proxy to proxies
+        self._hashing = ConsistentHashing()
         self._blacklist = set()
         self.elite = elite
         self.external_url = external_url
+        self.background_refresh = background_refresh
+        self.max_staleness = max_staleness
+
+        self.refresh_workers = refresh_workers
+        self.refresh_timeout = refresh_timeout
+
+        # Resources currently being refreshed in the background
+        self._pending_refreshes = set()
+        self._pending_lock = Lock()
+
+        # Pool of threads refreshing resources, created on first use
+        self._refresh_pool = None
+        self._refresh_pool_lock = Lock()
+
+        # Least recently used filters given when retrieving proxies, compiled together with the applied filter
+        self._compiled_filters = OrderedDict()
+        self._compiled_filters_lock = Lock()
+        # Incremented whenever the applied filter changes, so filters compiled against the old one aren't kept
+        self._compiled_filters_version = 0
+
+        # Maps the (host, port) of each leased proxy to its lease, with lease expiries kept in a heap
+        self._leases = {}
+        self._lease_expiries = []
+        self._lease_sequence = count()
+        self._lease_lock = Lock()
+        # Maps a compiled filter's key to the callers waiting for a proxy matching it
+        self._lease_waiters = {}
+
+        # Token buckets of the proxies retrieved via get_proxy, if rate limited
+        self._rate_limits = None if rate_limit is None else _TokenBuckets(rate_limit, rate_burst)
+
+        # Proxies last retrieved for each compiled filter, along with the store and blacklist versions they came from
+        self._results = {}
+        self._blacklist_version = 0
 
         if resource_types is not None:
             self._resource_types = set(resource_types) if is_iterable(resource_types) else {resource_types, }
@@ -138,8 +479,17 @@ class Collector:
         # Input validations
         resources = self._parse_resources(self._resource_types, resources)
         self._validate_resources(resources)
+
+        # Created once every argument is validated, so a temporary store isn't left behind by an invalid collector
+        self._store = SharedPoolStore(shared_pool) if self._reads_shared_pool else self._create_store(store)
         self._resource_map = self._create_resource_map(resources, refresh_interval)
 
+        # Path of the snapshot the proxies are saved to, with saves made one at a time
+        self.snapshot = snapshot
+        self._snapshot_lock = Lock()
+        if snapshot is not None and self._load_snapshot():
+            self._publish_pool_quietly()
+
     def _create_resource_map(self, resources, refresh_interval):
         resource_map = dict()
         if self.elite and not self.external_url:
@@ -154,16 +504,95 @@ class Collector:
                     func = RESOURCE_MAP2[resource]
                     resource_map[resource] = {
                         'proxy-resource': ProxyResource(func, refresh_interval, self.external_url),
-                        'id': id
+                        'id': id,
+                        'attributes': {}
                     }
                 else:
                     func = RESOURCE_MAP[resource]
                     resource_map[resource] = {
-                        'proxy-resource': ProxyResource(func, refresh_interval, None),
-                        'id': id
+                        'proxy-resource': ProxyResource(func, refresh_interval, None,
+                                                        timeout=RESOURCE_TIMEOUT_MAP.get(resource)),
+                        'id': id,
+                        'attributes': self._get_resource_attributes(resource)
                     }
         return resource_map
 
+    def _can_match(self, resource, filter_opts):
+        # Whether the resource can have proxies matching the filter
+        attributes = resource['attributes']
+
+        for key, values in filter_opts.items():
+            if key in attributes and attributes[key].isdisjoint(values):
+                return False
+        return True
+
+    def _clear_compiled_filters(self):
+        with self._compiled_filters_lock:
+            self._compiled_filters.clear()
+            self._compiled_filters_version += 1
+        self._results.clear()
+
+    def _compile_filter(self, filter_opts):
+        try:
+            key = self._freeze_filter(filter_opts)
+        except (AttributeError, TypeError):
+            # Either invalid, which validation reports, or not hashable
+            key = None
+
+        with self._compiled_filters_lock:
+            compiled = self._compiled_filters.pop(key, None)
+            if compiled is not None:
+                self._compiled_filters[key] = compiled
+                return compiled
+            version = self._compiled_filters_version
+
+        self._validate_filter_opts(filter_opts)
+
+        combined_filter_opts = dict()
+        self._extend_filter(combined_filter_opts, self._filter_opts)
+        self._extend_filter(combined_filter_opts, filter_opts)
+        compiled = compile_filter(combined_filter_opts)
+
+        if key is not None:
+            with self._compiled_filters_lock:
+                if version != self._compiled_filters_version:
+                    return compiled
+
+                self._compiled_filters[key] = compiled
+                if len(self._compiled_filters) > _MAX_COMPILED_FILTERS:
+                    self._compiled_filters.popitem(last=False)
+
+        return compiled
+
+    def _create_store(self, store):
+        if store == 'memory':
+            return Store()
+        if store == 'columnar':
+            return ColumnarStore()
+        if store == 'sqlite':
+            return SQLiteStore()
+        if isinstance(store, Store):
+            return store
+
+        raise InvalidStoreError('{} is an invalid store'.format(store))
+
+    def _create_strategy(self, strategy):
+        if strategy not in STRATEGIES:
+            raise InvalidStrategyError('{} is an invalid strategy'.format(strategy))
+
+        if STRATEGIES[strategy] is WeightedStrategy:
+            return WeightedStrategy(self._scores)
+        return STRATEGIES[strategy]()
+
+    def _expire_leases(self, now):
+        # Must hold `_lease_lock`
+        while self._lease_expiries and self._lease_expiries[0][0] <= now:
+            lease = heappop(self._lease_expiries)[2]
+            key = _host_port(lease.proxy)
+
+            if self._leases.get(key) is lease:
+                del self._leases[key]
+
     def _extend_filter(self, existing_filter_opts, new_filter_opts):
         if not new_filter_opts:
             return existing_filter_opts
@@ -178,6 +607,37 @@ class Collector:
             else:
                 existing_filter_opts[key] = value
 
+    def _freeze_filter(self, filter_opts):
+        if not filter_opts:
+            return ()
+
+        return tuple(sorted((key, frozenset(value) if is_iterable(value) else value)
+                            for key, value in filter_opts.items()))
+
+    def _get_resource_attributes(self, resource):
+        # Values of the filter options which the resource's proxies can have, for the options where these are known.
+        # Resource types are arbitrary groups of resources, so membership in one says nothing about the proxies.
+        return dict(RESOURCE_ATTRIBUTE_MAP.get(resource, {}))
+
+    def _load_snapshot(self):
+        # Returns whether the proxies of any resource were loaded
+        try:
+            resources = load_snapshot(self.snapshot)
+        except (IOError, OSError, ValueError):
+            # Missing or unreadable, so the proxies are scraped as if there wasn't a snapshot
+            return False
+
+        loaded = False
+        for name, (last_refresh_time, proxies) in resources.items():
+            resource = self._resource_map.get(name)
+
+            if resource is not None:
+                self._store.update_store(resource['id'], proxies)
+                resource['proxy-resource'].restore(last_refresh_time)
+                loaded = True
+
+        return loaded
+
     def _parse_resources(self, resource_types, resources):
         # Retrieve defaults if none specified
         if resources is None:
@@ -210,12 +670,197 @@ class Collector:
         else:
             return {resources, }
 
-    def _refresh_resources(self, force):
-        for resource in self._resource_map.values():
-            refreshed, proxies = resource['proxy-resource'].refresh(force)
-
+    def _refresh_in_background(self, name, resource):
+        # Returns whether the resource's current proxies can be served without waiting on a refresh
+        staleness = resource['proxy-resource'].staleness()
+
+        # Nothing to serve yet
+        if staleness is None:
+            return False
+
+        if staleness < 0:
+            return True
+
+        if self.max_staleness is not None and staleness > self.max_staleness:
+            return False
+
+        with self._pending_lock:
+            if name in self._pending_refreshes:
+                return True
+            self._pending_refreshes.add(name)
+
+        self._get_refresh_pool().apply_async(self._refresh_pending_resource, (name, resource))
+        return True
+
+    def _refresh_pending_resource(self, name, resource):
+        try:
+            if self._refresh_resource(resource, False):
+                self._save_refreshed_proxies()
+        finally:
+            with self._pending_lock:
+                self._pending_refreshes.discard(name)
+
+    def _refresh_batched_resource(self, resource, force, batch):
+        refreshed = False
+        try:
+            refreshed = self._refresh_resource(resource, force)
+        finally:
+            batch.done(refreshed)
+
+    def _refresh_resource(self, resource, force):
+        # Returns whether the resource was refreshed
+        refreshed, proxies = resource['proxy-resource'].refresh(force)
+
+        if refreshed:
+            self._store.update_store(resource['id'], proxies)
+
+        return refreshed
+
+    def _save_refreshed_proxies(self):
+        # Saves and publishes the proxies once a batch of refreshes is done, rather than after each resource
+        if self.snapshot is not None:
+            try:
+                self.save_snapshot()
+            except (IOError, OSError):
+                # The proxies are saved again on the next refresh
+                pass
+
+        self._publish_pool_quietly()
+
+    def _publish_pool(self, unchanged=True):
+        # The proxies are read and published under one lock, so a pool read before a later refresh can't be published
+        # after that refresh's pool and replace it
+        with self._publish_lock:
+            version = self._store.version
+            if not unchanged and version == self._published_version:
+                return
+
+            self._pool_publisher.publish(self._store.get_proxies() or ())
+            self._published_version = version
+
+    def _publish_pool_quietly(self):
+        if self._pool_publisher is not None:
+            try:
+                self._publish_pool(unchanged=False)
+            except (IOError, OSError):
+                # The proxies are published again on the next refresh
+                pass
+
+    def _get_refresh_pool(self):
+        if self._refresh_pool is None:
+            with self._refresh_pool_lock:
+                if self._refresh_pool is None:
+                    workers = self.refresh_workers or min(max(len(self._resource_map), 1), _MAX_REFRESH_WORKERS)
+                    self._refresh_pool = ThreadPool(workers)
+
+        return self._refresh_pool
+
+    def _get_refreshed_resources(self, force, filter_opts=None):
+        # Returns the (name, resource) of the resources to refresh before retrieving proxies matching the filter, with
+        # those that can be refreshed in the background already left to it
+        if self._reads_shared_pool:
+            return []
+
+        resources = []
+        for name, resource in self._resource_map.items():
+            # Resources that can't match the filter aren't needed to retrieve proxies
+            if filter_opts and not self._can_match(resource, filter_opts):
+                continue
+
+            if not force and not resource['proxy-resource'].is_expired():
+                continue
+
+            if not force and self.background_refresh and self._refresh_in_background(name, resource):
+                continue
+
+            resources.append((name, resource))
+
+        return resources
+
+    def _refresh_resources(self, force, filter_opts=None):
+        resources = [resource for _, resource in self._get_refreshed_resources(force, filter_opts)]
+
+        # Refreshes only run inline if there's no timeout to apply to them
+        if self.refresh_timeout is None and (len(resources) == 1 or self.refresh_workers == 1):
+            refreshed = False
+            for resource in resources:
+                refreshed = self._refresh_resource(resource, force) or refreshed
             if refreshed:
-                self._store.update_store(resource['id'], proxies)
+                self._save_refreshed_proxies()
+            return
+
+        if not resources:
+            return
+
+        # Each resource updates its store as soon as it's refreshed, while the proxies are saved once the last one is
+        # (which may be in the background, past the timeout)
+        pool = self._get_refresh_pool()
+        batch = _RefreshBatch(len(resources), self._save_refreshed_proxies)
+        results = [pool.apply_async(self._refresh_batched_resource, (resource, force, batch)) for resource in resources]
+        deadline = None if self.refresh_timeout is None else time.time() + self.refresh_timeout
+
+        for result in results:
+            try:
+                result.get(None if deadline is None else max(deadline - time.time(), 0))
+            except multiprocessing.TimeoutError:
+                # Left to finish in the background
+                pass
+
+    def _release_lease(self, lease):
+        with self._lease_lock:
+            key = _host_port(lease.proxy)
+
+            if self._leases.get(key) is not lease:
+                return
+
+            del self._leases[key]
+
+            # Expiries of released leases are left in the heap, until there are enough to be worth removing
+            if len(self._lease_expiries) > len(self._leases) + _MAX_STALE_LEASE_EXPIRIES:
+                self._lease_expiries = [entry for entry in self._lease_expiries
+                                        if self._leases.get(_host_port(entry[2].proxy)) is entry[2]]
+                heapify(self._lease_expiries)
+
+            # A single caller is woken per filter the proxy matches, rather than every waiting caller
+            for waiters in self._lease_waiters.values():
+                if waiters.matches(lease.proxy):
+                    waiters.condition.notify()
+
+    def _retrieve_proxies(self, combined_filter_opts):
+        # Versions are read before retrieving, so proxies are never cached under a newer version than their own
+        versions = self._store.version, self._blacklist_version
+        result = self._results.get(combined_filter_opts.key)
+
+        if result is not None and result[0] == versions:
+            return result[1]
+
+        proxies = self._store.get_proxies(combined_filter_opts, self._blacklist)
+        if proxies is not None:
+            proxies = tuple(proxies)
+
+        if len(self._results) >= _MAX_COMPILED_FILTERS:
+            self._results.clear()
+        self._results[combined_filter_opts.key] = versions, proxies
+        return proxies
+
+    def _select_proxy(self, combined_filter_opts, key=None):
+        if key is None:
+            select = self._strategy.get_proxy
+        else:
+            select = partial(self._hashing.get_proxy, key=key)
+
+        if self._rate_limits is None:
+            return select(self._store, filter_opts=combined_filter_opts, blacklist=self._blacklist)
+
+        # The drawn proxy's token may be taken by another caller in the meantime, in which case another is drawn
+        exclusions = _ProxyExclusions(self._blacklist, self._rate_limits)
+        for _ in range(_MAX_RATE_LIMIT_ATTEMPTS):
+            proxy = select(self._store, filter_opts=combined_filter_opts, blacklist=exclusions)
+
+            if proxy is None or self._rate_limits.take(_host_port(proxy), time.time()):
+                return proxy
+
+        return None
 
     def _validate_filter_opts(self, filter_opts):
         if not filter_opts:
@@ -243,6 +888,29 @@ class Collector:
                 if resource not in RESOURCE_MAP:
                     raise InvalidResourceError('{} is an invalid resource'.format(resource))
 
+    def available_at(self, filter_opts=None):
+        """Retrieves the earliest time at which `get_proxy(...)` can retrieve a proxy, given the rate limit.
+
+        :param filter_opts:
+            (optional) Options to filter proxies retrieved by collector.
+        :type filter_opts: dict or None
+        :return:
+            The time (as given by `time.time()`), which isn't in the future if a proxy can be retrieved now, or None if
+            no proxy found (either because none exist in internal store or none matched filter_opts).
+        :rtype: float or None
+        :raises InvalidFilterOptionError:
+            If `filter_opts` is not a dictionary or defines an invalid filter.
+        """
+        proxies = self.get_proxies(filter_opts)
+
+        if proxies is None:
+            return None
+
+        if self._rate_limits is None:
+            return time.time()
+
+        return max(min(self._rate_limits.available_at(_host_port(p)) for p in proxies), time.time())
+
     def apply_filter(self, filter_opts):
         """Applies a filter to the collector for retrieving proxies matching specific criteria.
 
@@ -274,6 +942,7 @@ class Collector:
         """
         self._validate_filter_opts(filter_opts)
         self._extend_filter(self._filter_opts, filter_opts)
+        self._clear_compiled_filters()
 
     def blacklist_proxy(self, proxies=None, host=None, port=None):
         """Blacklists a specific a proxy from being retrieved.
@@ -298,15 +967,17 @@ class Collector:
         if proxies is None:
             proxies = {(host, port), }
         elif not is_iterable(proxies):
-            proxies = {(proxies[0], proxies[1]), }
+            proxies = {_host_port(proxies), }
         else:
-            proxies = {(p[0], p[1]) for p in proxies}
+            proxies = {_host_port(p) for p in proxies}
 
         self._blacklist.update(proxies)
+        self._blacklist_version += 1
 
     def clear_blacklist(self):
         """Clears the blacklist."""
         self._blacklist.clear()
+        self._blacklist_version += 1
 
     def clear_filter(self):
         """Clears the filter."""
@@ -314,32 +985,40 @@ class Collector:
             self._filter_opts = {'type': self._resource_types.copy()}
         else:
             self._filter_opts = {}
+        self._clear_compiled_filters()
 
-    def get_proxy(self, filter_opts=None):
+    def get_proxy(self, filter_opts=None, key=None):
         """Retrieves a single proxy.
 
         A single proxy is retrieved from the internal store. If `refreshed` is True and proxies haven't been retrieved
         within the collector's `refresh_interval`, they are refreshed by clearing the internal store and retrieving new
         proxies.
+        Only resources that can have proxies matching the filter are refreshed, and the proxy is selected among the
+        matching ones by the collector's `strategy`.
+        If the collector is rate limited, only proxies within their `rate_limit` are retrieved (see `available_at(...)`
+        for when one will be).
+
+        If a key is given, the same proxy is retrieved for the key for as long as it's stored and matches the filter,
+        rather than one selected by the `strategy`. Keys are assigned to proxies by consistent hashing, so a refresh
+        only reassigns the keys of proxies it removes (and a share of keys to proxies it adds).
 
         :param filter_opts:
             (optional) Options to filter proxies retrieved by collector.
+        :param key:
+            (optional) The key to retrieve the assigned proxy of, such as a session or account identifier.
         :type filter_opts: dict or None
+        :type key: hashable or None
         :return:
-            The retrieved proxy or None if no proxy found (either because none exist in internal store or none matched
-             filter_opts).
+            The retrieved proxy or None if no proxy found (either because none exist in internal store, none matched
+             filter_opts, or all that matched are rate limited).
         :rtype: Proxy or None
         :raises InvalidFilterOptionError:
             If `filter_opts` is not a dictionary or defines an invalid filter.
         """
-        self._validate_filter_opts(filter_opts)
-
-        combined_filter_opts = dict()
-        self._extend_filter(combined_filter_opts, self._filter_opts)
-        self._extend_filter(combined_filter_opts, filter_opts)
+        combined_filter_opts = self._compile_filter(filter_opts)
 
-        self._refresh_resources(False)
-        return self._store.get_proxy(combined_filter_opts, self._blacklist)
+        self._refresh_resources(False, combined_filter_opts)
+        return self._select_proxy(combined_filter_opts, key)
 
     def get_proxies(self, filter_opts=None):
         """Retrieves proxies.
@@ -347,25 +1026,130 @@ class Collector:
         All proxies retrieved are from the internal store. If `refreshed` is True and proxies haven't been retrieved
         within the collector's `refresh_interval`, they are refreshed by clearing the internal store and retrieving new
         proxies.
+        Only resources that can have proxies matching the filter are refreshed.
 
         :param filter_opts:
             (optional) Options to filter proxies retrieved by collector.
         :type filter_opts: dict or None
         :return:
             The retrieved proxies or None if no proxy found (either because none exist in internal store or none matched
-            filter_opts).
-        :rtype: List of Proxy or None
+            filter_opts). Calls made while the proxies and blacklist are unchanged return the same tuple.
+        :rtype: tuple of Proxy or None
         :raises InvalidFilterOptionError:
             If `filter_opts` is not a dictionary or defines an invalid filter.
         """
-        self._validate_filter_opts(filter_opts)
+        combined_filter_opts = self._compile_filter(filter_opts)
 
-        combined_filter_opts = dict()
-        self._extend_filter(combined_filter_opts, self._filter_opts)
-        self._extend_filter(combined_filter_opts, filter_opts)
+        self._refresh_resources(False, combined_filter_opts)
+        return self._retrieve_proxies(combined_filter_opts)
+
+    def get_resource_states(self):
+        """Retrieves the circuit breaker state of each resource.
+
+        A resource is 'closed' if its last refresh succeeded, 'open' if refreshes are being skipped due to failures,
+        and 'half-open' if a refresh will be attempted after previous failures.
+
+        :return:
+            The state of each resource, keyed by resource name.
+        :rtype: dict
+        """
+        return {name: resource['proxy-resource'].state for name, resource in self._resource_map.items()}
+
+    def lease_proxy(self, filter_opts=None, timeout=None, lease_time=300):
+        """Leases a single proxy, which isn't leased to anyone else until the lease is released or expires.
 
-        self._refresh_resources(False)
-        return self._store.get_proxies(combined_filter_opts, self._blacklist)
+        Proxies are otherwise retrieved as with `get_proxy(...)`. If every matching proxy is leased, this waits for one
+        of them to be released or to expire.
+
+        ex. with collector.lease_proxy({'code': 'us'}, timeout=10) as proxy:
+                ...
+
+        :param filter_opts:
+            (optional) Options to filter proxies retrieved by collector.
+        :param timeout:
+            (optional) The maximum amount of time (in seconds) to wait for a proxy. Defaults to None (no limit).
+        :param lease_time:
+            (optional) The amount of time (in seconds) after which the lease expires if not released. If None, it
+            doesn't expire. Defaults to 300.
+        :type filter_opts: dict or None
+        :type timeout: float or None
+        :type lease_time: float or None
+        :return:
+            The lease or None if no proxy found (either because none exist in internal store or none matched
+            filter_opts) or none was released within the timeout.
+        :rtype: ProxyLease or None
+        :raises InvalidFilterOptionError:
+            If `filter_opts` is not a dictionary or defines an invalid filter.
+        """
+        combined_filter_opts = self._compile_filter(filter_opts)
+
+        self._refresh_resources(False, combined_filter_opts)
+        deadline = None if timeout is None else time.time() + timeout
+
+        with self._lease_lock:
+            while True:
+                now = time.time()
+                self._expire_leases(now)
+
+                proxy = self._strategy.get_proxy(self._store, combined_filter_opts,
+                                                 _ProxyExclusions(self._blacklist, self._leases))
+
+                if proxy is not None:
+                    lease = ProxyLease(self, proxy, None if lease_time is None else now + lease_time)
+                    self._leases[_host_port(proxy)] = lease
+
+                    if lease.expires is not None:
+                        heappush(self._lease_expiries, (lease.expires, next(self._lease_sequence), lease))
+                    return lease
+
+                # Nothing to wait on if no proxy matches, leased or not
+                if not self._leases or self._store.get_proxy(combined_filter_opts, self._blacklist) is None:
+                    return None
+
+                wait = None if deadline is None else deadline - now
+                if wait is not None and wait <= 0:
+                    return None
+
+                if self._lease_expiries:
+                    until_expiry = self._lease_expiries[0][0] - now
+                    wait = until_expiry if wait is None else min(wait, until_expiry)
+
+                waiters = self._lease_waiters.get(combined_filter_opts.key)
+                if waiters is None:
+                    waiters = self._lease_waiters[combined_filter_opts.key] = \
+                        _LeaseWaiters(self._lease_lock, combined_filter_opts)
+
+                waiters.count += 1
+                try:
+                    waiters.condition.wait(wait)
+                finally:
+                    waiters.count -= 1
+                    if not waiters.count:
+                        del self._lease_waiters[combined_filter_opts.key]
+
+    def report_failure(self, proxy):
+        """Reports a failed request through a proxy, lowering its health.
+
+        Health is kept as a moving average per host and port, so it carries over to the same proxy retrieved again by
+        a later refresh. Proxies are drawn in proportion to it by the 'weighted' strategy.
+
+        :param proxy:
+            The proxy.
+        :type proxy: Proxy
+        """
+        self._scores.report_failure(proxy)
+
+    def report_success(self, proxy, latency=None):
+        """Reports a successful request through a proxy, raising its health.
+
+        :param proxy:
+            The proxy.
+        :param latency:
+            (optional) The time (in seconds) the request took. Slower proxies are less healthy.
+        :type proxy: Proxy
+        :type latency: float or None
+        """
+        self._scores.report_success(proxy, latency)
 
     def remove_blacklist(self, proxies=None, host=None, port=None):
         """Removes proxies from the blacklist.
@@ -390,11 +1174,12 @@ class Collector:
         if proxies is None:
             proxies = {(host, port), }
         elif not is_iterable(proxies):
-            proxies = {(proxies[0], proxies[1]), }
+            proxies = {_host_port(proxies), }
         else:
-            proxies = {(p[0], p[1]) for p in proxies}
+            proxies = {_host_port(p) for p in proxies}
 
         self._blacklist.difference_update(proxies)
+        self._blacklist_version += 1
 
     def remove_proxy(self, proxies):
         """Removes a proxy from the internal store.
@@ -417,14 +1202,53 @@ class Collector:
         else:
             proxies = set(proxies)
 
+        # Proxies are removed a store at a time, so each store is copied once however many of its proxies are removed
+        removed = {}
         for proxy in proxies:
             resource_type = proxy.source
             if resource_type not in self._resource_map:
                 raise InvalidResourceTypeError(
                     '{} is not a valid resource type'.format(resource_type))
 
-            id = self._resource_map[resource_type]['id']
-            self._store.remove_proxy(id, proxy)
+            removed.setdefault(self._resource_map[resource_type]['id'], []).append(proxy)
+
+        for id, store_proxies in removed.items():
+            self._store.remove_proxies(id, store_proxies)
+
+    def save_snapshot(self):
+        """Saves the proxies of every refreshed resource to the collector's snapshot.
+
+        This is done after every refresh, and only needs to be called to save proxies removed since then.
+
+        :raises IOError:
+            If the snapshot couldn't be written.
+        :raises ValueError:
+            If the collector has no snapshot.
+        """
+        if self.snapshot is None:
+            raise ValueError('The collector has no snapshot')
+
+        with self._snapshot_lock:
+            save_snapshot(self.snapshot, [
+                (name, resource['proxy-resource'].last_refresh_time, self._store.get_store_proxies(resource['id']))
+                for name, resource in self._resource_map.items()
+                if resource['proxy-resource'].last_refresh_time
+            ])
+
+    def publish_pool(self):
+        """Publishes the proxies to the collector's shared pool.
+
+        This is done after every refresh, and only needs to be called to publish proxies removed since then.
+
+        :raises IOError:
+            If the pool couldn't be written.
+        :raises ValueError:
+            If the collector doesn't publish to a shared pool.
+        """
+        if self._pool_publisher is None:
+            raise ValueError('The collector doesn\'t publish to a shared pool')
+
+        self._publish_pool()
 
     def refresh_proxies(self, force=True):
         """Refreshes the proxies.
@@ -20,13 +20,18 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-__all__ = ['add_resource', 'add_resource_type', 'get_resources', 'get_resource_types', 'ProxyResource', 'RESOURCE_MAP', 'RESOURCE_TYPE_MAP']
+__all__ = ['add_resource', 'add_resource_type', 'add_table_resource', 'create_table_scraper', 'fetch_page',
+           'fresh_pages', 'get_resources', 'get_resource_types', 'ProxyResource', 'TableSpec', 'PAGE_CACHE_TTL',
+           'RESOURCE_MAP', 'RESOURCE_ATTRIBUTE_MAP', 'RESOURCE_TIMEOUT_MAP', 'RESOURCE_TYPE_MAP', 'TABLE_SPECS',
+           'CIRCUIT_CLOSED', 'CIRCUIT_HALF_OPEN', 'CIRCUIT_OPEN']
 
 
 from bs4 import BeautifulSoup
-from threading import Lock
-import time
+from contextlib import contextmanager
+from threading import Event, Lock, local
 import json
+import random
+import time
 from .errors import (
     InvalidHTMLError,
     InvalidResourceError,
@@ -36,15 +41,33 @@ from .errors import (
     ResourceAlreadyDefinedError,
     ResourceTypeAlreadyDefinedError
 )
+from .parsers import parse_table_rows
 from .shared import (
     is_iterable,
     Proxy,
-    request_proxy_list
+    request_proxy_list,
+    request_timeout
 )
 
 _resource_lock = Lock()
 _resource_type_lock = Lock()
 
+# Time (in seconds) a parsed page is reused by resources scraping the same page
+PAGE_CACHE_TTL = 60
+
+# Parsed pages (url, parse function -> expiry time, result) and requests in flight for them
+_page_cache = {}
+_page_flights = {}
+_page_lock = Lock()
+
+# Whether the current thread bypasses cached pages (i.e. forced refreshes)
+_page_local = local()
+
+# Circuit breaker states of a resource
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_HALF_OPEN = 'half-open'
+CIRCUIT_OPEN = 'open'
+
 country_codes = {
     "AF": "Afghanistan", "AX": "Aland Islands", "AL": "Albania", "DZ": "Algeria", "AS": "American Samoa", "AD": "Andorra", "AO": "Angola", "AI": "Anguilla", "AQ": "Antarctica", "AG": "Antigua and Barbuda", "AR": "Argentina", "AM": "Armenia", "AW": "Aruba", "AU": "Australia", "AT": "Austria", "AZ": "Azerbaijan", "BS": "Bahamas", "BH": "Bahrain", "BD": "Bangladesh", "BB": "Barbados", "BY": "Belarus", "BE": "Belgium", "BZ": "Belize", "BJ": "Benin", "BM": "Bermuda", "BT": "Bhutan", "BO": "Bolivia", "BQ": "Bonaire, Saint Eustatius and Saba", "BA": "Bosnia and Herzegovina", "BW": "Botswana", "BV": "Bouvet Island", "BR": "Brazil", "IO": "British Indian Ocean Territory", "VG": "British Virgin Islands", "BN": "Brunei", "BG": "Bulgaria", "BF": "Burkina Faso", "BI": "Burundi", "KH": "Cambodia", "CM": "Cameroon", "CA": "Canada", "CV": "Cape Verde", "KY": "Cayman Islands", "CF": "Central African Republic", "TD": "Chad", "CL": "Chile", "CN": "China", "CX": "Christmas Island", "CC": "Cocos Islands", "CO": "Colombia", "KM": "Comoros", "CK": "Cook Islands", "CR": "Costa Rica", "HR": "Croatia", "CU": "Cuba", "CW": "Curacao", "CY": "Cyprus", "CZ": "Czech Republic", "CD": "Democratic Republic of the Congo", "DK": "Denmark", "DJ": "Djibouti", "DM": "Dominica", "DO": "Dominican Republic", "TL": "East Timor", "EC": "Ecuador", "EG": "Egypt", "SV": "El Salvador", "GQ": "Equatorial Guinea", "ER": "Eritrea", "EE": "Estonia", "ET": "Ethiopia", "FK": "Falkland Islands", "FO": "Faroe Islands", "FJ": "Fiji", "FI": "Finland", "FR": "France", "GF": "French Guiana", "PF": "French Polynesia", "TF": "French Southern Territories", "GA": "Gabon", "GM": "Gambia", "GE": "Georgia", "DE": "Germany", "GH": "Ghana", "GI": "Gibraltar", "GR": "Greece", "GL": "Greenland", "GD": "Grenada", "GP": "Guadeloupe", "GU": "Guam", "GT": "Guatemala", "GG": "Guernsey", "GN": "Guinea", "GW": "Guinea-Bissau", "GY": "Guyana", "HT": "Haiti", "HM": "Heard Island and McDonald Islands", "HN": "Honduras", "HK": "Hong Kong", "HU": "Hungary", "IS": "Iceland", "IN": "India", "ID": "Indonesia", "IR": "Iran", "IQ": "Iraq", "IE": "Ireland", "IM": "Isle of Man", "IL": "Israel", "IT": "Italy", "CI": "Ivory Coast", "JM": "Jamaica", "JP": "Japan", "JE": "Jersey", "JO": "Jordan", "KZ": "Kazakhstan", "KE": "Kenya", "KI": "Kiribati", "XK": "Kosovo", "KW": "Kuwait", "KG": "Kyrgyzstan", "LA": "Laos", "LV": "Latvia", "LB": "Lebanon", "LS": "Lesotho", "LR": "Liberia", "LY": "Libya", "LI": "Liechtenstein", "LT": "Lithuania", "LU": "Luxembourg", "MO": "Macao", "MK": "Macedonia", "MG": "Madagascar", "MW": "Malawi", "MY": "Malaysia", "MV": "Maldives", "ML": "Mali", "MT": "Malta", "MH": "Marshall Islands", "MQ": "Martinique", "MR": "Mauritania", "MU": "Mauritius", "YT": "Mayotte", "MX": "Mexico", "FM": "Micronesia", "MD": "Moldova", "MC": "Monaco", "MN": "Mongolia", "ME": "Montenegro", "MS": "Montserrat", "MA": "Morocco", "MZ": "Mozambique", "MM": "Myanmar", "NA": "Namibia", "NR": "Nauru", "NP": "Nepal", "NL": "Netherlands", "AN": "Netherlands Antilles", "NC": "New Caledonia", "NZ": "New Zealand", "NI": "Nicaragua", "NE": "Niger", "NG": "Nigeria", "NU": "Niue", "NF": "Norfolk Island", "KP": "North Korea", "MP": "Northern Mariana Islands", "NO": "Norway", "OM": "Oman", "PK": "Pakistan", "PW": "Palau", "PS": "Palestinian Territory", "PA": "Panama", "PG": "Papua New Guinea", "PY": "Paraguay", "PE": "Peru", "PH": "Philippines", "PN": "Pitcairn", "PL": "Poland", "PT": "Portugal", "PR": "Puerto Rico", "QA": "Qatar", "CG": "Republic of the Congo", "RE": "Reunion", "RO": "Romania", "RU": "Russia", "RW": "Rwanda", "BL": "Saint Barthelemy", "SH": "Saint Helena", "KN": "Saint Kitts and Nevis", "LC": "Saint Lucia", "MF": "Saint Martin", "PM": "Saint Pierre and Miquelon", "VC": "Saint Vincent and the Grenadines", "WS": "Samoa", "SM": "San Marino", "ST": "Sao Tome and Principe", "SA": "Saudi Arabia", "SN": "Senegal", "RS": "Serbia", "CS": "Serbia and Montenegro", "SC": "Seychelles", "SL": "Sierra Leone", "SG": "Singapore", "SX": "Sint Maarten", "SK": "Slovakia", "SI": "Slovenia", "SB": "Solomon Islands", "SO": "Somalia", "ZA": "South Africa", "GS": "South Georgia and the South Sandwich Islands", "KR": "South Korea", "SS": "South Sudan", "ES": "Spain", "LK": "Sri Lanka", "SD": "Sudan", "SR": "Suriname", "SJ": "Svalbard and Jan Mayen", "SZ": "Swaziland", "SE": "Sweden", "CH": "Switzerland", "SY": "Syria", "TW": "Taiwan", "TJ": "Tajikistan", "TZ": "Tanzania", "TH": "Thailand", "TG": "Togo", "TK": "Tokelau", "TO": "Tonga", "TT": "Trinidad and Tobago", "TN": "Tunisia", "TR": "Turkey", "TM": "Turkmenistan", "TC": "Turks and Caicos Islands", "TV": "Tuvalu", "VI": "U.S. Virgin Islands", "UG": "Uganda", "UA": "Ukraine", "AE": "United Arab Emirates", "GB": "United Kingdom", "US": "United States", "UM": "United States Minor Outlying Islands", "UY": "Uruguay", "UZ": "Uzbekistan", "VU": "Vanuatu", "VA": "Vatican", "VE": "Venezuela", "VN": "Vietnam", "WF": "Wallis and Futuna", "EH": "Western Sahara", "YE": "Yemen", "ZM": "Zambia", "ZW": "Zimbabwe"
 }
@@ -52,24 +75,81 @@ country_codes = {
 class ProxyResource:
     """A manager for a single proxy resource.
 
+    Failed refreshes are tracked with a circuit breaker. After a failure the circuit opens and refreshes are skipped
+    for an exponentially growing, jittered backoff. Once it has passed the circuit is half-open, allowing a single
+    refresh to be attempted; a successful refresh closes the circuit again.
+
     :param func:
         The scraping function.
     :param refresh_interval:
         The minimum time (in seconds) between each refresh.
+    :param external_url:
+        (optional) The url passed to the scraping function.
+    :param min_backoff:
+        (optional) The time (in seconds) refreshes are skipped for after the first failure. Doubled on each consecutive
+        failure. Defaults to 10.
+    :param max_backoff:
+        (optional) The maximum time (in seconds) refreshes are skipped for after a failure. Defaults to 3600.
+    :param timeout:
+        (optional) The timeout (in seconds) of requests made by the scraping function, either as a single value or a
+        (connect, read) tuple. Defaults to None (the session's default timeout).
     :type func: function
     :type refresh_interval: int
+    :type external_url: string or None
+    :type min_backoff: int
+    :type max_backoff: int
+    :type timeout: float or tuple or None
     """
-    def __init__(self, func, refresh_interval, external_url=None):
+    def __init__(self, func, refresh_interval, external_url=None, min_backoff=10, max_backoff=3600, timeout=None):
         self._func = func
         self._refresh_interval = refresh_interval
         self._lock = Lock()
         self._last_refresh_time = 0
         self.external_url = external_url
+        self.timeout = timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+        # Consecutive failed refreshes and the time before which refreshing is skipped
+        self._failures = 0
+        self._retry_time = 0
+
+    @property
+    def failures(self):
+        """The number of consecutive failed refreshes."""
+        return self._failures
+
+    @property
+    def last_refresh_time(self):
+        """The time the proxies were last refreshed, or 0 if they never have been."""
+        return self._last_refresh_time
+
+    @property
+    def retry_time(self):
+        """The time before which refreshing is skipped due to failures."""
+        return self._retry_time
+
+    @property
+    def state(self):
+        """The state of the circuit breaker: closed, open, or half-open."""
+        if not self._failures:
+            return CIRCUIT_CLOSED
+
+        if self._retry_time > time.time():
+            return CIRCUIT_OPEN
+
+        return CIRCUIT_HALF_OPEN
+
+    def _record_failure(self):
+        self._failures += 1
+        backoff = min(self.min_backoff * 2 ** (self._failures - 1), self.max_backoff)
+        self._retry_time = time.time() + random.uniform(backoff / 2.0, backoff)
 
     def refresh(self, force=False):
         """Refreshes proxies.
 
-        Proxies are refreshed if they haven't been refreshed within the past `refresh_interval`, or if `force` is True.
+        Proxies are refreshed if they haven't been refreshed within the past `refresh_interval` and the circuit isn't
+        open, or if `force` is True.
 
         :param force:
             Whether to force a refresh. If True, a refresh is always performed; otherwise it is only done if a refresh
@@ -78,25 +158,159 @@ class ProxyResource:
             A tuple denoting whether proxies were refreshed and the proxies retrieved.
         :rtype: (bool, iterable)
         """
-        if not force and self._last_refresh_time + self._refresh_interval > time.time():
+        if not force and not self.is_expired():
             return False, None
 
         with self._lock:
             # Check if updated before
-            if force or self._last_refresh_time + self._refresh_interval <= time.time():
+            if force or self.is_expired():
 
                 try:
-                    if self.external_url:
-                        proxies = self._func(self.external_url)
-                    else:
-                        proxies = self._func()
-                    self._last_refresh_time = time.time()
-                    return True, proxies
+                    with request_timeout(self.timeout), fresh_pages(force):
+                        if self.external_url:
+                            proxies = self._func(self.external_url)
+                        else:
+                            proxies = self._func()
                 except (InvalidHTMLError, RequestNotOKError, RequestFailedError):
-                    pass
+                    self._record_failure()
+                    return False, None
+
+                self._failures = 0
+                self._retry_time = 0
+                self._last_refresh_time = time.time()
+                return True, proxies
 
         return False, None
 
+    def restore(self, last_refresh_time):
+        """Marks the proxies as refreshed at the given time, such as when they're restored from a snapshot.
+
+        A later refresh that has already occurred is kept.
+
+        :param last_refresh_time:
+            The time the restored proxies were refreshed.
+        :type last_refresh_time: float
+        """
+        with self._lock:
+            self._last_refresh_time = max(self._last_refresh_time, last_refresh_time)
+
+    def is_expired(self):
+        """Returns whether the proxies are due for a refresh.
+
+        :return:
+            True if the proxies haven't been refreshed within the past `refresh_interval` and the circuit isn't open;
+            otherwise False.
+        :rtype: bool
+        """
+        now = time.time()
+        return self._last_refresh_time + self._refresh_interval <= now and self._retry_time <= now
+
+    def staleness(self):
+        """Returns how long the proxies have been due for a refresh.
+
+        :return:
+            The time (in seconds) elapsed since the proxies expired, which is negative if they haven't expired yet, or
+            None if the proxies have never been refreshed.
+        :rtype: float or None
+        """
+        if not self._last_refresh_time:
+            return None
+
+        return time.time() - self._last_refresh_time - self._refresh_interval
+
+
+class _PageFlight:
+    """A single in-flight request and parse of a page, awaited by every caller wanting the same page."""
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = Event()
+        self.result = None
+        self.error = None
+
+
+def _clear_page_cache():
+    with _page_lock:
+        _page_cache.clear()
+
+
+@contextmanager
+def fresh_pages(fresh=True):
+    """Makes pages fetched by the current thread within the context bypass cached pages.
+
+    Requests already in flight for a page are still shared, as their response is as fresh as a new one.
+
+    :param fresh:
+        (optional) Whether cached pages are bypassed. Defaults to True.
+    :type fresh: bool
+    """
+    previous = getattr(_page_local, 'fresh', False)
+    _page_local.fresh = fresh
+
+    try:
+        yield
+    finally:
+        _page_local.fresh = previous
+
+
+def fetch_page(url, parse, ttl=PAGE_CACHE_TTL):
+    """Requests and parses a page, sharing the result between resources scraping the same page.
+
+    Concurrent callers for the same url and parse function wait on a single request and parse instead of making their
+    own, and the parsed result is reused by later callers for `ttl` seconds (unless within `fresh_pages()`, as during
+    forced refreshes). Failures aren't cached.
+
+    :param url:
+        The url of the page.
+    :param parse:
+        The function parsing the response of the page.
+    :param ttl:
+        (optional) The time (in seconds) the parsed page is reused for. Defaults to `PAGE_CACHE_TTL`.
+    :type url: string
+    :type parse: function
+    :type ttl: int
+    :return:
+        The parsed page.
+    :raises InvalidHTMLError:
+        If the page couldn't be parsed.
+    :raises RequestFailedError:
+        If the request failed.
+    :raises RequestNotOKError:
+        If the response wasn't OK.
+    """
+    key = (url, parse)
+
+    with _page_lock:
+        cached = None if getattr(_page_local, 'fresh', False) else _page_cache.get(key)
+        if cached is not None and cached[0] > time.time():
+            return cached[1]
+
+        flight = _page_flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _page_flights[key] = _PageFlight()
+
+    if not leader:
+        flight.event.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = parse(request_proxy_list(url))
+
+        with _page_lock:
+            _page_cache[key] = (time.time() + ttl, flight.result)
+
+        return flight.result
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _page_lock:
+            del _page_flights[key]
+        flight.event.set()
+
 
 def get_didsoft_proxies(url):
     response = request_proxy_list(url)
@@ -124,56 +338,6 @@ def get_didsoft_proxies(url):
         raise InvalidHTMLError()
 
 
-def get_anonymous_proxies():
-    url = 'https://free-proxy-list.net/anonymous-proxy.html'
-    response = request_proxy_list(url)
-
-    try:
-        soup = BeautifulSoup(response.content, 'html.parser')
-        table = soup.find('table', {'id': 'proxylisttable'})
-        proxies = set()
-
-        for row in table.find('tbody').find_all('tr'):
-            data = list(map(lambda x: x.text, row.find_all('td')))
-            host = data[0]
-            port = data[1]
-            code = data[2].lower()
-            country = data[3].lower()
-            anonymous = data[4].lower() in ('anonymous', 'elite proxy')
-            version = 'https' if data[6].lower() == 'yes' else 'http'
-
-            proxies.add(Proxy(host, port, code, country, anonymous, version, 'anonymous-proxy'))
-
-        return proxies
-    except (AttributeError, KeyError):
-        raise InvalidHTMLError()
-
-
-def get_free_proxy_list_proxies():
-    url = 'http://www.free-proxy-list.net'
-    response = request_proxy_list(url)
-    try:
-        soup = BeautifulSoup(response.content, 'html.parser')
-        table = soup.find('table', {'id': 'proxylisttable'})
-        proxies = set()
-
-        for row in table.find('tbody').find_all('tr'):
-            data = list(map(lambda x: x.text, row.find_all('td')))
-            host = data[0]
-            port = data[1]
-            code = data[2].lower()
-            country = data[3].lower()
-            anonymous = data[4].lower() in ('anonymous', 'elite proxy')
-            version = 'https' if data[6].lower() == 'yes' else 'http'
-
-            proxies.add(Proxy(host, port, code, country, anonymous, version, 'free-proxy-list'))
-
-        return proxies
-
-    except (AttributeError, KeyError):
-        raise InvalidHTMLError()
-    
-
 def _get_proxy_daily_proxies_parse_inner(element, type, source):
     content = element.contents[0]
     rows = content.replace('"', '').replace("'", '').split('\n')
@@ -190,10 +354,7 @@ def _get_proxy_daily_proxies_parse_inner(element, type, source):
     return proxies
 
 
-def get_proxy_daily_data_elements():
-    url = 'http://www.proxy-daily.com'
-    response = request_proxy_list(url)
-
+def _parse_proxy_daily_page(response):
     try:
         soup = BeautifulSoup(response.content, 'html.parser')
         content = soup.find('div', {'id': 'free-proxy-list'})
@@ -202,6 +363,11 @@ def get_proxy_daily_data_elements():
         raise InvalidHTMLError()
 
 
+def get_proxy_daily_data_elements():
+    url = 'http://www.proxy-daily.com'
+    return fetch_page(url, _parse_proxy_daily_page)
+
+
 def get_proxy_daily_http_proxies():
     http_data_element = get_proxy_daily_data_elements()[0]
     return _get_proxy_daily_proxies_parse_inner(http_data_element, 'http', 'proxy-daily-http')
@@ -217,106 +383,151 @@ def get_proxy_daily_socks5_proxies():
     return _get_proxy_daily_proxies_parse_inner(socks5_data_element, 'socks5', 'proxy-daily-socks5')
 
 
-def get_socks_proxies():
-    url = 'https://www.socks-proxy.net'
-    response = request_proxy_list(url)
+class TableSpec:
+    """A declarative definition of a resource scraping proxies from a table on a web page.
+
+    Resources whose specs share a page (i.e. the same url and table) request and parse the page once, with each
+    resource then mapping the parsed rows to its own proxies.
+
+    :param url:
+        The url of the page.
+    :param columns:
+        Maps proxy fields (host, port, code, country, anonymous, type) to the index of the column holding them. The
+        code, country, and type are lowercased, and a proxy is anonymous if its column reads 'anonymous' or 'elite
+        proxy'. Fields not mapped are None.
+    :param type:
+        (optional) The type of the proxies. Can either be a fixed type, or a function deriving the type from the cells
+        of a row. Defaults to None (the type column is used).
+    :param table_id:
+        (optional) The id of the table. Defaults to 'proxylisttable'.
+    :type url: string
+    :type columns: dict
+    :type type: string or function or None
+    :type table_id: string
+    """
+    def __init__(self, url, columns, type=None, table_id='proxylisttable'):
+        self.url = url
+        self.columns = columns
+        self.type = type
+        self.table_id = table_id
 
-    try:
-        soup = BeautifulSoup(response.content, 'html.parser')
-        table = soup.find('table', {'id': 'proxylisttable'})
-        proxies = set()
 
-        for row in table.find('tbody').find_all('tr'):
-            data = list(map(lambda x: x.text, row.find_all('td')))
-            host = data[0]
-            port = data[1]
-            code = data[2].lower()
-            country = data[3].lower()
-            version = data[4].lower()
-            anonymous = data[5].lower() in ('anonymous', 'elite proxy')
+def _is_anonymous(value):
+    return value.lower() in ('anonymous', 'elite proxy')
 
-            proxies.add(Proxy(host, port, code, country, anonymous, version, 'socks-proxy'))
 
-        return proxies
-    except (AttributeError, KeyError):
-        raise InvalidHTMLError()
+def _lower(value):
+    return value.lower()
 
 
-def get_ssl_proxies():
-    url = 'https://www.sslproxies.org/'
-    response = request_proxy_list(url)
+# Conversion of table cells into proxy fields
+_FIELD_CONVERTERS = {
+    'code': _lower,
+    'country': _lower,
+    'anonymous': _is_anonymous,
+    'type': _lower
+}
 
-    try:
-        soup = BeautifulSoup(response.content, 'html.parser')
-        table = soup.find('table', {'id': 'proxylisttable'})
-        proxies = set()
+# Parse functions of tables (table id -> function), shared so resources scraping the same table share a page parse
+_table_parsers = {}
 
-        for row in table.find('tbody').find_all('tr'):
-            data = list(map(lambda x: x.text, row.find_all('td')))
-            host = data[0]
-            port = data[1]
-            code = data[2].lower()
-            country = data[3].lower()
-            anonymous = data[4].lower() in ('anonymous', 'elite proxy')
 
-            proxies.add(Proxy(host, port, code, country, anonymous, 'https', 'ssl-proxy'))
+def _parse_table(response, table_id):
+    content = response.content
+    if hasattr(content, 'read'):
+        content = content.read()
 
-        return proxies
+    rows = parse_table_rows(content, table_id)
+    if rows is not None:
+        return rows
+
+    # Fall back to a full parse of the page
+    try:
+        soup = BeautifulSoup(content, 'html.parser')
+        table = soup.find('table', {'id': table_id})
+        return [[cell.text for cell in row.find_all('td')] for row in table.find('tbody').find_all('tr')]
     except (AttributeError, KeyError):
         raise InvalidHTMLError()
 
 
-def get_uk_proxies():
-    url = 'https://free-proxy-list.net/uk-proxy.html'
-    response = request_proxy_list(url)
+def _get_table_parser(table_id):
+    if table_id not in _table_parsers:
+        _table_parsers.setdefault(table_id, lambda response: _parse_table(response, table_id))
+    return _table_parsers[table_id]
 
-    try:
-        soup = BeautifulSoup(response.content, 'html.parser')
-        table = soup.find('table', {'id': 'proxylisttable'})
-        proxies = set()
 
-        for row in table.find('tbody').find_all('tr'):
-            data = list(map(lambda x: x.text, row.find_all('td')))
-            host = data[0]
-            port = data[1]
-            code = data[2].lower()
-            country = data[3].lower()
-            anonymous = data[4].lower() in ('anonymous', 'elite proxy')
-            version = 'https' if data[6].lower() == 'yes' else 'http'
+def _get_field_getter(spec, field):
+    if field == 'type' and spec.type is not None:
+        if callable(spec.type):
+            return spec.type
+        return lambda row: spec.type
 
-            proxies.add(Proxy(host, port, code, country, anonymous, version, 'uk-proxy'))
+    if field not in spec.columns:
+        return lambda row: None
 
-        return proxies
-    except (AttributeError, KeyError):
-        raise InvalidHTMLError()
+    column = spec.columns[field]
+    converter = _FIELD_CONVERTERS.get(field)
 
+    if converter is None:
+        return lambda row: row[column]
+    return lambda row: converter(row[column])
 
-def get_us_proxies():
-    url = 'https://www.us-proxy.org'
-    response = request_proxy_list(url)
 
-    try:
-        soup = BeautifulSoup(response.content, 'html.parser')
-        table = soup.find('table', {'id': 'proxylisttable'})
-        proxies = set()
+def create_table_scraper(name, spec):
+    """Creates a scraping function for a table resource.
 
-        for row in table.find('tbody').find_all('tr'):
-            data = list(map(lambda x: x.text, row.find_all('td')))
-            host = data[0]
-            port = data[1]
-            code = data[2].lower()
-            country = data[3].lower()
-            anonymous = data[4].lower() in ('anonymous', 'elite proxy')
-            version = 'https' if data[6].lower() == 'yes' else 'http'
+    :param name:
+        The name of the resource, used as the source of the proxies.
+    :param spec:
+        The definition of the table.
+    :type name: string
+    :type spec: TableSpec
+    :return:
+        The scraping function.
+    :rtype: function
+    """
+    parse = _get_table_parser(spec.table_id)
+    getters = [_get_field_getter(spec, field) for field in Proxy._fields if field != 'source']
 
-            proxies.add(Proxy(host, port, code, country, anonymous, version, 'us-proxy'))
+    def func():
+        rows = fetch_page(spec.url, parse)
 
-        return proxies
-    except (AttributeError, KeyError):
-        raise InvalidHTMLError()
+        try:
+            return {Proxy(*([get(row) for get in getters] + [name])) for row in rows}
+        except IndexError:
+            raise InvalidHTMLError()
+
+    return func
+
+
+def _get_https_column_type(row):
+    return 'https' if row[6].lower() == 'yes' else 'http'
+
+
+# Columns of the tables on free-proxy-list.net and its sister sites
+_FREE_PROXY_LIST_COLUMNS = {'host': 0, 'port': 1, 'code': 2, 'country': 3, 'anonymous': 4}
+_SOCKS_PROXY_COLUMNS = {'host': 0, 'port': 1, 'code': 2, 'country': 3, 'type': 4, 'anonymous': 5}
+
+TABLE_SPECS = {
+    'anonymous-proxy': TableSpec('https://free-proxy-list.net/anonymous-proxy.html', _FREE_PROXY_LIST_COLUMNS,
+                                 _get_https_column_type),
+    'free-proxy-list': TableSpec('http://www.free-proxy-list.net', _FREE_PROXY_LIST_COLUMNS, _get_https_column_type),
+    'socks-proxy': TableSpec('https://www.socks-proxy.net', _SOCKS_PROXY_COLUMNS),
+    'ssl-proxy': TableSpec('https://www.sslproxies.org/', _FREE_PROXY_LIST_COLUMNS, 'https'),
+    'uk-proxy': TableSpec('https://free-proxy-list.net/uk-proxy.html', _FREE_PROXY_LIST_COLUMNS,
+                          _get_https_column_type),
+    'us-proxy': TableSpec('https://www.us-proxy.org', _FREE_PROXY_LIST_COLUMNS, _get_https_column_type)
+}
+
+get_anonymous_proxies = create_table_scraper('anonymous-proxy', TABLE_SPECS['anonymous-proxy'])
+get_free_proxy_list_proxies = create_table_scraper('free-proxy-list', TABLE_SPECS['free-proxy-list'])
+get_socks_proxies = create_table_scraper('socks-proxy', TABLE_SPECS['socks-proxy'])
+get_ssl_proxies = create_table_scraper('ssl-proxy', TABLE_SPECS['ssl-proxy'])
+get_uk_proxies = create_table_scraper('uk-proxy', TABLE_SPECS['uk-proxy'])
+get_us_proxies = create_table_scraper('us-proxy', TABLE_SPECS['us-proxy'])
 
 
-def add_resource(name, func, resource_types=None):
+def add_resource(name, func, resource_types=None, timeout=None, attributes=None):
     """Adds a new resource, which is representative of a function that scrapes a particular set of proxies.
 
     :param name:
@@ -325,9 +536,19 @@ def add_resource(name, func, resource_types=None):
         The scraping function.
     :param resource_types:
         (optional) The resource types to add the resource to. Can either be a single or sequence of resource types.
+    :param timeout:
+        (optional) The timeout (in seconds) of requests made by the scraping function, either as a single value or a
+        (connect, read) tuple. Defaults to None (the session's default timeout).
+    :param attributes:
+        (optional) The only values of specific filter options which the resource's proxies can have (i.e. {'code':
+        'us'}), so collectors can skip refreshing it for filters it can't match. Membership in `resource_types` says
+        nothing about the proxies' types, so a fixed type should be given as the 'type' attribute. Defaults to None
+        (any values).
     :type name: string
     :type func: function
     :type resource_types: iterable or string or None
+    :type timeout: float or tuple or None
+    :type attributes: dict or None
     :raises InvalidResourceTypeError:
         If 'resource_types' is defined are does not represent defined resource types.
     :raises ResourceAlreadyDefinedError:
@@ -352,6 +573,13 @@ def add_resource(name, func, resource_types=None):
 
         RESOURCE_MAP[name] = func
 
+        if timeout is not None:
+            RESOURCE_TIMEOUT_MAP[name] = timeout
+
+        if attributes:
+            RESOURCE_ATTRIBUTE_MAP[name] = {key: set(value) if is_iterable(value) else {value, }
+                                            for key, value in attributes.items()}
+
         if resource_types is not None:
             for resource_type in resource_types:
                 RESOURCE_TYPE_MAP[resource_type].add(name)
@@ -395,6 +623,36 @@ def add_resource_type(name, resources=None):
         RESOURCE_TYPE_MAP[name] = resources
 
 
+def add_table_resource(name, spec, resource_types=None, timeout=None, attributes=None):
+    """Adds a new resource scraping proxies from a table on a web page, as defined by a `TableSpec`.
+
+    Resources scraping the same table of a page share a single request and parse of it.
+
+    :param name:
+        An identifier for the resource.
+    :param spec:
+        The definition of the table.
+    :param resource_types:
+        (optional) The resource types to add the resource to. Can either be a single or sequence of resource types.
+    :param timeout:
+        (optional) The timeout (in seconds) of requests for the page, either as a single value or a (connect, read)
+        tuple. Defaults to None (the session's default timeout).
+    :param attributes:
+        (optional) The only values of specific filter options which the resource's proxies can have (i.e. {'code':
+        'us'}). Defaults to None (any values).
+    :type name: string
+    :type spec: TableSpec
+    :type resource_types: iterable or string or None
+    :type timeout: float or tuple or None
+    :type attributes: dict or None
+    :raises InvalidResourceTypeError:
+        If 'resource_types' is defined are does not represent defined resource types.
+    :raises ResourceAlreadyDefinedError:
+        If 'name' is already a defined resource.
+    """
+    add_resource(name, create_table_scraper(name, spec), resource_types, timeout, attributes)
+
+
 def get_resource_types():
     """Returns a set of the resource types.
 
@@ -427,6 +685,44 @@ RESOURCE_MAP = {
     'us-proxy': get_us_proxies
 }
 
+# Request timeouts of resources not using the session's default timeout
+RESOURCE_TIMEOUT_MAP = {}
+
+# Values of filter options that are fixed for all proxies of a resource
+RESOURCE_ATTRIBUTE_MAP = {
+    'anonymous-proxy': {
+        'type': {'http', 'https'}
+    },
+    'free-proxy-list': {
+        'type': {'http', 'https'}
+    },
+    'proxy-daily-http': {
+        'type': {'http'}
+    },
+    'proxy-daily-socks4': {
+        'type': {'socks4'}
+    },
+    'proxy-daily-socks5': {
+        'type': {'socks5'}
+    },
+    'socks-proxy': {
+        'type': {'socks4', 'socks5'}
+    },
+    'ssl-proxy': {
+        'type': {'https'}
+    },
+    'uk-proxy': {
+        'code': {'uk', 'gb'},
+        'country': {'united kingdom'},
+        'type': {'http', 'https'}
+    },
+    'us-proxy': {
+        'code': {'us'},
+        'country': {'united states'},
+        'type': {'http', 'https'}
+    }
+}
+
 RESOURCE_TYPE_MAP = {
     'http': {
         'us-proxy',
@@ -0,0 +1,471 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""A pool server owning a collector, serving its proxies to clients over a UNIX or TCP socket.
+
+The server keeps the collector's proxies, refreshes, blacklist and health state in a single long-lived process, while
+any number of processes on the host (or network) retrieve proxies from it through a `PoolClient`.
+
+Requests and responses are framed as the length of their payload (a 4-byte big-endian int) followed by the payload, a
+UTF-8 JSON array. A request is the name of a collector method and its arguments, ["get_proxy", [filter_opts, key]], and
+a response either its result, [0, result], or the error it raised, [1, error name, message]. Proxies are sent as arrays
+of their fields, or of their host and port where that's all the collector uses.
+
+Usage:
+    $ python -m proxyscrape.server --unix /run/proxyscrape.sock --resource-types http https
+"""
+
+__all__ = ['PoolServer', 'main']
+
+
+import argparse
+import importlib
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+from threading import Lock, Thread
+
+try:
+    import socketserver
+except ImportError:  # Python 2
+    import SocketServer as socketserver
+
+from .errors import PoolServerError
+from .proxyscrape import create_collector
+from .shared import Proxy
+
+
+# The header of a frame: the size of its payload
+_FRAME_HEADER = struct.Struct('!I')
+
+# Maximum size of a frame's payload, past which the connection is closed
+_MAX_FRAME_SIZE = 1 << 26
+
+# Statuses of a response
+_OK = 0
+_ERROR = 1
+
+# Maximum number of encoded results of `get_proxies(...)` kept, which are reused while the collector returns the same
+# tuple of proxies
+_MAX_ENCODED_PROXIES = 32
+
+
+def _encode_default(obj):
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError('{!r} is not JSON serializable'.format(obj))
+
+
+def _encode(obj):
+    return json.dumps(obj, separators=(',', ':'), default=_encode_default).encode('utf-8')
+
+
+def _decode(payload):
+    return json.loads(payload.decode('utf-8'))
+
+
+def _frame(payload):
+    return _FRAME_HEADER.pack(len(payload)) + payload
+
+
+def _read_frame(read):
+    # Returns the payload of the next frame, or None if the stream ended
+    header = read(_FRAME_HEADER.size)
+    if len(header) < _FRAME_HEADER.size:
+        return None
+
+    size, = _FRAME_HEADER.unpack(header)
+    if size > _MAX_FRAME_SIZE:
+        raise PoolServerError('Frame of {} bytes exceeds the maximum of {} bytes'.format(size, _MAX_FRAME_SIZE))
+
+    payload = read(size)
+    if len(payload) < size:
+        return None
+
+    return payload
+
+
+def _encode_proxy(proxy):
+    return _encode(None if proxy is None else list(proxy))
+
+
+def _decode_addresses(proxies):
+    return None if proxies is None else [tuple(p) for p in proxies]
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles the requests of a connection, one at a time, until it's closed."""
+    def setup(self):
+        socketserver.StreamRequestHandler.setup(self)
+
+        if self.connection.family != getattr(socket, 'AF_UNIX', None):
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        self.server.pool_server._add_connection(self.connection)
+
+    def handle(self):
+        dispatch = self.server.pool_server._dispatch
+        read = self.rfile.read
+        send = self.connection.sendall
+
+        try:
+            while True:
+                payload = _read_frame(read)
+                if payload is None:
+                    return
+
+                send(_frame(dispatch(payload)))
+        except (PoolServerError, socket.error):
+            # Oversized frames and broken connections close the connection
+            return
+
+    def finish(self):
+        self.server.pool_server._remove_connection(self.connection)
+        socketserver.StreamRequestHandler.finish(self)
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _TCP6Server(_TCPServer):
+    address_family = socket.AF_INET6
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:  # Windows
+    _UnixServer = None
+
+
+def _remove_stale_socket(path):
+    # Removes the socket of a server that's no longer running, such as one that was killed
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except OSError:
+        return
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except socket.error:
+        os.remove(path)
+    else:
+        raise PoolServerError('A pool server is already listening on {}'.format(path))
+    finally:
+        probe.close()
+
+
+class PoolServer:
+    """A server retrieving proxies from a collector on behalf of its clients.
+
+    Each connection is served by its own thread, handling its requests in order, and every client shares the
+    collector's proxies, refreshes, filter, blacklist and health state.
+
+    :param collector:
+        The collector serving the proxies.
+    :param address:
+        The address to listen on, either the path of a UNIX socket or a (host, port) combination of a TCP socket. A
+        port of 0 listens on any free port, as given by `address` once created.
+    :type collector: Collector
+    :type address: string or tuple
+    :raises PoolServerError:
+        If a server is already listening on the UNIX socket.
+    """
+    def __init__(self, collector, address):
+        self.collector = collector
+
+        if isinstance(address, str):
+            if _UnixServer is None:
+                raise PoolServerError('UNIX sockets aren\'t supported on this platform')
+            _remove_stale_socket(address)
+            self._server = _UnixServer(address, _RequestHandler)
+        else:
+            host, port = address
+            server_class = _TCP6Server if ':' in host else _TCPServer
+            self._server = server_class((host, port), _RequestHandler)
+
+        self._server.pool_server = self
+        self._serving = False
+        self._closed = False
+
+        self._connections = set()
+        self._connections_lock = Lock()
+
+        self._encoded_proxies = {}
+        self._encoded_proxies_lock = Lock()
+
+        self._methods = {
+            'available_at': self._available_at,
+            'apply_filter': self._apply_filter,
+            'blacklist_proxy': self._blacklist_proxy,
+            'clear_blacklist': self._clear_blacklist,
+            'clear_filter': self._clear_filter,
+            'get_proxy': self._get_proxy,
+            'get_proxies': self._get_proxies,
+            'get_resource_states': self._get_resource_states,
+            'refresh_proxies': self._refresh_proxies,
+            'remove_blacklist': self._remove_blacklist,
+            'remove_proxy': self._remove_proxy,
+            'report_failure': self._report_failure,
+            'report_success': self._report_success
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def address(self):
+        """The address the server is listening on."""
+        return self._server.server_address
+
+    def _add_connection(self, connection):
+        with self._connections_lock:
+            self._connections.add(connection)
+
+    def _remove_connection(self, connection):
+        with self._connections_lock:
+            self._connections.discard(connection)
+
+    def _dispatch(self, payload):
+        # Returns the encoded response to the request
+        try:
+            try:
+                method, args = _decode(payload)
+            except (TypeError, ValueError):
+                raise ValueError('Invalid request')
+
+            call = self._methods.get(method) if isinstance(method, str) else None
+            if call is None:
+                raise ValueError('Unknown method: {!r}'.format(method))
+
+            result = call(*args)
+        except Exception as e:
+            return _encode([_ERROR, type(e).__name__, str(e)])
+
+        return b'[0,' + result + b']'
+
+    def _available_at(self, filter_opts=None):
+        return _encode(self.collector.available_at(filter_opts))
+
+    def _apply_filter(self, filter_opts):
+        self.collector.apply_filter(filter_opts)
+        return b'null'
+
+    def _blacklist_proxy(self, proxies=None, host=None, port=None):
+        self.collector.blacklist_proxy(_decode_addresses(proxies), host, port)
+        return b'null'
+
+    def _clear_blacklist(self):
+        self.collector.clear_blacklist()
+        return b'null'
+
+    def _clear_filter(self):
+        self.collector.clear_filter()
+        return b'null'
+
+    def _get_proxy(self, filter_opts=None, key=None):
+        return _encode_proxy(self.collector.get_proxy(filter_opts, key))
+
+    def _get_proxies(self, filter_opts=None):
+        proxies = self.collector.get_proxies(filter_opts)
+
+        if proxies is None:
+            return b'null'
+
+        # The collector returns the same tuple until the proxies or blacklist change, so its encoding is reused
+        with self._encoded_proxies_lock:
+            cached = self._encoded_proxies.get(id(proxies))
+
+        if cached is not None and cached[0] is proxies:
+            return cached[1]
+
+        encoded = _encode([list(p) for p in proxies])
+
+        with self._encoded_proxies_lock:
+            if len(self._encoded_proxies) >= _MAX_ENCODED_PROXIES:
+                self._encoded_proxies.clear()
+            self._encoded_proxies[id(proxies)] = (proxies, encoded)
+
+        return encoded
+
+    def _get_resource_states(self):
+        return _encode(self.collector.get_resource_states())
+
+    def _refresh_proxies(self, force=True):
+        self.collector.refresh_proxies(force)
+        return b'null'
+
+    def _remove_blacklist(self, proxies=None, host=None, port=None):
+        self.collector.remove_blacklist(_decode_addresses(proxies), host, port)
+        return b'null'
+
+    def _remove_proxy(self, proxies):
+        self.collector.remove_proxy([Proxy(*p) for p in proxies])
+        return b'null'
+
+    def _report_failure(self, proxy):
+        self.collector.report_failure(tuple(proxy))
+        return b'null'
+
+    def _report_success(self, proxy, latency=None):
+        self.collector.report_success(tuple(proxy), latency)
+        return b'null'
+
+    def serve_forever(self, poll_interval=0.5):
+        """Serves clients until `shutdown()` or `close()` is called.
+
+        :param poll_interval:
+            (optional) The amount of time (in seconds) between checks for a shutdown. Defaults to 0.5.
+        :type poll_interval: float
+        """
+        self._serving = True
+        try:
+            self._server.serve_forever(poll_interval)
+        finally:
+            self._serving = False
+
+    def start(self):
+        """Serves clients from a background thread.
+
+        :return:
+            The server.
+        :rtype: PoolServer
+        """
+        self._serving = True
+        thread = Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def shutdown(self):
+        """Stops serving clients, waiting for `serve_forever()` to return. Connected clients stay connected."""
+        if self._serving:
+            self._server.shutdown()
+
+    def close(self):
+        """Stops serving clients, closing their connections and the server's socket."""
+        if self._closed:
+            return
+        self._closed = True
+
+        self.shutdown()
+
+        with self._connections_lock:
+            connections = list(self._connections)
+
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+
+        self._server.server_close()
+
+        if self._server.address_family == getattr(socket, 'AF_UNIX', None):
+            try:
+                os.remove(self.address)
+            except OSError:
+                pass
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog='proxyscrape.server', description='Serves proxies to pool clients.')
+    address = parser.add_mutually_exclusive_group()
+    address.add_argument('--unix', metavar='PATH', help='path of the UNIX socket to listen on')
+    address.add_argument('--host', default='127.0.0.1',
+                         help='host of the TCP socket to listen on (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=8899,
+                        help='port of the TCP socket to listen on (default: %(default)s)')
+    parser.add_argument('--resource-types', nargs='+', metavar='TYPE', help='resource types to scrape')
+    parser.add_argument('--resources', nargs='+', metavar='RESOURCE', help='resources to scrape')
+    parser.add_argument('--import', dest='modules', action='append', default=[], metavar='MODULE',
+                        help='module to import before creating the collector, such as one adding resources')
+    parser.add_argument('--refresh-interval', type=int, default=3600,
+                        help='seconds between refreshes of the resources (default: %(default)s)')
+    parser.add_argument('--background-refresh', action='store_true', help='refresh expired resources in the background')
+    parser.add_argument('--max-staleness', type=float, help='seconds past the refresh interval proxies may be served')
+    parser.add_argument('--elite', action='store_true',
+                        help='scrape the didsoft proxy list at --external-url instead of the public resources')
+    parser.add_argument('--external-url', metavar='URL', help='URL of the didsoft proxy list scraped with --elite')
+    parser.add_argument('--store', default='memory', choices=['memory', 'columnar', 'sqlite'],
+                        help='backend storing the proxies (default: %(default)s)')
+    parser.add_argument('--strategy', default='random', choices=['random', 'round-robin', 'lru', 'weighted'],
+                        help='selection of proxies (default: %(default)s)')
+    parser.add_argument('--rate-limit', type=float, help='maximum retrievals per second of each proxy')
+    parser.add_argument('--rate-burst', type=int, default=1, help='retrievals of a proxy allowed at once')
+    parser.add_argument('--snapshot', metavar='PATH', help='path of the snapshot of the proxies')
+
+    args = parser.parse_args(argv)
+    if not args.resource_types and not args.resources:
+        parser.error('either --resource-types or --resources is required')
+    if args.elite and not args.external_url:
+        parser.error('--elite requires --external-url')
+
+    return args
+
+
+def main(argv=None):
+    """Runs a pool server with a collector created from the command line arguments, until interrupted or terminated.
+
+    :param argv:
+        (optional) The command line arguments. Defaults to those of the process.
+    :type argv: list or None
+    """
+    args = _parse_args(argv)
+
+    for module in args.modules:
+        importlib.import_module(module)
+
+    collector = create_collector('pool-server', args.resource_types, args.refresh_interval, args.resources,
+                                 args.elite, args.external_url, background_refresh=args.background_refresh,
+                                 max_staleness=args.max_staleness, store=args.store, rate_limit=args.rate_limit,
+                                 rate_burst=args.rate_burst, strategy=args.strategy, snapshot=args.snapshot)
+
+    # Resources are refreshed before serving, unless loaded from a recent snapshot, so clients don't wait on them
+    collector.refresh_proxies(force=False)
+
+    def terminate(signum, frame):
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, terminate)
+
+    with PoolServer(collector, args.unix or (args.host, args.port)) as server:
+        sys.stderr.write('Serving proxies on {}\n'.format(server.address))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
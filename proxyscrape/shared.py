@@ -21,24 +21,343 @@
 # SOFTWARE.
 
 
-__all__ = ['is_iterable', 'Proxy', 'request_proxy_list']
+__all__ = ['configure_session', 'get_session', 'is_iterable', 'Proxy', 'request_proxy_list', 'request_timeout']
 
 
-from collections import namedtuple
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import total_ordering
+from threading import Lock, local
+import io
+import os
+import re
+import socket
+import struct
+import tempfile
 
 import requests
+from requests.packages.urllib3.util.retry import Retry
 
 from .errors import (
     RequestFailedError,
     RequestNotOKError
 )
 
-Proxy = namedtuple('Proxy', ['host', 'port', 'code', 'country', 'anonymous', 'type', 'source'])
+# Canonical decimal port numbers, which can be packed into an int losslessly (as can canonical IPv4 addresses)
+_PORT_PATTERN = re.compile(r'^(?:0|[1-9][0-9]{0,4})$')
 
+# Replaces the destination even if it exists, which os.rename doesn't on Windows or Python 2
+_replace = getattr(os, 'replace', os.rename)
+
+# Shared instances of categorical strings (code, country, type, source)
+_interned = {}
+
+# The (host, port) of recently accessed packed addresses, cleared once full, so proxies keep only their packed address
+_unpacked_addresses = {}
+_MAX_UNPACKED_ADDRESSES = 8192
+
+
+def _write_atomically(path, chunks):
+    # Writes the chunks to a temporary file that then replaces `path`, so readers never see a partial file
+    fd, temp_path = tempfile.mkstemp(prefix='.proxyscrape-', dir=os.path.dirname(os.path.abspath(path)))
+
+    try:
+        with io.open(fd, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+
+        _replace(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+def _intern(value):
+    if isinstance(value, str):
+        return _interned.setdefault(value, value)
+    return value
+
+
+def _pack_address(host, port):
+    # Packs the host and port into a single int as (IPv4 << 16) | port, or keeps them as is if not canonical
+    if type(host) is not str or type(port) is not str or not _PORT_PATTERN.match(port):
+        return host, port
+
+    try:
+        packed = socket.inet_aton(host)
+    except (socket.error, ValueError):
+        return host, port
+
+    port_number = int(port)
+    if port_number > 65535 or socket.inet_ntoa(packed) != host:
+        return host, port
+
+    return (struct.unpack('!I', packed)[0] << 16) | port_number
+
+
+def _unpack_address(address):
+    if isinstance(address, tuple):
+        return address
+
+    return socket.inet_ntoa(struct.pack('!I', address >> 16)), str(address & 0xFFFF)
+
+
+def _cache_unpacked_address(address):
+    # Returns the (host, port) of an address missing from `_unpacked_addresses`, caching it if packed
+    if isinstance(address, tuple):
+        return address
+
+    if len(_unpacked_addresses) >= _MAX_UNPACKED_ADDRESSES:
+        _unpacked_addresses.clear()
+
+    host, port = _unpack_address(address)
+    unpacked = _unpacked_addresses[address] = host, _intern(port)
+    return unpacked
+
+
+def _host_port(proxy):
+    # Returns the (host, port) of a proxy, or of an equivalent tuple, without unpacking cached addresses again
+    try:
+        address = proxy._address
+    except AttributeError:
+        return proxy[0], proxy[1]
+
+    return _unpacked_addresses.get(address) or _cache_unpacked_address(address)
+
+
+@total_ordering
+class Proxy(object):
+    """A compact, immutable record of a proxy.
+
+    Behaves as a `namedtuple` of (host, port, code, country, anonymous, type, source): fields can be accessed by
+    attribute or index, and proxies unpack, compare, and hash as the equivalent tuple. IPv4 hosts are packed together
+    with their port into a single int, categorical fields share interned strings, and the hash is computed once. The
+    (host, port) of a packed address is unpacked when accessed, through a cache of recently accessed addresses shared
+    by every proxy, so proxies stay packed however they're used.
+    """
+    __slots__ = ('_address', '_code', '_country', '_anonymous', '_type', '_source', '_hash')
+
+    _fields = ('host', 'port', 'code', 'country', 'anonymous', 'type', 'source')
+
+    def __init__(self, host, port, code, country, anonymous, type, source):
+        self._address = _pack_address(host, port)
+        self._code = _intern(code)
+        self._country = _intern(country)
+        self._anonymous = anonymous
+        self._type = _intern(type)
+        self._source = _intern(source)
+        self._hash = hash((host, port, code, country, anonymous, type, source))
+
+    @classmethod
+    def _make(cls, iterable):
+        return cls(*iterable)
+
+    @classmethod
+    def _from_address(cls, address, code, country, anonymous, type, source):
+        # Creates a proxy from an address that's already packed, with fields that are already interned
+        proxy = cls.__new__(cls)
+        proxy._address = address
+        key = _unpack_address(address)
+        proxy._code = code
+        proxy._country = country
+        proxy._anonymous = anonymous
+        proxy._type = type
+        proxy._source = source
+        proxy._hash = hash(key + (code, country, anonymous, type, source))
+        return proxy
+
+    @property
+    def host(self):
+        return (_unpacked_addresses.get(self._address) or _cache_unpacked_address(self._address))[0]
+
+    @property
+    def port(self):
+        return (_unpacked_addresses.get(self._address) or _cache_unpacked_address(self._address))[1]
+
+    @property
+    def code(self):
+        return self._code
+
+    @property
+    def country(self):
+        return self._country
+
+    @property
+    def anonymous(self):
+        return self._anonymous
+
+    @property
+    def type(self):
+        return self._type
+
+    @property
+    def source(self):
+        return self._source
+
+    def _asdict(self):
+        return OrderedDict(zip(self._fields, self))
+
+    def _replace(self, **kwargs):
+        values = self._asdict()
+        values.update(kwargs)
+        return Proxy(**values)
+
+    def __eq__(self, other):
+        if isinstance(other, Proxy):
+            return self._hash == other._hash and self._address == other._address and \
+                (self._code, self._country, self._anonymous, self._type, self._source) == \
+                (other._code, other._country, other._anonymous, other._type, other._source)
+
+        if isinstance(other, tuple):
+            return tuple(self) == other
+
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __lt__(self, other):
+        if isinstance(other, (Proxy, tuple)):
+            return tuple(self) < tuple(other)
+
+        return NotImplemented
+
+    def __hash__(self):
+        return self._hash
+
+    def __getitem__(self, index):
+        if index == 0 or index == 1:
+            return (_unpacked_addresses.get(self._address) or _cache_unpacked_address(self._address))[index]
+
+        return tuple(self)[index]
+
+    def __iter__(self):
+        host, port = _unpacked_addresses.get(self._address) or _cache_unpacked_address(self._address)
+        return iter((host, port, self._code, self._country, self._anonymous, self._type, self._source))
+
+    def __len__(self):
+        return 7
+
+    def __reduce__(self):
+        return Proxy, tuple(self)
+
+    def __repr__(self):
+        return 'Proxy(%s)' % ', '.join('%s=%r' % item for item in zip(self._fields, self))
+
+
+# Settings of the pooled session used to request proxy lists
+_session_config = {
+    'pool_connections': 10,
+    'pool_maxsize': 10,
+    'max_retries': 2,
+    'backoff_factor': 0.5,
+    'timeout': (5, 30)
+}
+
+# The connection pool is shared by every thread of a process, and is recreated in forked processes
+_adapter = None
+_adapter_pid = None
+_adapter_lock = Lock()
+
+# Per-thread session and request timeout
+_local = local()
+
+
+def _get_adapter():
+    global _adapter, _adapter_pid
+
+    pid = os.getpid()
+    if _adapter is None or _adapter_pid != pid:
+        with _adapter_lock:
+            if _adapter is None or _adapter_pid != pid:
+                retries = Retry(total=_session_config['max_retries'],
+                                backoff_factor=_session_config['backoff_factor'],
+                                status_forcelist=(500, 502, 503, 504),
+                                raise_on_status=False)
+                _adapter = requests.adapters.HTTPAdapter(pool_connections=_session_config['pool_connections'],
+                                                         pool_maxsize=_session_config['pool_maxsize'],
+                                                         max_retries=retries)
+                _adapter_pid = pid
+
+    return _adapter
+
+
+def configure_session(pool_connections=10, pool_maxsize=10, max_retries=2, backoff_factor=0.5, timeout=(5, 30)):
+    """Configures the pooled session used to request proxy lists.
+
+    Connections are kept alive and reused across resources requesting the same host.
+
+    :param pool_connections:
+        (optional) The number of hosts to keep connection pools for. Defaults to 10.
+    :param pool_maxsize:
+        (optional) The maximum number of connections kept alive per host. Defaults to 10.
+    :param max_retries:
+        (optional) The number of times a failed request (connection errors or 5xx responses) is retried. Defaults to
+        2.
+    :param backoff_factor:
+        (optional) The factor (in seconds) of the exponential backoff between retries. Defaults to 0.5.
+    :param timeout:
+        (optional) The default timeout (in seconds) of requests, either as a single value or a (connect, read)
+        tuple. Defaults to (5, 30).
+    :type pool_connections: int
+    :type pool_maxsize: int
+    :type max_retries: int
+    :type backoff_factor: float
+    :type timeout: float or tuple
+    """
+    global _adapter
+
+    with _adapter_lock:
+        _session_config.update(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries,
+                               backoff_factor=backoff_factor, timeout=timeout)
+        _adapter = None
+
+
+def get_session():
+    """Returns the session of the current thread, which uses the process-wide connection pool.
+
+    :return:
+        The session.
+    :rtype: requests.Session
+    """
+    adapter = _get_adapter()
+    session = getattr(_local, 'session', None)
+
+    if session is None or _local.adapter is not adapter:
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _local.session = session
+        _local.adapter = adapter
+
+    return session
+
+
+@contextmanager
+def request_timeout(timeout):
+    """Sets the timeout of proxy list requests made by the current thread within the context.
+
+    :param timeout:
+        The timeout (in seconds), either as a single value or a (connect, read) tuple. If None, the default timeout
+        is used.
+    :type timeout: float or tuple or None
+    """
+    previous = getattr(_local, 'timeout', None)
+    _local.timeout = timeout
+
+    try:
+        yield
+    finally:
+        _local.timeout = previous
+
+
+def request_proxy_list(url, timeout=None):
+    if timeout is None:
+        timeout = getattr(_local, 'timeout', None) or _session_config['timeout']
 
-def request_proxy_list(url):
     try:
-        response = requests.get(url)
+        response = get_session().get(url, timeout=timeout)
     except requests.RequestException:
         raise RequestFailedError()
 
@@ -0,0 +1,128 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Snapshots of the proxies retrieved by a collector, used to warm-start collectors without scraping every resource.
+
+A snapshot is a line-oriented file. The first line identifies the format, and every other line is the JSON encoding of
+a single resource: its name, the time it was last refreshed, and its proxies. Proxies are grouped by their fields other
+than the host and port, and IPv4 addresses are kept packed with their port as single ints, so snapshots stay compact
+and proxies are loaded without parsing their addresses.
+"""
+
+import io
+import json
+
+from .shared import Proxy, _intern, _pack_address, _write_atomically
+
+
+# Identifies the format of a snapshot, changed whenever the format does
+_SNAPSHOT_HEADER = {'format': 'proxyscrape-snapshot', 'version': 1}
+
+
+def _encode_line(obj):
+    return (json.dumps(obj, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def _encode_proxies(proxies):
+    # Returns the groups of the proxies as (fields, packed addresses, other (host, port))
+    groups = {}
+    for proxy in proxies:
+        address = getattr(proxy, '_address', None)
+        if address is None:
+            address = _pack_address(proxy[0], proxy[1])
+
+        addresses, irregular = groups.setdefault(tuple(proxy[2:]), ([], []))
+        if isinstance(address, tuple):
+            irregular.append(address)
+        else:
+            addresses.append(address)
+
+    return [[fields, addresses, irregular] for fields, (addresses, irregular) in groups.items()]
+
+
+def _decode_proxies(groups):
+    proxies = set()
+    for fields, addresses, irregular in groups:
+        fields = [_intern(value) for value in fields]
+        proxies.update(Proxy._from_address(address, *fields) for address in addresses)
+        proxies.update(Proxy(host, port, *fields) for host, port in irregular)
+
+    return proxies
+
+
+def _encode_snapshot(resources):
+    yield _encode_line(_SNAPSHOT_HEADER)
+
+    for name, last_refresh_time, proxies in resources:
+        yield _encode_line({
+            'resource': name,
+            'refreshed': last_refresh_time,
+            'proxies': _encode_proxies(proxies)
+        })
+
+
+def save_snapshot(path, resources):
+    """Saves a snapshot of the proxies of the given resources.
+
+    The snapshot is written to a temporary file that then replaces `path`, so readers never see a partial snapshot.
+
+    :param path:
+        The path of the snapshot.
+    :param resources:
+        The (name, last refresh time, proxies) of each resource.
+    :type path: string
+    :type resources: iterable
+    :raises IOError:
+        If the snapshot couldn't be written.
+    """
+    _write_atomically(path, _encode_snapshot(resources))
+
+
+def load_snapshot(path):
+    """Loads a snapshot of the proxies of resources.
+
+    :param path:
+        The path of the snapshot.
+    :type path: string
+    :return:
+        A mapping of each resource's name to the time it was last refreshed and its proxies.
+    :rtype: dict
+    :raises IOError:
+        If the snapshot couldn't be read.
+    :raises ValueError:
+        If the file isn't a valid snapshot.
+    """
+    resources = {}
+
+    with io.open(path, 'rb') as f:
+        if json.loads(f.readline().decode('utf-8') or 'null') != _SNAPSHOT_HEADER:
+            raise ValueError('{} is not a snapshot of a supported format'.format(path))
+
+        for line in f:
+            try:
+                resource = json.loads(line.decode('utf-8'))
+                proxies = _decode_proxies(resource['proxies'])
+                resources[resource['resource']] = (float(resource['refreshed']), proxies)
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError('{} is not a valid snapshot: {}'.format(path, e))
+
+    return resources
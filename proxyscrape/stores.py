@@ -20,9 +20,30 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from threading import Lock
+from array import array
+from bisect import bisect_left, bisect_right
+from binascii import hexlify, unhexlify
+from functools import partial
+from heapq import heapify, heappop, heappush, heapreplace
+from itertools import compress, count
+from threading import Lock, local
+import atexit
+import hashlib
+import operator
+import os
 import random
+import sqlite3
+import struct
+import tempfile
 import uuid
+import weakref
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from .shared import Proxy, _host_port, _intern, _pack_address
 
 
 FILTER_OPTIONS = {
@@ -33,34 +54,642 @@ FILTER_OPTIONS = {
 }
 
 
+# Order of the filter options making up the key of a partition
+_PARTITION_KEYS = tuple(sorted(FILTER_OPTIONS))
+# Positions in a partition key of the (code, country, anonymous, type) of a proxy
+_KEY_FIELD_INDEXES = tuple(_PARTITION_KEYS.index(attr) for attr in ('code', 'country', 'anonymous', 'type'))
+
+# Number of random draws made before falling back to a scan of the matching proxies (i.e. most are blacklisted)
+_MAX_SAMPLE_ATTEMPTS = 16
+
+# Fields of a proxy stored as small-int codes by the columnar store, following the host and port
+_CODED_FIELDS = ('code', 'country', 'anonymous', 'type', 'source')
+_coded_fields = operator.attrgetter(*_CODED_FIELDS)
+
+# Calls a function once an object is garbage collected or at exit, which Python 2 lacks
+_finalize = getattr(weakref, 'finalize', None)
+
+# Number of filters whose matches are kept by each internal store
+_MAX_CACHED_MATCHES = 32
+
+# Number of points of each proxy on the hash rings assigning keys to proxies (a multiple of 8, as each SHA-512 digest
+# gives 8 points)
+_RING_REPLICAS = 16
+
+# Weight given to the latest report by the moving averages of proxy health, and the lowest weight of an unhealthy
+# proxy (so it's still retrieved now and then, and can recover)
+_HEALTH_ALPHA = 0.3
+_MIN_HEALTH_WEIGHT = 0.01
+
+
+class _CompiledFilter(dict):
+    """A filter of frozen values, along with a key identifying it."""
+    __slots__ = ('key', )
+
+
+def compile_filter(filter_opts):
+    """Compiles a filter into a normalized form which stores can look up their matches of without re-freezing it.
+
+    :param filter_opts:
+        Options to filter the proxies by, with each value being a collection of accepted values.
+    :type filter_opts: dict or None
+    :return:
+        The compiled filter.
+    :rtype: dict
+    """
+    compiled = _CompiledFilter((attr, frozenset(values)) for attr, values in (filter_opts or {}).items())
+    compiled.key = tuple(sorted(compiled.items()))
+    return compiled
+
+
+def _filter_key(filter_opts):
+    if isinstance(filter_opts, _CompiledFilter):
+        return filter_opts.key
+    return tuple(sorted((attr, frozenset(values)) for attr, values in filter_opts.items()))
+
+
+def _cache_match(matches, key, matched):
+    # Matches are never stale as internal stores are immutable, so the cache is only bounded in size
+    if len(matches) >= _MAX_CACHED_MATCHES:
+        matches.clear()
+    matches[key] = matched
+
+
+class _IndexedSet:
+    """A set of proxies supporting uniform random selection in constant time.
+
+    Items are kept in an indexable list alongside a map of their positions. Removal swaps the last item into the
+    position of the removed one, so additions and removals stay constant time as well.
+    """
+    __slots__ = ('_items', '_positions')
+
+    def __init__(self):
+        self._items = []
+        self._positions = {}
+
+    def __contains__(self, item):
+        return item in self._positions
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, item):
+        if item in self._positions:
+            return
+
+        self._positions[item] = len(self._items)
+        self._items.append(item)
+
+    def copy(self):
+        copy = _IndexedSet()
+        copy._items = list(self._items)
+        copy._positions = dict(self._positions)
+        return copy
+
+    def discard(self, item):
+        position = self._positions.pop(item, None)
+        if position is None:
+            return
+
+        last = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._positions[last] = position
+
+
+class _Partitions:
+    """The proxies of a single store, grouped into partitions by their filter option values.
+
+    Every filter option has posting sets mapping a value to the keys of the partitions holding that value, so a filter
+    is answered by intersecting small sets of keys rather than by visiting every proxy.
+
+    Instances are never modified once published to a `Store`; changes produce a new instance instead.
+    """
+    def __init__(self, proxies=()):
+        # Maps a partition key to its proxies
+        self._partitions = {}
+        # Maps each filter option to its posting sets (value -> partition keys)
+        self._postings = {attr: {} for attr in _PARTITION_KEYS}
+        # Partitions matching recently used filters
+        self._matches = {}
+
+        for proxy in proxies:
+            self._add(proxy)
+
+    def __iter__(self):
+        return (proxy for partition in self._partitions.values() for proxy in partition)
+
+    def __len__(self):
+        return sum(len(partition) for partition in self._partitions.values())
+
+    @staticmethod
+    def _key(proxy):
+        return tuple(getattr(proxy, attr, None) for attr in _PARTITION_KEYS)
+
+    def _add(self, proxy):
+        key = self._key(proxy)
+        partition = self._partitions.get(key)
+
+        if partition is None:
+            partition = _IndexedSet()
+            self._add_partition(key, partition)
+
+        partition.add(proxy)
+
+    def _add_partition(self, key, partition):
+        self._partitions[key] = partition
+
+        for attr, value in zip(_PARTITION_KEYS, key):
+            self._postings[attr].setdefault(value, set()).add(key)
+
+    def without(self, proxies):
+        """Returns a copy without the given proxies, sharing every partition left untouched."""
+        removed = {}
+        for proxy in proxies:
+            key = self._key(proxy)
+            partition = self._partitions.get(key)
+
+            if partition is not None and proxy in partition:
+                removed.setdefault(key, []).append(proxy)
+
+        if not removed:
+            return self
+
+        copy = _Partitions()
+        copy._partitions = dict(self._partitions)
+        copy._postings = self._postings
+
+        emptied = []
+        for key, keyed_proxies in removed.items():
+            partition = self._partitions[key].copy()
+            for proxy in keyed_proxies:
+                partition.discard(proxy)
+
+            if partition:
+                copy._partitions[key] = partition
+            else:
+                del copy._partitions[key]
+                emptied.append(key)
+
+        if not emptied:
+            return copy
+
+        copy._postings = {attr: dict(postings) for attr, postings in self._postings.items()}
+
+        for key in emptied:
+            for attr, value in zip(_PARTITION_KEYS, key):
+                keys = copy._postings[attr][value].difference({key, })
+                if keys:
+                    copy._postings[attr][value] = keys
+                else:
+                    del copy._postings[attr][value]
+
+        return copy
+
+    def match(self, filter_opts=None):
+        """Returns the partitions whose proxies all match the given filter."""
+        if not filter_opts:
+            return list(self._partitions.values())
+
+        key = _filter_key(filter_opts)
+        partitions = self._matches.get(key)
+
+        if partitions is None:
+            partitions = self._select(filter_opts)
+            _cache_match(self._matches, key, partitions)
+
+        return partitions
+
+    def _select(self, filter_opts):
+        matched_keys = []
+        unindexed_opts = {}
+        for attr, values in filter_opts.items():
+            if attr not in self._postings:
+                unindexed_opts[attr] = values
+                continue
+
+            postings = self._postings[attr]
+            matched = set()
+            for value in values:
+                matched.update(postings.get(value, ()))
+
+            if not matched:
+                return []
+            matched_keys.append(matched)
+
+        # Intersecting from the smallest set keeps every intermediate result as small as possible
+        keys = None
+        for matched in sorted(matched_keys, key=len):
+            keys = matched if keys is None else keys.intersection(matched)
+            if not keys:
+                return []
+
+        partitions = [self._partitions[key] for key in (self._partitions if keys is None else keys)]
+
+        if not unindexed_opts:
+            return partitions
+
+        # Options outside of FILTER_OPTIONS can only be checked per proxy
+        partition = _IndexedSet()
+        for proxy in (p for partition in partitions for p in partition):
+            if all(getattr(proxy, attr, None) in values for attr, values in unindexed_opts.items()):
+                partition.add(proxy)
+        return [partition] if partition else []
+
+
+def _to_bytes(column):
+    return column.tobytes() if hasattr(column, 'tobytes') else column.tostring()
+
+
+def _isin_mask(column, codes, size):
+    # Flags the rows of a coded column holding any of the given codes
+    if numpy is not None:
+        table = numpy.zeros(size, dtype=bool)
+        table[sorted(codes)] = True
+        return table[numpy.frombuffer(column, dtype=column.typecode)]
+
+    table = bytearray(max(size, 256))
+    for code in codes:
+        table[code] = 1
+
+    if column.typecode == 'B':
+        return bytearray(_to_bytes(column).translate(bytes(table)))
+    return bytearray(map(table.__getitem__, column))
+
+
+def _and_masks(mask, other):
+    if numpy is not None:
+        return mask & other
+
+    # The masks are combined as big integers, which ANDs them a machine word at a time
+    if hasattr(int, 'from_bytes'):
+        value = int.from_bytes(mask, 'big') & int.from_bytes(other, 'big')
+        return bytearray(value.to_bytes(len(mask), 'big'))
+
+    value = int(hexlify(mask), 16) & int(hexlify(other), 16)
+    return bytearray(unhexlify('%0*x' % (len(mask) * 2, value)))
+
+
+def _mask_indexes(mask):
+    if numpy is not None:
+        return numpy.flatnonzero(mask)
+
+    if mask.count(1) > len(mask) // 64:
+        return array('L', compress(count(), mask))
+
+    # Few rows match, so they're found by searching for them rather than by visiting every row
+    indexes = array('L')
+    index = mask.find(1)
+    while index != -1:
+        indexes.append(index)
+        index = mask.find(1, index + 1)
+    return indexes
+
+
+def _without_rows(column, rows):
+    # Copies the column without the given rows (in ascending order), a slice between removed rows at a time
+    copy = array(column.typecode)
+    start = 0
+    for row in rows:
+        copy.extend(column[start:row])
+        start = row + 1
+    copy.extend(column[start:])
+    return copy
+
+
+class _Selection:
+    """The rows of a columnar store matching a filter, materialized as proxies only when accessed."""
+    __slots__ = ('_columns', '_indexes')
+
+    def __init__(self, columns, indexes=None):
+        self._columns = columns
+        # None selects every row
+        self._indexes = indexes
+
+    def __getitem__(self, index):
+        return self._columns.proxy(index if self._indexes is None else int(self._indexes[index]))
+
+    def __iter__(self):
+        rows = range(len(self._columns)) if self._indexes is None else self._indexes
+        return (self._columns.proxy(int(row)) for row in rows)
+
+    def __len__(self):
+        return len(self._columns) if self._indexes is None else len(self._indexes)
+
+
+class _Columns:
+    """The proxies of a single store, kept as parallel typed arrays rather than as proxy objects.
+
+    IPv4 hosts and ports are stored as packed integers, and every other field as a small-int code into a table of its
+    distinct values. Filters are answered with vectorized masks over the code columns, using NumPy when it's installed
+    and byte-level operations on the arrays otherwise.
+
+    Instances are never modified once published to a `Store`; changes produce a new instance instead.
+    """
+    def __init__(self, proxies=()):
+        self._hosts = array('L')
+        self._ports = array('H')
+        # Maps the row of a host or port that can't be packed (i.e. not IPv4) to its (host, port)
+        self._irregular = {}
+        # Maps each coded field to its distinct values, and to the code of each value
+        self._values = {field: [] for field in _CODED_FIELDS}
+        self._codes = {field: {} for field in _CODED_FIELDS}
+        self._columns = {}
+        # Rows matching recently used filters
+        self._matches = {}
+
+        # Proxies share few distinct combinations of coded fields, so rows are first coded by their combination
+        combinations = {}
+        rows = array('L')
+
+        for row, proxy in enumerate(set(proxies)):
+            address = getattr(proxy, '_address', None)
+            if address is None:
+                address = _pack_address(proxy[0], proxy[1])
+
+            if isinstance(address, tuple):
+                self._irregular[row] = address
+                address = 0
+
+            self._hosts.append(address >> 16)
+            self._ports.append(address & 0xFFFF)
+
+            try:
+                values = _coded_fields(proxy)
+            except AttributeError:
+                values = tuple(proxy[2:])
+
+            rows.append(combinations.setdefault(values, len(combinations)))
+
+        combinations = sorted(combinations, key=combinations.get)
+
+        for index, field in enumerate(_CODED_FIELDS):
+            codes = [self._encode(field, values[index]) for values in combinations]
+            typecode = 'B' if len(self._values[field]) <= 256 else 'H'
+            self._columns[field] = array(typecode, map(codes.__getitem__, rows))
+
+    def __iter__(self):
+        return (self.proxy(row) for row in range(len(self)))
+
+    def __len__(self):
+        return len(self._hosts)
+
+    def _encode(self, field, value):
+        codes = self._codes[field]
+        code = codes.get(value)
+
+        if code is None:
+            code = codes[value] = len(codes)
+            self._values[field].append(value)
+
+        return code
+
+    def _find(self, proxies):
+        # Returns the rows holding any of the given proxies, in ascending order
+        proxies = set(proxies)
+        addresses = set()
+        irregular = set()
+
+        for proxy in proxies:
+            address = _pack_address(proxy[0], proxy[1])
+            if isinstance(address, tuple):
+                irregular.add(address)
+            else:
+                addresses.add(address)
+
+        rows = [row for row, address in self._irregular.items() if address in irregular]
+
+        if addresses and len(self):
+            # Rows are first narrowed down by host in a single pass over the hosts, whatever the number of proxies
+            hosts = sorted({address >> 16 for address in addresses})
+            if numpy is not None:
+                candidates = numpy.flatnonzero(numpy.isin(numpy.frombuffer(self._hosts, dtype=self._hosts.typecode),
+                                                          hosts))
+            else:
+                candidates = compress(count(), map(frozenset(hosts).__contains__, self._hosts))
+
+            rows.extend(int(row) for row in candidates
+                        if (self._hosts[row] << 16) | self._ports[row] in addresses and row not in self._irregular)
+
+        return sorted(row for row in rows if self.proxy(row) in proxies)
+
+    def proxy(self, row):
+        """Returns the proxy stored at the given row."""
+        values = [self._values[field][self._columns[field][row]] for field in _CODED_FIELDS]
+        address = self._irregular.get(row) if self._irregular else None
+
+        if address is None:
+            return Proxy._from_address((self._hosts[row] << 16) | self._ports[row], *values)
+        return Proxy(address[0], address[1], *values)
+
+    def without(self, proxies):
+        """Returns a copy without the given proxies, copying the columns once however many are removed."""
+        rows = self._find(proxies)
+
+        if not rows:
+            return self
+
+        copy = _Columns()
+        copy._values = self._values
+        copy._codes = self._codes
+        copy._hosts = _without_rows(self._hosts, rows)
+        copy._ports = _without_rows(self._ports, rows)
+        removed = set(rows)
+        copy._irregular = {row - bisect_left(rows, row): address for row, address in self._irregular.items()
+                           if row not in removed}
+        copy._columns = {field: _without_rows(column, rows) for field, column in self._columns.items()}
+        return copy
+
+    def match(self, filter_opts=None):
+        """Returns the rows matching the given filter, as a single partition."""
+        if not len(self):
+            return []
+
+        if not filter_opts:
+            return [_Selection(self)]
+
+        key = _filter_key(filter_opts)
+        selection = self._matches.get(key)
+
+        if selection is None:
+            selection = self._select(filter_opts)
+            _cache_match(self._matches, key, selection)
+
+        return [selection] if len(selection) else []
+
+    def _select(self, filter_opts):
+        mask = None
+        uncoded_opts = {}
+        for attr, values in filter_opts.items():
+            if attr not in self._columns:
+                uncoded_opts[attr] = values
+                continue
+
+            codes = [self._codes[attr][value] for value in values if value in self._codes[attr]]
+            if not codes:
+                return ()
+
+            field_mask = _isin_mask(self._columns[attr], codes, len(self._values[attr]))
+            mask = field_mask if mask is None else _and_masks(mask, field_mask)
+
+        selection = _Selection(self) if mask is None else _Selection(self, _mask_indexes(mask))
+
+        if uncoded_opts:
+            # Options other than the coded fields can only be checked per proxy
+            selection = [proxy for proxy in selection
+                         if all(getattr(proxy, attr, None) in values for attr, values in uncoded_opts.items())]
+
+        return selection
+
+
+def _row_values(proxy):
+    # Returns the (packed address, host, port, source) of a proxy's row, with either the packed address or the host and
+    # port
+    address = getattr(proxy, '_address', None)
+    if address is None:
+        address = _pack_address(proxy[0], proxy[1])
+
+    try:
+        source = proxy.source
+    except AttributeError:
+        source = proxy[6]
+
+    if isinstance(address, tuple):
+        return None, address[0], address[1], source
+    return address, None, None, source
+
+
+class _Rows:
+    """A partition of proxies kept in a SQLite table, as rows at positions 0 to `size - 1`.
+
+    IPv4 addresses are kept packed with their port (as by `Proxy`) in the address column, and other hosts and ports as
+    they are. Removed rows leave a hole at their position, so positions stay valid for readers of an older snapshot. A
+    lookup of a hole returns the next row instead.
+    """
+    __slots__ = ('_connect', 'table', 'id', 'key', 'fields', 'size', 'live')
+
+    def __init__(self, connect, table, id, key, size, live=None):
+        self._connect = connect
+        self.table = table
+        self.id = id
+        self.key = key
+        # The (code, country, anonymous, type) shared by the rows, which only keep the address and source
+        self.fields = tuple(key[index] for index in _KEY_FIELD_INDEXES)
+        self.size = size
+        self.live = size if live is None else live
+
+    def _proxy(self, row):
+        address, host, port, source = row
+        if address is None:
+            return Proxy(host, port, *(self.fields + (source, )))
+        return Proxy._from_address(address, *(self.fields + (_intern(source), )))
+
+    def _query(self, start=0, limit=-1):
+        # Returns the rows from the given position on, up to the limit if not negative
+        try:
+            return self._connect().execute('SELECT address, host, port, source FROM {} WHERE partition = ? AND '
+                                           'position >= ? ORDER BY position LIMIT ?'.format(self.table),
+                                           (self.id, start, limit))
+        except sqlite3.OperationalError as e:
+            # The table is dropped once the store is updated, after which readers of the older snapshot find no rows
+            if 'no such table' not in str(e):
+                raise
+            return iter(())
+
+    def __getitem__(self, index):
+        row = next(iter(self._query(index, 1)), None)
+
+        if row is None and index:
+            row = next(iter(self._query(0, 1)), None)
+
+        # None if every row was removed since the partition was matched
+        return None if row is None else self._proxy(row)
+
+    def __iter__(self):
+        return (self._proxy(row) for row in self._query())
+
+    def __len__(self):
+        return self.size
+
+
+class _Table(_Partitions):
+    """The proxies of a single store kept in a SQLite table, with only their partitions held in memory.
+
+    Instances are never modified once published to a `Store`; changes produce a new instance instead.
+    """
+    def __init__(self, name=None, partitions=()):
+        _Partitions.__init__(self)
+        self.name = name
+
+        for rows in partitions:
+            self._add_partition(rows.key, rows)
+
+
 class Store:
     """An internal store for retrieved proxies.
 
-    Each `ProxyResource` is mapped to an internal 'store' within this class.
+    Each `ProxyResource` is mapped to an internal 'store' within this class. The proxies of every store are grouped
+    into partitions by their `FILTER_OPTIONS` values, which are used to answer filtered lookups and to pick a random
+    proxy without materializing the filtered pool.
+
+    Stores are immutable snapshots. Writers build a replacement off to the side and publish it by swapping in a new
+    mapping of stores under `_lock`, while readers take no lock and always see a complete snapshot.
     """
+    # The type of the internal stores
+    _store_type = _Partitions
+
     def __init__(self):
         # Maps a uuid to a store
         self._stores = {}
         self._lock = Lock()
+        self._version = 0
+        # Maps a filter key to the mapping of stores it was matched against, the matched partitions, and their
+        # cumulative sizes
+        self._matches = {}
 
-    @staticmethod
-    def _filter_proxies(proxies, filter_opts=None, blacklist=None):
-        if not filter_opts:
-            if not blacklist:
-                return proxies
-            return [p for p in proxies if (p[0], p[1]) not in blacklist]
+    def _match(self, filter_opts):
+        # Returns the matching partitions of every store along with their cumulative sizes
+        stores = self._stores
+        key = _filter_key(filter_opts) if filter_opts else ()
+        matched = self._matches.get(key)
+
+        # Any change publishes a new mapping of stores, so matches against the current one are never stale
+        if matched is not None and matched[0] is stores:
+            return matched[1], matched[2]
 
-        def filter_func(proxy):
-            for attr, values in filter_opts.items():
-                if getattr(proxy, attr, None) not in values:
-                    return False
+        partitions = []
+        for store in stores.values():
+            partitions.extend(store.match(filter_opts))
 
-            if blacklist and (proxy[0], proxy[1]) in blacklist:
-                return False
+        cumulative_sizes = []
+        total = 0
+        for partition in partitions:
+            total += len(partition)
+            cumulative_sizes.append(total)
 
-            return True
+        _cache_match(self._matches, key, (stores, partitions, cumulative_sizes))
+        return partitions, cumulative_sizes
 
-        return filter(filter_func, proxies)
+    def _publish(self, id, store):
+        # Must hold `_lock`
+        stores = dict(self._stores)
+        stores[id] = store
+        self._stores = stores
+        self._version += 1
+
+    @property
+    def version(self):
+        """The version of the proxies, which increases whenever they change.
+
+        :rtype: int
+        """
+        return self._version
 
     def add_store(self):
         """Adds a new internal store for use by a single `ProxyResource`.
@@ -70,12 +699,31 @@ class Store:
         :rtype: uuid
         """
         id = uuid.uuid4()
-        self._stores[id] = set()
+
+        with self._lock:
+            self._publish(id, self._store_type())
         return id
 
+    def get_store_proxies(self, id):
+        """Retrieves the proxies of a single internal store.
+
+        :param id:
+            The unique identifier of the store.
+        :type id: uuid
+        :return:
+            The proxies of the store, or an empty list if there's no such store.
+        :rtype: list of Proxy
+        """
+        store = self._stores.get(id)
+        return list(store) if store is not None else []
+
     def get_proxy(self, filter_opts=None, blacklist=None):
         """Retrieves a single proxy.
 
+        A matching partition is chosen in proportion to its size (by bisecting their cumulative sizes, which are cached
+        per filter until the proxies change) and a proxy is then picked from it uniformly at random. Blacklisted proxies
+        are handled by drawing again.
+
         :param filter_opts:
             (optional) Options to filter the proxies by.
         :param blacklist:
@@ -86,12 +734,30 @@ class Store:
             A single proxy matching the given filters.
         :rtype: Proxy or None
         """
-        filtered_proxies = self.get_proxies(filter_opts=filter_opts, blacklist=blacklist)
+        partitions, cumulative_sizes = self._match(filter_opts)
+        total = cumulative_sizes[-1] if cumulative_sizes else 0
 
-        if filtered_proxies is None:
+        if not total:
             return None
 
-        return random.sample(filtered_proxies, 1)[0]
+        for _ in range(_MAX_SAMPLE_ATTEMPTS):
+            index = random.randrange(total)
+            position = bisect_right(cumulative_sizes, index)
+
+            if position:
+                index -= cumulative_sizes[position - 1]
+            proxy = partitions[position][index]
+
+            # Partitions of a `SQLiteStore` give None once all of their rows were removed since they were matched
+            if proxy is not None and (not blacklist or _host_port(proxy) not in blacklist):
+                return proxy
+
+        proxies = [p for partition in partitions for p in partition if not blacklist or _host_port(p) not in blacklist]
+
+        if not proxies:
+            return None
+
+        return random.choice(proxies)
 
     def get_proxies(self, filter_opts=None, blacklist=None):
         """Retrieves all proxies.
@@ -106,17 +772,14 @@ class Store:
             All proxies matching the given filters.
         :rtype: List of Proxy or None
         """
-        proxies = set()
-        for store in self._stores.values():
-            proxies.update(store)
-
-        # No proxies found in any store
-        if not proxies:
-            return None
-
-        filtered_proxies = set(self._filter_proxies(proxies, filter_opts, blacklist))
+        filtered_proxies = set()
+        for partition in self._match(filter_opts)[0]:
+            if blacklist:
+                filtered_proxies.update(p for p in partition if _host_port(p) not in blacklist)
+            else:
+                filtered_proxies.update(partition)
 
-        # No proxies found based on filter
+        # No proxies found in any store or none based on filter
         if not filtered_proxies:
             return None
 
@@ -132,15 +795,231 @@ class Store:
         :type id: uuid
         :type proxy: Proxy
         """
+        self.remove_proxies(id, (proxy, ))
+
+    def remove_proxies(self, id, proxies):
+        """Removes proxies from the internal store, publishing a single new snapshot of the store.
+
+        :param id:
+            The unique identifier of the store.
+        :param proxies:
+            The proxies to remove.
+        :type id: uuid
+        :type proxies: iterable
+        """
+        with self._lock:
+            store = self._stores.get(id)
+
+            if store is not None:
+                without = store.without(proxies)
+                if without is not store:
+                    self._publish(id, without)
+
+    def update_store(self, id, proxies):
+        """Updates the store with the given proxies.
+
+        This replaces the pre-existing proxies of the store with the new ones. The replacement is built before being
+        swapped in, so concurrent readers see either the old or the new proxies but never an empty or partial store.
+
+        :param id:
+            The unique identifier of the store.
+        :param proxies:
+            The proxies to add to the store.
+        :type id: uuid
+        :type proxies: set
+        """
         if id not in self._stores:
             return
 
-        self._stores[id].difference_update({proxy, })
+        store = self._store_type(proxies or ())
+
+        with self._lock:
+            if id in self._stores:
+                self._publish(id, store)
+
+
+class ColumnarStore(Store):
+    """An internal store for retrieved proxies, suited to pools of millions of proxies.
+
+    Rather than as proxy objects, the proxies of every store are kept in parallel typed arrays: packed IPv4 hosts and
+    ports, and small-int codes for the remaining fields. Filters are applied as vectorized masks over these arrays
+    (with NumPy if installed), and proxies are only created for the rows that are retrieved.
+    """
+    _store_type = _Columns
+
+
+class _ThreadConnection:
+    """The connection of a thread to a SQLite database, closed once the thread exits and its locals are cleared."""
+    def __init__(self, connection, connections, lock):
+        self.connection = connection
+        self._connections = connections
+        self._lock = lock
+
+    def __del__(self):
+        with self._lock:
+            self._connections.discard(self.connection)
+        self.connection.close()
+
+
+def _close_database(path, temporary, connections, lock):
+    with lock:
+        closed = list(connections)
+        connections.clear()
+
+    for connection in closed:
+        connection.close()
+
+    if temporary:
+        for suffix in ('', '-wal', '-shm'):
+            try:
+                os.remove(path + suffix)
+            except OSError:
+                pass
+
+
+class SQLiteStore(Store):
+    """An internal store for retrieved proxies, kept in a SQLite database rather than in memory.
+
+    Suited to pools larger than memory. Each internal store is a table whose rows are clustered by partition (the
+    combination of `FILTER_OPTIONS` values shared by their proxies) and position, with only the partitions and their
+    sizes held in memory. A filter is matched against the partitions in memory, and a proxy is then picked by an
+    indexed lookup of a random position. Updating a store bulk-loads its proxies into a new table in a single
+    transaction, indexing their addresses once loaded, and swaps it in before dropping the old table.
+
+    The database is opened in WAL mode with a connection per thread, so readers are never blocked by writers. A
+    thread's connection is closed when the thread exits. Any proxies already in the database are dropped.
+
+    :param path:
+        (optional) The path of the database. Defaults to None (a temporary file, removed by `close()`, once the store
+        is garbage collected, or at exit).
+    :type path: string or None
+    """
+    _store_type = _Table
+
+    def __init__(self, path=None):
+        Store.__init__(self)
+
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix='proxyscrape-', suffix='.sqlite')
+            os.close(fd)
+            self._temporary = True
+        else:
+            self._temporary = False
+
+        self.path = path
+        self._local = local()
+        self._connections = set()
+        self._connections_lock = Lock()
+        self._table_ids = count()
+        self._partition_ids = count()
+
+        # Closes the database, and removes it if it's temporary, once the store is either closed or collected
+        close_args = (path, self._temporary, self._connections, self._connections_lock)
+        if _finalize is not None:
+            self._close = _finalize(self, _close_database, *close_args)
+        else:  # Python 2
+            self._close = partial(_close_database, *close_args)
+            atexit.register(self._close)
+
+        connection = self._connect()
+        tables = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'proxies%'")
+        for name, in tables.fetchall():
+            connection.execute('DROP TABLE "{}"'.format(name.replace('"', '""')))
+
+    def _connect(self):
+        # Returns the connection of the current thread
+        thread_connection = getattr(self._local, 'connection', None)
+
+        if thread_connection is not None:
+            return thread_connection.connection
+
+        connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+
+        with self._connections_lock:
+            self._connections.add(connection)
+        self._local.connection = _ThreadConnection(connection, self._connections, self._connections_lock)
+
+        return connection
+
+    def _insert(self, connection, table, key, proxies):
+        # Must hold `_lock` and be in a transaction
+        rows = _Rows(self._connect, table, next(self._partition_ids), key, len(proxies))
+        connection.executemany('INSERT INTO {} VALUES (?, ?, ?, ?, ?, ?)'.format(table),
+                               ((rows.id, position) + _row_values(proxy) for position, proxy in enumerate(proxies)))
+        return rows
+
+    def close(self):
+        """Closes the connections to the database, removing it if it's temporary."""
+        self._close()
+
+    def remove_proxies(self, id, proxies):
+        """Removes proxies from the internal store, publishing a single new snapshot of the store.
+
+        Partitions left with fewer than half of their positions holding rows are rewritten without the holes.
+
+        :param id:
+            The unique identifier of the store.
+        :param proxies:
+            The proxies to remove.
+        :type id: uuid
+        :type proxies: iterable
+        """
+        with self._lock:
+            table = self._stores.get(id)
+
+            if table is None or table.name is None:
+                return
+
+            connection = self._connect()
+            removed = {}
+            rewritten = []
+
+            connection.execute('BEGIN')
+            try:
+                for proxy in proxies:
+                    rows = table._partitions.get(table._key(proxy))
+
+                    if rows is not None:
+                        cursor = connection.execute('DELETE FROM {} WHERE address IS ? AND host IS ? AND port IS ? AND '
+                                                    'source IS ? AND partition = ?'.format(table.name),
+                                                    _row_values(proxy) + (rows.id, ))
+                        if cursor.rowcount > 0:
+                            removed[rows.key] = removed.get(rows.key, 0) + cursor.rowcount
+
+                partitions = dict(table._partitions)
+                for key, removed_count in removed.items():
+                    rows = partitions.pop(key)
+                    live = rows.live - removed_count
+
+                    if live * 2 >= rows.size:
+                        partitions[key] = _Rows(self._connect, table.name, rows.id, key, rows.size, live)
+                        continue
+
+                    if live:
+                        partitions[key] = self._insert(connection, table.name, key, list(rows))
+                    rewritten.append(rows.id)
+
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+
+            if removed:
+                self._publish(id, _Table(table.name, partitions.values()))
+
+            # Readers of the previous snapshot may still look up rows of rewritten partitions until now
+            if rewritten:
+                connection.executemany('DELETE FROM {} WHERE partition = ?'.format(table.name),
+                                       ((rows_id, ) for rows_id in rewritten))
 
     def update_store(self, id, proxies):
         """Updates the store with the given proxies.
 
-        This clears the store of pre-existing proxies and adds the new ones.
+        This replaces the pre-existing proxies of the store with the new ones. The new proxies are loaded into a new
+        table in a single transaction and swapped in before the old table is dropped, so concurrent readers see either
+        the old or the new proxies but never an empty or partial store.
 
         :param id:
             The unique identifier of the store.
@@ -152,10 +1031,487 @@ class Store:
         if id not in self._stores:
             return
 
-        store = self._stores[id]
+        groups = {}
+        for proxy in set(proxies or ()):
+            groups.setdefault(_Partitions._key(proxy), []).append(proxy)
+
+        with self._lock:
+            table = self._stores.get(id)
+
+            if table is None:
+                return
+
+            connection = self._connect()
+            name = 'proxies_{}'.format(next(self._table_ids))
+
+            connection.execute('BEGIN')
+            try:
+                connection.execute('CREATE TABLE {} (partition INTEGER NOT NULL, position INTEGER NOT NULL, address, '
+                                   'host, port, source, PRIMARY KEY (partition, position)) WITHOUT ROWID'.format(name))
+                partitions = [self._insert(connection, name, key, keyed_proxies)
+                              for key, keyed_proxies in groups.items()]
+                # Indexing once loaded sorts the addresses once, rather than inserting each into the index
+                connection.execute('CREATE INDEX {0}_address ON {0} (address, host, port)'.format(name))
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
 
+            self._publish(id, _Table(name, partitions))
+
+            if table.name is not None:
+                connection.execute('DROP TABLE {}'.format(table.name))
+
+
+class RandomStrategy:
+    """Selects matching proxies uniformly at random."""
+    def get_proxy(self, store, filter_opts=None, blacklist=None):
+        """Retrieves a single proxy from the store, as with `Store.get_proxy(...)`."""
+        return store.get_proxy(filter_opts, blacklist)
+
+
+class RoundRobinStrategy:
+    """Selects matching proxies in turn, keeping a cursor per filter.
+
+    Cursors are kept across refreshes of the store, though the order of the proxies may change with them.
+    """
+    def __init__(self):
+        # Maps a filter key to its cursor
+        self._cursors = {}
+        self._lock = Lock()
+
+    def get_proxy(self, store, filter_opts=None, blacklist=None):
+        """Retrieves the next matching proxy from the store.
+
+        :param store:
+            The store to retrieve the proxy from.
+        :param filter_opts:
+            (optional) Options to filter the proxies by.
+        :param blacklist:
+            (optional) Specific proxies to not retrieve.
+        :type store: Store
+        :type filter_opts: dict or None
+        :type blacklist: set
+        :return:
+            A single proxy matching the given filters.
+        :rtype: Proxy or None
+        """
+        partitions, cumulative_sizes = store._match(filter_opts)
+        total = cumulative_sizes[-1] if cumulative_sizes else 0
+        key = _filter_key(filter_opts) if filter_opts else ()
+
+        cursor = self._cursors.get(key)
+        if cursor is None:
+            with self._lock:
+                cursor = self._cursors.get(key)
+                if cursor is None:
+                    cursor = count()
+                    _cache_match(self._cursors, key, cursor)
+
+        # Skipping a blacklisted proxy moves the cursor past it, so the next call doesn't return the same proxy
+        for _ in range(total):
+            index = next(cursor) % total
+            position = bisect_right(cumulative_sizes, index)
+
+            if position:
+                index -= cumulative_sizes[position - 1]
+            proxy = partitions[position][index]
+
+            if proxy is not None and (not blacklist or _host_port(proxy) not in blacklist):
+                return proxy
+
+        return None
+
+
+class LeastRecentlyUsedStrategy:
+    """Selects the matching proxy which was retrieved least recently, never retrieved proxies first.
+
+    Proxies are kept in a heap per filter, ordered by when they were last retrieved, so the least recently used one is
+    found in O(log N). A heap is rebuilt when the store changes, with proxies that persist across the change keeping
+    their last use. Entries of proxies retrieved through another filter since are updated once they reach the top.
+    """
+    def __init__(self):
+        # Maps the (host, port) of each proxy to the tick of its last retrieval
+        self._last_used = {}
+        self._ticks = count(1)
+        # Maps a filter key to the mapping of stores its heap was built from, and the heap
+        self._heaps = {}
+        self._sequence = count()
+        self._stores = None
+        self._lock = Lock()
+
+    def _get_heap(self, store, filter_opts):
+        # Must hold `_lock`
+        stores = store._stores
+        key = _filter_key(filter_opts) if filter_opts else ()
+
+        if stores is not self._stores:
+            self._stores = stores
+
+            # Last uses of proxies no longer stored are dropped once they outnumber the stored proxies
+            if len(self._last_used) > 2 * sum(len(s) for s in stores.values()) + 1024:
+                addresses = {_host_port(p) for s in stores.values() for partition in s.match() for p in partition}
+                self._last_used = {address: tick for address, tick in self._last_used.items() if address in addresses}
+
+        heap = self._heaps.get(key)
+        if heap is None or heap[0] is not stores:
+            entries = [(self._last_used.get(_host_port(p), 0), next(self._sequence), p)
+                       for partition in store._match(filter_opts)[0] for p in partition]
+            heapify(entries)
+            heap = (stores, entries)
+            _cache_match(self._heaps, key, heap)
+
+        return heap[1]
+
+    def get_proxy(self, store, filter_opts=None, blacklist=None):
+        """Retrieves the least recently used matching proxy from the store.
+
+        :param store:
+            The store to retrieve the proxy from.
+        :param filter_opts:
+            (optional) Options to filter the proxies by.
+        :param blacklist:
+            (optional) Specific proxies to not retrieve.
+        :type store: Store
+        :type filter_opts: dict or None
+        :type blacklist: set
+        :return:
+            A single proxy matching the given filters.
+        :rtype: Proxy or None
+        """
         with self._lock:
-            store.clear()
+            heap = self._get_heap(store, filter_opts)
+            skipped = []
+            proxy = None
+
+            while heap:
+                tick, _, candidate = heap[0]
+                address = _host_port(candidate)
+                last_used = self._last_used.get(address, 0)
+
+                if last_used != tick:
+                    # Retrieved through another filter since the entry was pushed
+                    heapreplace(heap, (last_used, next(self._sequence), candidate))
+                elif blacklist and address in blacklist:
+                    skipped.append(heappop(heap))
+                else:
+                    proxy = candidate
+                    last_used = self._last_used[address] = next(self._ticks)
+                    heapreplace(heap, (last_used, next(self._sequence), candidate))
+                    break
+
+            for entry in skipped:
+                heappush(heap, entry)
+
+            return proxy
 
-            if proxies:
-                store.update(proxies)
+
+class HealthScores:
+    """The health of proxies, as exponentially weighted moving averages of their success and latency.
+
+    Scores are kept per (host, port), so they carry over to the same proxy retrieved again by a later refresh. The
+    weight of a proxy is its success rate divided by one plus its latency (in seconds), with proxies not reported on
+    weighted as healthy.
+
+    :param alpha:
+        (optional) The weight given to the latest report, between 0 and 1. Defaults to 0.3.
+    :type alpha: float
+    """
+    def __init__(self, alpha=_HEALTH_ALPHA):
+        self.alpha = alpha
+        # Maps the (host, port) of each proxy reported on to its (success rate, latency)
+        self._scores = {}
+        self._lock = Lock()
+        # Functions called with the (host, port) and new weight of a proxy whenever it's reported on
+        self._listeners = []
+
+    def _report(self, proxy, success, latency):
+        address = _host_port(proxy)
+
+        with self._lock:
+            score = self._scores.get(address)
+            if score is None:
+                score = (1.0, latency or 0.0)
+
+            success_rate = score[0] + self.alpha * (success - score[0])
+            if latency is not None:
+                latency = score[1] + self.alpha * (latency - score[1])
+            else:
+                latency = score[1]
+
+            self._scores[address] = (success_rate, latency)
+
+        weight = self.weight(address)
+        for listener in self._listeners:
+            listener(address, weight)
+
+    def add_listener(self, listener):
+        """Adds a function called with the (host, port) and new weight of a proxy whenever it's reported on."""
+        self._listeners.append(listener)
+
+    def report_failure(self, proxy):
+        """Reports a failed request through the proxy.
+
+        :param proxy:
+            The proxy.
+        :type proxy: Proxy
+        """
+        self._report(proxy, 0.0, None)
+
+    def report_success(self, proxy, latency=None):
+        """Reports a successful request through the proxy.
+
+        :param proxy:
+            The proxy.
+        :param latency:
+            (optional) The time (in seconds) the request took.
+        :type proxy: Proxy
+        :type latency: float or None
+        """
+        self._report(proxy, 1.0, latency)
+
+    def weight(self, address):
+        """Returns the weight of the proxy with the given (host, port)."""
+        score = self._scores.get(address)
+
+        if score is None:
+            return 1.0
+        return max(_MIN_HEALTH_WEIGHT, score[0] / (1.0 + score[1]))
+
+
+class _FenwickTree:
+    """A binary indexed tree of weights, updating a weight and finding the index of a cumulative weight in O(log N)."""
+    def __init__(self, weights):
+        self.weights = list(weights)
+        self.total = sum(self.weights)
+        self._tree = [0.0] + self.weights
+
+        # Built in O(N) by adding each node to its parent
+        size = len(self._tree)
+        for index in range(1, size):
+            parent = index + (index & -index)
+            if parent < size:
+                self._tree[parent] += self._tree[index]
+
+        self._step = 1
+        while self._step * 2 < size:
+            self._step *= 2
+
+    def __len__(self):
+        return len(self.weights)
+
+    def add(self, index, delta):
+        """Adds the delta to the weight at the given index."""
+        self.weights[index] += delta
+        self.total += delta
+
+        index += 1
+        while index < len(self._tree):
+            self._tree[index] += delta
+            index += index & -index
+
+    def find(self, value):
+        """Returns the index at which the cumulative weight exceeds the value."""
+        index = 0
+        step = self._step
+
+        while step:
+            if index + step < len(self._tree) and self._tree[index + step] <= value:
+                index += step
+                value -= self._tree[index]
+            step //= 2
+
+        # Rounding errors may leave the value just past the last weight
+        return min(index, len(self.weights) - 1)
+
+
+class WeightedStrategy:
+    """Selects matching proxies at random in proportion to their health.
+
+    The matching proxies of each filter are kept in a Fenwick tree of their weights, which is rebuilt when the store
+    changes and updated in place whenever a proxy is reported on, so both a draw and an update take O(log N).
+
+    :param scores:
+        (optional) The health of proxies. Defaults to new scores.
+    :type scores: HealthScores or None
+    """
+    def __init__(self, scores=None):
+        self.scores = HealthScores() if scores is None else scores
+        self.scores.add_listener(self._rescore)
+        # Maps a filter key to the mapping of stores its tree was built from, the proxies, their indexes, and the tree
+        self._trees = {}
+        self._lock = Lock()
+
+    def _get_tree(self, store, filter_opts):
+        # Must hold `_lock`
+        stores = store._stores
+        key = _filter_key(filter_opts) if filter_opts else ()
+        entry = self._trees.get(key)
+
+        if entry is None or entry[0] is not stores:
+            proxies = [p for partition in store._match(filter_opts)[0] for p in partition]
+            indexes = {_host_port(p): index for index, p in enumerate(proxies)}
+            tree = _FenwickTree(self.scores.weight(_host_port(p)) for p in proxies)
+            entry = (stores, proxies, indexes, tree)
+            _cache_match(self._trees, key, entry)
+
+        return entry[1:]
+
+    def _rescore(self, address, weight):
+        with self._lock:
+            for _, _, indexes, tree in self._trees.values():
+                index = indexes.get(address)
+                if index is not None:
+                    tree.add(index, weight - tree.weights[index])
+
+    def get_proxy(self, store, filter_opts=None, blacklist=None):
+        """Retrieves a matching proxy from the store, drawn in proportion to its health.
+
+        :param store:
+            The store to retrieve the proxy from.
+        :param filter_opts:
+            (optional) Options to filter the proxies by.
+        :param blacklist:
+            (optional) Specific proxies to not retrieve.
+        :type store: Store
+        :type filter_opts: dict or None
+        :type blacklist: set
+        :return:
+            A single proxy matching the given filters.
+        :rtype: Proxy or None
+        """
+        with self._lock:
+            proxies, _, tree = self._get_tree(store, filter_opts)
+
+            if not proxies:
+                return None
+
+            for _ in range(_MAX_SAMPLE_ATTEMPTS):
+                proxy = proxies[tree.find(random.random() * tree.total)]
+
+                if not blacklist or _host_port(proxy) not in blacklist:
+                    return proxy
+
+            candidates = [(proxy, weight) for proxy, weight in zip(proxies, tree.weights)
+                          if _host_port(proxy) not in blacklist]
+
+        if not candidates:
+            return None
+
+        value = random.random() * sum(weight for _, weight in candidates)
+        for proxy, weight in candidates:
+            value -= weight
+            if value < 0:
+                return proxy
+        return candidates[-1][0]
+
+
+def _hash_key(key):
+    # A hash of the key which is the same across processes, unlike hash()
+    if not isinstance(key, bytes):
+        key = ('%s' % (key, )).encode('utf-8')
+    return struct.unpack('>Q', hashlib.md5(key).digest()[:8])[0]
+
+
+class ConsistentHashing:
+    """Assigns keys to matching proxies with a consistent hash ring per filter.
+
+    Each proxy has `_RING_REPLICAS` points on the ring, and a key is assigned to the proxy owning the first point at or
+    after the key's hash. Adding or removing proxies only reassigns the keys of the proxies added or removed, and a
+    lookup is a bisection of the ring. The points of a proxy are computed once and reused by rings rebuilt after
+    refreshes.
+    """
+    def __init__(self):
+        # Maps the (host, port) of each proxy to its points on the rings
+        self._points = {}
+        # Maps a filter key to the mapping of stores its ring was built from, the ring's points, and their proxies
+        self._rings = {}
+        self._stores = None
+        self._lock = Lock()
+
+    def _get_points(self, proxy):
+        address = _host_port(proxy)
+        points = self._points.get(address)
+
+        if points is None:
+            seed = ('%s:%s' % address).encode('utf-8')
+            points = ()
+            for replica in range(_RING_REPLICAS // 8):
+                points += struct.unpack('>8Q', hashlib.sha512(seed + struct.pack('>B', replica)).digest())
+            self._points[address] = points
+
+        return points
+
+    def _get_ring(self, store, filter_opts):
+        stores = store._stores
+        key = _filter_key(filter_opts) if filter_opts else ()
+        ring = self._rings.get(key)
+
+        if ring is not None and ring[0] is stores:
+            return ring[1], ring[2]
+
+        # Concurrent callers wait on a single build of the ring
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is not None and ring[0] is stores:
+                return ring[1], ring[2]
+
+            if stores is not self._stores:
+                self._stores = stores
+
+                # Points of proxies no longer stored are dropped once they outnumber the stored proxies
+                if len(self._points) > 2 * sum(len(s) for s in stores.values()) + 1024:
+                    self._points.clear()
+
+            proxies = [p for partition in store._match(filter_opts)[0] for p in partition]
+            points = [point for proxy in proxies for point in self._get_points(proxy)]
+
+            # Sorting the positions of the points, rather than (point, proxy) pairs, avoids comparing tuples
+            order = sorted(range(len(points)), key=points.__getitem__)
+            ring = (stores, [points[index] for index in order], [proxies[index // _RING_REPLICAS] for index in order])
+            _cache_match(self._rings, key, ring)
+            return ring[1], ring[2]
+
+    def get_proxy(self, store, key, filter_opts=None, blacklist=None):
+        """Retrieves the matching proxy assigned to the key.
+
+        If the assigned proxy is blacklisted, the key is assigned to the next proxy on the ring instead.
+
+        :param store:
+            The store to retrieve the proxy from.
+        :param key:
+            The key, such as the identifier of a session.
+        :param filter_opts:
+            (optional) Options to filter the proxies by.
+        :param blacklist:
+            (optional) Specific proxies to not retrieve.
+        :type store: Store
+        :type key: hashable
+        :type filter_opts: dict or None
+        :type blacklist: set
+        :return:
+            A single proxy matching the given filters.
+        :rtype: Proxy or None
+        """
+        points, proxies = self._get_ring(store, filter_opts)
+
+        if not points:
+            return None
+
+        start = bisect_left(points, _hash_key(key))
+        for offset in range(len(points)):
+            proxy = proxies[(start + offset) % len(points)]
+
+            if not blacklist or _host_port(proxy) not in blacklist:
+                return proxy
+
+        return None
+
+
+# Strategies for selecting a proxy among the matching ones
+STRATEGIES = {
+    'random': RandomStrategy,
+    'round-robin': RoundRobinStrategy,
+    'lru': LeastRecentlyUsedStrategy,
+    'weighted': WeightedStrategy
+}
@@ -40,6 +40,9 @@ setup(
     packages=find_packages(exclude=['tests']),
     include_package_data=True,
     test_suite='tests',
+    entry_points={
+        'console_scripts': ['proxyscrape-server=proxyscrape.server:main']
+    },
     install_requires=[
         'BeautifulSoup4',
         'requests',
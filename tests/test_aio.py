@@ -0,0 +1,174 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import shutil
+import sys
+import tempfile
+from threading import Event, Thread
+import time
+import unittest
+
+try:
+    from unittest.mock import Mock, patch
+except ImportError:
+    from mock import Mock, patch
+
+import proxyscrape.proxyscrape as ps
+from proxyscrape.shared import Proxy
+
+if sys.version_info >= (3, 5):
+    import asyncio
+    import proxyscrape.aio as aio
+    from proxyscrape.aio import AsyncCollector, create_async_collector
+else:
+    asyncio = None
+
+
+@unittest.skipUnless(asyncio, 'asyncio collectors require Python 3.5+')
+class TestAsyncCollector(unittest.TestCase):
+    def setUp(self):
+        self.resource_name = self._testMethodName + '-resource'
+        self.calls = 0
+        self.gate = Event()
+        self.gate.set()
+        ps.RESOURCE_MAP[self.resource_name] = self.func
+
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.gate.set()
+        self.loop.close()
+        ps.RESOURCE_MAP.pop(self.resource_name, None)
+        ps.COLLECTORS.pop(self._testMethodName, None)
+
+    def func(self):
+        self.gate.wait()
+        self.calls += 1
+        return {Proxy('10.0.0.%d' % i, '80', 'us', 'united states', True, 'http', self.resource_name)
+                for i in range(self.calls, self.calls + 2)}
+
+    def create_collector(self, **kwargs):
+        return AsyncCollector(None, 10, self.resource_name, False, None, **kwargs)
+
+    def test_aget_proxy_refreshes_resource(self):
+        collector = self.create_collector()
+
+        proxy = self.loop.run_until_complete(collector.aget_proxy({'code': 'us'}))
+
+        self.assertEqual(self.resource_name, proxy.source)
+        self.assertEqual(1, self.calls)
+
+    def test_aget_proxies_shares_store_with_get_proxies(self):
+        collector = self.create_collector()
+
+        proxies = self.loop.run_until_complete(collector.aget_proxies())
+
+        self.assertEqual(2, len(proxies))
+        self.assertEqual(proxies, collector.get_proxies())
+        self.assertEqual(1, self.calls)
+
+    def test_concurrent_coroutines_share_refresh(self):
+        collector = self.create_collector()
+        self.gate.clear()
+
+        tasks = [self.loop.create_task(collector.aget_proxy()) for _ in range(5)]
+        self.loop.call_later(0.05, self.gate.set)
+        self.loop.run_until_complete(asyncio.wait(tasks))
+
+        self.assertTrue(all(task.result() is not None for task in tasks))
+        self.assertEqual(1, self.calls)
+
+    def test_refresh_doesnt_block_event_loop(self):
+        collector = self.create_collector()
+        self.gate.clear()
+        ticks = []
+
+        def tick():
+            ticks.append(time.time())
+            if len(ticks) == 3:
+                self.gate.set()
+            else:
+                self.loop.call_later(0.01, tick)
+
+        self.loop.call_soon(tick)
+        proxy = self.loop.run_until_complete(collector.aget_proxy())
+
+        self.assertIsNotNone(proxy)
+        self.assertEqual(3, len(ticks))
+
+    def test_arefresh_proxies_forces_refresh(self):
+        collector = self.create_collector()
+
+        self.loop.run_until_complete(collector.aget_proxy())
+        self.loop.run_until_complete(collector.arefresh_proxies())
+        self.loop.run_until_complete(collector.arefresh_proxies(False))
+
+        self.assertEqual(2, self.calls)
+
+    def test_arefresh_proxies_saves_snapshot(self):
+        directory = tempfile.mkdtemp()
+        try:
+            collector = self.create_collector(snapshot=os.path.join(directory, 'proxies.snapshot'))
+            collector.save_snapshot = Mock(wraps=collector.save_snapshot)
+
+            self.loop.run_until_complete(collector.arefresh_proxies())
+
+            self.assertEqual(1, collector.save_snapshot.call_count)
+            self.assertTrue(os.path.exists(collector.snapshot))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_loops_on_different_threads_share_executor(self):
+        collector = self.create_collector()
+        create_executor = aio.ThreadPoolExecutor
+
+        def slow_executor(*args):
+            # Widens the window in which a second thread could create its own executor
+            time.sleep(0.05)
+            return create_executor(*args)
+
+        def refresh():
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(collector.arefresh_proxies())
+            finally:
+                loop.close()
+
+        with patch.object(aio, 'ThreadPoolExecutor', Mock(side_effect=slow_executor)) as executor:
+            threads = [Thread(target=refresh) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(1, executor.call_count)
+
+    def test_create_async_collector(self):
+        collector = create_async_collector(self._testMethodName, resources=self.resource_name)
+
+        self.assertIsInstance(collector, AsyncCollector)
+        self.assertIs(collector, ps.get_collector(self._testMethodName))
+
+
+if __name__ == '__main__':
+    unittest.main()
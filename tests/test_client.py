@@ -0,0 +1,189 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import os
+import shutil
+import tempfile
+from threading import Thread
+import unittest
+
+import proxyscrape.proxyscrape as ps
+from proxyscrape.client import PoolClient
+from proxyscrape.errors import InvalidFilterOptionError, InvalidResourceTypeError, PoolServerError
+from proxyscrape.server import PoolServer
+from proxyscrape.shared import Proxy
+
+
+class TestPoolClient(unittest.TestCase):
+    def setUp(self):
+        self.resource_name = self._testMethodName + '-resource'
+        ps.RESOURCE_MAP[self.resource_name] = self.func
+        self.proxies = {Proxy('10.0.0.%d' % i, '80', ('us', 'uk')[i % 2], 'country', True, 'http', self.resource_name)
+                        for i in range(10)}
+        self.calls = 0
+        self.collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        self.directory = tempfile.mkdtemp()
+        self.server = PoolServer(self.collector, os.path.join(self.directory, 'pool.sock')).start()
+        self.client = PoolClient(self.server.address, timeout=5)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+        shutil.rmtree(self.directory)
+        ps.RESOURCE_MAP.pop(self.resource_name, None)
+
+    def func(self):
+        self.calls += 1
+        return set(self.proxies)
+
+    def test_get_proxy(self):
+        proxy = self.client.get_proxy({'code': 'us'})
+
+        self.assertIsInstance(proxy, Proxy)
+        self.assertIn(proxy, self.proxies)
+        self.assertEqual('us', proxy.code)
+
+    def test_get_proxy_with_key(self):
+        proxy = self.client.get_proxy(key='session')
+
+        for _ in range(5):
+            self.assertEqual(proxy, self.client.get_proxy(key='session'))
+
+    def test_get_proxy_with_set_filter(self):
+        proxy = self.client.get_proxy({'code': {'uk', 'ca'}})
+
+        self.assertEqual('uk', proxy.code)
+
+    def test_get_proxies(self):
+        proxies = self.client.get_proxies()
+
+        self.assertIsInstance(proxies, tuple)
+        self.assertSetEqual(self.proxies, set(proxies))
+
+    def test_no_proxy_found(self):
+        self.assertIsNone(self.client.get_proxy({'code': 'ca'}))
+        self.assertIsNone(self.client.get_proxies({'code': 'ca'}))
+
+    def test_over_tcp(self):
+        server = PoolServer(self.collector, ('127.0.0.1', 0)).start()
+        try:
+            with PoolClient(server.address, timeout=5) as client:
+                self.assertIn(client.get_proxy(), self.proxies)
+        finally:
+            server.close()
+
+    def test_blacklist_proxy(self):
+        proxy = next(iter(self.proxies))
+
+        self.client.blacklist_proxy(proxy)
+        self.assertNotIn(proxy, self.client.get_proxies())
+        self.client.remove_blacklist(proxy)
+        self.assertIn(proxy, self.client.get_proxies())
+
+        self.client.blacklist_proxy(host=proxy.host, port=proxy.port)
+        self.assertNotIn(proxy, self.client.get_proxies())
+        self.client.clear_blacklist()
+        self.assertIn(proxy, self.client.get_proxies())
+
+    def test_blacklist_proxy_requires_proxies_or_address(self):
+        with self.assertRaises(ValueError):
+            self.client.blacklist_proxy()
+
+    def test_filters(self):
+        self.client.apply_filter({'code': 'uk'})
+        self.assertTrue(all(p.code == 'uk' for p in self.client.get_proxies()))
+
+        self.client.clear_filter()
+        self.assertEqual(len(self.proxies), len(self.client.get_proxies()))
+
+    def test_invalid_filter_raises_error(self):
+        with self.assertRaises(InvalidFilterOptionError):
+            self.client.get_proxy({'bad': 'us'})
+
+        # The connection is still usable
+        self.assertIsNotNone(self.client.get_proxy())
+
+    def test_remove_proxy(self):
+        proxies = list(self.client.get_proxies())[:2]
+
+        self.client.remove_proxy(proxies)
+
+        self.assertSetEqual(self.proxies - set(proxies), set(self.client.get_proxies()))
+
+    def test_remove_proxy_with_invalid_source(self):
+        with self.assertRaises(InvalidResourceTypeError):
+            self.client.remove_proxy(Proxy('10.0.0.1', '80', 'us', 'country', True, 'http', 'unknown'))
+
+    def test_report_proxies(self):
+        proxy = self.client.get_proxy()
+
+        self.client.report_failure(proxy)
+        failed = self.collector._scores.weight((proxy.host, proxy.port))
+        self.client.report_success(proxy, 0.1)
+
+        self.assertLess(failed, 1.0)
+        self.assertGreater(self.collector._scores.weight((proxy.host, proxy.port)), failed)
+
+    def test_refresh_proxies(self):
+        self.client.get_proxy()
+        self.client.refresh_proxies(False)
+        self.assertEqual(1, self.calls)
+
+        self.client.refresh_proxies()
+        self.assertEqual(2, self.calls)
+
+    def test_get_resource_states_and_available_at(self):
+        self.client.get_proxy()
+
+        self.assertEqual({self.resource_name: 'closed'}, self.client.get_resource_states())
+        self.assertIsInstance(self.client.available_at(), float)
+
+    def test_connection_per_thread(self):
+        results = []
+
+        def retrieve():
+            results.append(self.client.get_proxy())
+
+        threads = [Thread(target=retrieve) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.client.get_proxy()
+
+        self.assertEqual(4, len(results))
+        self.assertEqual(5, len(self.client._connections))
+
+    def test_reconnects_after_close(self):
+        self.client.get_proxy()
+        self.client.close()
+
+        self.assertIn(self.client.get_proxy(), self.proxies)
+        self.assertEqual(1, len(self.client._connections))
+
+    def test_server_closed(self):
+        self.client.get_proxy()
+        self.server.close()
+
+        with self.assertRaises((PoolServerError, EnvironmentError)):
+            self.client.get_proxy()
+        self.assertEqual(0, len(self.client._connections))
@@ -45,9 +45,17 @@ class TestIntegrationProxyScrape(unittest.TestCase):
         self.requests_patcher = patch('proxyscrape.shared.requests')
         self.requests = self.requests_patcher.start()
 
+        # Requests are made through the mocked module rather than a pooled session
+        self.session_patcher = patch('proxyscrape.shared.get_session', return_value=self.requests)
+        self.session_patcher.start()
+
         # Revert constants to defaults before each test
         pss.RESOURCE_MAP = RESOURCE_MAP_COPY.copy()
 
+    def tearDown(self):
+        self.requests_patcher.stop()
+        self.session_patcher.stop()
+
     def test_get_proxyscrape_resource_success(self):
         resource_name = get_proxyscrape_resource()
         self.assertIn(resource_name, pss.RESOURCE_MAP)
@@ -83,7 +91,7 @@ class TestIntegrationProxyScrape(unittest.TestCase):
             response = Mock()
             response.text = html.read()
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             resource_name = get_proxyscrape_resource()
 
@@ -104,7 +112,7 @@ class TestIntegrationProxyScrape(unittest.TestCase):
     def test_proxyscrape_not_ok(self):
         response = Mock()
         response.ok = False
-        self.requests.get = lambda url: response
+        self.requests.get = lambda url, **kwargs: response
 
         resource_name = get_proxyscrape_resource()
         func = pss.RESOURCE_MAP[resource_name]
@@ -120,7 +128,7 @@ class TestIntegrationProxyScrape(unittest.TestCase):
             response = Mock()
             response.text = html.read()
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             resource_name = get_proxyscrape_resource()
             func = pss.RESOURCE_MAP[resource_name]
@@ -0,0 +1,76 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import io
+import os
+import unittest
+
+from proxyscrape.parsers import parse_table_rows
+
+
+class TestParseTableRows(unittest.TestCase):
+    def test_returns_rows_of_table_body(self):
+        with open(os.path.join(cwd, 'mock_pages', 'us-proxy.html'), 'rb') as html:
+            rows = parse_table_rows(html.read(), 'proxylisttable')
+
+        self.assertEqual(3, len(rows))
+        self.assertListEqual(['179.124.59.232', '53281', 'US', 'United States', 'elite proxy', 'no', 'yes',
+                              '1 minute ago'], rows[0])
+
+    def test_accepts_file(self):
+        content = '<table id="t"><tbody><tr><td>a</td></tr></tbody></table>'
+        self.assertListEqual([['a']], parse_table_rows(io.StringIO(content), 't'))
+
+    def test_returns_none_if_table_missing(self):
+        with open(os.path.join(cwd, 'mock_pages', 'empty.html'), 'r') as html:
+            self.assertIsNone(parse_table_rows(html, 'proxylisttable'))
+
+    def test_returns_none_if_body_missing(self):
+        content = '<table id="t"><tr><td>a</td></tr></table>'
+        self.assertIsNone(parse_table_rows(content, 't'))
+
+    def test_ignores_other_tables(self):
+        content = '<table><tbody><tr><td>a</td></tr></tbody></table>' \
+                  '<table id="t"><thead><tr><th>h</th></tr></thead><tbody><tr><td>b</td></tr></tbody></table>'
+        self.assertListEqual([['b']], parse_table_rows(content, 't'))
+
+    def test_closes_unterminated_cells_and_rows(self):
+        content = '<table id="t"><tbody><tr><td>a<td>b<tr><td>c</tbody></table>'
+        self.assertListEqual([['a', 'b'], ['c']], parse_table_rows(content, 't'))
+
+    def test_unescapes_references(self):
+        content = '<table id="t"><tbody><tr><td>a &amp; b&#33;</td></tr></tbody></table>'
+        self.assertListEqual([['a & b!']], parse_table_rows(content, 't'))
+
+    def test_stops_after_table_body(self):
+        content = '<table id="t"><tbody><tr><td>a</td></tr></tbody></table><table id="t"><tbody><tr><td>b'
+        self.assertListEqual([['a']], parse_table_rows(content, 't'))
+
+
+if __name__ == '__main__':
+    unittest.main()
+    cwd = os.getcwd()
+elif __name__ == 'test_parsers':
+    cwd = os.getcwd()
+elif __name__ == 'tests.test_parsers':
+    cwd = os.path.join(os.getcwd(), 'tests')
@@ -0,0 +1,108 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from proxyscrape.pools import PoolPublisher, SharedPoolStore
+from proxyscrape.shared import Proxy
+from proxyscrape.stores import LeastRecentlyUsedStrategy, RoundRobinStrategy
+
+
+class TestSharedPools(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'pool')
+        self.proxies = {Proxy('10.0.0.%d' % i, str(8000 + i), code, code, i % 2 == 0, type, 'source')
+                        for i in range(40)
+                        for code, type in [(('us', 'uk', 'ca')[i % 3], ('http', 'https')[i % 4 // 2])]}
+        self.proxies.add(Proxy('::1', '80', 'us', 'us', True, 'http', 'source'))
+        self.publisher = PoolPublisher(self.path)
+        self.store = SharedPoolStore(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_nothing_published(self):
+        self.assertIsNone(self.store.get_proxy())
+        self.assertIsNone(self.store.pool_version)
+
+    def test_reads_published_pool(self):
+        self.assertEqual(1, self.publisher.publish(self.proxies))
+
+        self.assertSetEqual(self.proxies, set(self.store.get_proxies()))
+        self.assertEqual(1, self.store.pool_version)
+
+    def test_get_proxy_matches_filter(self):
+        self.publisher.publish(self.proxies)
+        expected = {p for p in self.proxies if p.code == 'us' and p.type == 'http'}
+
+        for _ in range(50):
+            self.assertIn(self.store.get_proxy({'code': {'us', }, 'type': {'http', }}), expected)
+
+        self.assertIsNone(self.store.get_proxy({'code': {'de', }}))
+
+    def test_reads_new_versions(self):
+        self.publisher.publish(self.proxies)
+        self.store.get_proxy()
+        version = self.store.version
+        proxies = {Proxy('10.0.1.1', '80', 'us', 'us', True, 'http', 'source')}
+
+        self.publisher.publish(proxies)
+
+        self.assertSetEqual(proxies, set(self.store.get_proxies()))
+        self.assertGreater(self.store.version, version)
+        self.assertListEqual(['pool', 'pool.2'], sorted(os.listdir(self.directory)))
+
+    def test_new_publisher_continues_versions(self):
+        self.publisher.publish(self.proxies)
+        self.store.get_proxy()
+        proxies = {Proxy('10.0.1.1', '80', 'us', 'us', True, 'http', 'source')}
+
+        self.assertEqual(2, PoolPublisher(self.path).publish(proxies))
+        self.assertSetEqual(proxies, set(self.store.get_proxies()))
+
+    def test_remove_proxies_until_next_version(self):
+        removed = {p for p in self.proxies if p.code == 'us'}
+        self.publisher.publish(self.proxies)
+
+        self.store.remove_proxies(self.store.add_store(), removed)
+        self.assertSetEqual(self.proxies - removed, set(self.store.get_proxies()))
+
+        self.publisher.publish(self.proxies)
+        self.assertSetEqual(self.proxies, set(self.store.get_proxies()))
+
+    def test_update_store_does_nothing(self):
+        self.publisher.publish(self.proxies)
+
+        self.store.update_store(self.store.add_store(), None)
+
+        self.assertSetEqual(self.proxies, set(self.store.get_proxies()))
+
+    def test_strategies(self):
+        self.publisher.publish(self.proxies)
+
+        for strategy in (RoundRobinStrategy(), LeastRecentlyUsedStrategy()):
+            self.assertIn(strategy.get_proxy(self.store, {'code': {'uk', }}), self.proxies)
@@ -22,9 +22,11 @@
 
 
 import os
+import shutil
 import sys
+import tempfile
 import time
-from threading import Thread
+from threading import Event, Thread, Timer
 import unittest
 try:
     from unittest.mock import Mock
@@ -36,14 +38,19 @@ from proxyscrape.errors import (
      CollectorNotFoundError,
      InvalidFilterOptionError,
      InvalidResourceError,
-     InvalidResourceTypeError
+     InvalidResourceTypeError,
+     InvalidStoreError,
+     InvalidStrategyError,
+     RequestFailedError
 )
 import proxyscrape.proxyscrape as ps
 from proxyscrape.proxyscrape import (
     create_collector,
     get_collector
 )
+from proxyscrape.scrapers import ProxyResource
 from proxyscrape.shared import Proxy
+from proxyscrape.stores import ColumnarStore, SQLiteStore, Store
 
 
 def hold_lock(lock, hold_time, func):
@@ -56,6 +63,44 @@ def get_random_collector_name(self):
     return self._testMethodName + '-collector'
 
 
+def get_random_resource_name(self):
+    return self._testMethodName + '-resource'
+
+
+class ResourceTestCase(unittest.TestCase):
+    """Runs collectors against a test resource using the actual store and proxy resource."""
+    def setUp(self):
+        # Revert any mocks set by previous tests
+        ps.Store = Store
+        ps.ProxyResource = ProxyResource
+
+        self.resource_name = get_random_resource_name(self)
+        self.proxies = []
+        self.calls = 0
+        self.gate = Event()
+        self.gate.set()
+        ps.RESOURCE_MAP[self.resource_name] = self.func
+
+    def tearDown(self):
+        self.gate.set()
+        ps.RESOURCE_MAP.pop(self.resource_name, None)
+
+    def func(self):
+        self.gate.wait()
+        proxies = self.proxies[min(self.calls, len(self.proxies) - 1)]
+        self.calls += 1
+        return proxies
+
+    def create_proxy(self, host):
+        return Proxy(host, '80', 'us', 'united states', True, 'http', self.resource_name)
+
+    def wait_for_refresh(self, collector):
+        for _ in range(100):
+            if not collector._pending_refreshes:
+                return
+            time.sleep(0.01)
+
+
 class TestProxyScrape(unittest.TestCase):
     def setUp(self):
         # Revert constants to defaults before each test
@@ -423,7 +468,7 @@ class TestCollector(unittest.TestCase):
         collector = ps.Collector('http', 10, None)
         collector.remove_proxy(None)
 
-        store_mock.remove_proxy.assert_not_called()
+        store_mock.remove_proxies.assert_not_called()
 
     def test_remove_proxy_exception_if_invalid_resource_type(self):
         proxy = Proxy('host', 'port', 'code', 'country', 'anonymous', 'type', 'invalid-source')
@@ -444,7 +489,7 @@ class TestCollector(unittest.TestCase):
         collector.remove_proxy(proxy)
 
         id = collector._resource_map['anonymous-proxy']['id']
-        store_mock.remove_proxy.assert_called_with(id, proxy)
+        store_mock.remove_proxies.assert_called_with(id, [proxy])
 
     def test_remove_proxy_multiple(self):
         store_mock = Mock()
@@ -460,10 +505,10 @@ class TestCollector(unittest.TestCase):
         collector.remove_proxy(proxies)
 
         id = collector._resource_map['anonymous-proxy']['id']
-        store_mock.remove_proxy.assert_any_call(id, proxy1)
+        store_mock.remove_proxies.assert_any_call(id, [proxy1])
 
         id = collector._resource_map['us-proxy']['id']
-        store_mock.remove_proxy.assert_any_call(id, proxy2)
+        store_mock.remove_proxies.assert_any_call(id, [proxy2])
 
     def test_refresh_proxies_update_store_if_refreshed(self):
         proxy = Proxy('host', 'port', 'code', 'country', 'anonymous', 'type', 'source')
@@ -530,6 +575,811 @@ class TestCollector(unittest.TestCase):
             store_mock.update_store.assert_called_with(attrs['id'], proxies)
 
 
+class TestCollectorBackgroundRefresh(ResourceTestCase):
+    def test_serves_stale_proxies_while_refreshing(self):
+        proxy1, proxy2 = self.create_proxy('host1'), self.create_proxy('host2')
+        self.proxies = [{proxy1, }, {proxy2, }]
+
+        collector = ps.Collector(None, 0, self.resource_name, False, None, background_refresh=True)
+        self.assertEqual(proxy1, collector.get_proxy())
+
+        self.gate.clear()
+        self.assertEqual(proxy1, collector.get_proxy())
+        self.assertEqual(proxy1, collector.get_proxy())
+
+        self.gate.set()
+        self.wait_for_refresh(collector)
+
+        self.assertEqual(2, self.calls)
+        self.assertEqual(proxy2, collector._store.get_proxy())
+
+    def test_blocks_if_never_refreshed(self):
+        proxy = self.create_proxy('host')
+        self.proxies = [{proxy, }]
+
+        collector = ps.Collector(None, 10, self.resource_name, False, None, background_refresh=True)
+
+        self.assertEqual(proxy, collector.get_proxy())
+        self.assertEqual(1, self.calls)
+
+    def test_blocks_if_past_max_staleness(self):
+        proxy1, proxy2 = self.create_proxy('host1'), self.create_proxy('host2')
+        self.proxies = [{proxy1, }, {proxy2, }]
+
+        collector = ps.Collector(None, 0, self.resource_name, False, None, background_refresh=True,
+                                 max_staleness=0)
+        self.assertEqual(proxy1, collector.get_proxy())
+
+        time.sleep(0.01)
+        self.assertEqual(proxy2, collector.get_proxy())
+        self.assertEqual(2, self.calls)
+
+
+class TestCollectorParallelRefresh(ResourceTestCase):
+    def setUp(self):
+        super(TestCollectorParallelRefresh, self).setUp()
+        self.other_resource_name = self.resource_name + '-other'
+        self.other_proxy = Proxy('other', '80', 'us', 'united states', True, 'http', self.other_resource_name)
+        ps.RESOURCE_MAP[self.other_resource_name] = self.other_func
+
+    def tearDown(self):
+        super(TestCollectorParallelRefresh, self).tearDown()
+        ps.RESOURCE_MAP.pop(self.other_resource_name, None)
+
+    def other_func(self):
+        time.sleep(0.2)
+        return {self.other_proxy, }
+
+    def test_refreshes_resources_concurrently(self):
+        proxy = self.create_proxy('host')
+        self.proxies = [{proxy, }]
+
+        def func():
+            time.sleep(0.2)
+            return {proxy, }
+
+        ps.RESOURCE_MAP[self.resource_name] = func
+        collector = ps.Collector(None, 10, [self.resource_name, self.other_resource_name], False, None)
+
+        start = time.time()
+        actual = collector.get_proxies()
+
+        self.assertLess(time.time() - start, 0.35)
+        self.assertSetEqual({proxy, self.other_proxy}, set(actual))
+
+    def test_doesnt_wait_past_refresh_timeout(self):
+        proxy = self.create_proxy('host')
+        self.proxies = [{proxy, }]
+        self.gate.clear()
+
+        collector = ps.Collector(None, 10, [self.resource_name, self.other_resource_name], False, None,
+                                 refresh_timeout=0.3)
+        actual = collector.get_proxies()
+
+        self.assertTupleEqual((self.other_proxy, ), actual)
+
+        self.gate.set()
+        for _ in range(100):
+            if len(collector._store.get_proxies()) == 2:
+                break
+            time.sleep(0.01)
+
+        self.assertSetEqual({proxy, self.other_proxy}, set(collector._store.get_proxies()))
+
+
+    def test_doesnt_wait_past_refresh_timeout_of_single_resource(self):
+        self.proxies = [{self.create_proxy('host'), }]
+        self.gate.clear()
+
+        for workers in (None, 1):
+            collector = ps.Collector(None, 10, self.resource_name, False, None, refresh_workers=workers,
+                                     refresh_timeout=0.2)
+
+            start = time.time()
+            actual = collector.get_proxies()
+
+            self.assertLess(time.time() - start, 0.5)
+            self.assertIsNone(actual)
+
+        self.gate.set()
+
+class TestCollectorResourceStates(ResourceTestCase):
+    def test_get_resource_states(self):
+        def func():
+            raise RequestFailedError()
+
+        ps.RESOURCE_MAP[self.resource_name] = func
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        self.assertDictEqual({self.resource_name: 'closed'}, collector.get_resource_states())
+        self.assertIsNone(collector.get_proxy())
+        self.assertDictEqual({self.resource_name: 'open'}, collector.get_resource_states())
+
+
+class TestCollectorStores(ResourceTestCase):
+    def test_default_store(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        self.assertIs(Store, type(collector._store))
+
+    def test_columnar_store(self):
+        proxy = self.create_proxy('10.0.0.1')
+        self.proxies = [{proxy, self.create_proxy('10.0.0.2')._replace(code='uk')}]
+        collector = ps.Collector(None, 10, self.resource_name, False, None, store='columnar')
+
+        self.assertIs(ColumnarStore, type(collector._store))
+        self.assertEqual(proxy, collector.get_proxy({'code': 'us'}))
+        self.assertEqual(2, len(collector.get_proxies()))
+
+    def test_sqlite_store(self):
+        proxy = self.create_proxy('10.0.0.1')
+        self.proxies = [{proxy, self.create_proxy('10.0.0.2')._replace(code='uk')}]
+        collector = ps.Collector(None, 10, self.resource_name, False, None, store='sqlite')
+
+        try:
+            self.assertIs(SQLiteStore, type(collector._store))
+            self.assertEqual(proxy, collector.get_proxy({'code': 'us'}))
+
+            collector.remove_proxy(proxy)
+            self.assertIsNone(collector.get_proxy({'code': 'us'}))
+        finally:
+            collector._store.close()
+
+    def test_invalid_collector_creates_no_store(self):
+        sqlite_store = ps.SQLiteStore
+        ps.SQLiteStore = Mock()
+
+        try:
+            with self.assertRaises(InvalidResourceError):
+                ps.Collector(None, 10, self.resource_name + '-missing', False, None, store='sqlite')
+
+            ps.SQLiteStore.assert_not_called()
+        finally:
+            ps.SQLiteStore = sqlite_store
+
+    def test_store_instance(self):
+        store = ColumnarStore()
+        collector = ps.Collector(None, 10, self.resource_name, False, None, store=store)
+
+        self.assertIs(store, collector._store)
+
+    def test_invalid_store(self):
+        with self.assertRaises(InvalidStoreError):
+            ps.Collector(None, 10, self.resource_name, False, None, store='invalid')
+
+
+class TestCollectorCompiledFilters(ResourceTestCase):
+    def setUp(self):
+        super(TestCollectorCompiledFilters, self).setUp()
+        self.proxy = self.create_proxy('10.0.0.1')
+        self.proxies = [{self.proxy, }]
+
+    def tearDown(self):
+        super(TestCollectorCompiledFilters, self).tearDown()
+        ps._MAX_COMPILED_FILTERS = 128
+
+    def test_same_filter_compiled_once(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        first = collector._compile_filter({'code': ['us', 'uk']})
+        second = collector._compile_filter({'code': {'uk', 'us'}})
+
+        self.assertIs(first, second)
+        self.assertEqual(1, len(collector._compiled_filters))
+        self.assertDictEqual({'code': {'us', 'uk'}}, first)
+
+    def test_compiled_filter_includes_applied_filter(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+        collector.apply_filter({'type': 'http'})
+
+        compiled = collector._compile_filter({'code': 'us'})
+
+        self.assertDictEqual({'code': {'us', }, 'type': {'http', }}, compiled)
+
+    def test_apply_filter_invalidates_compiled_filters(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        self.assertEqual(self.proxy, collector.get_proxy({'code': 'us'}))
+        collector.apply_filter({'type': 'https'})
+
+        self.assertIsNone(collector.get_proxy({'code': 'us'}))
+
+    def test_clear_filter_invalidates_compiled_filters(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+        collector.apply_filter({'type': 'https'})
+
+        self.assertIsNone(collector.get_proxies({'code': 'us'}))
+        collector.clear_filter()
+
+        self.assertTupleEqual((self.proxy, ), collector.get_proxies({'code': 'us'}))
+
+    def test_invalid_filter_always_raises(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        for _ in range(2):
+            with self.assertRaises(InvalidFilterOptionError):
+                collector.get_proxy({'invalid': 'us'})
+
+        self.assertEqual(0, len(collector._compiled_filters))
+
+    def test_least_recently_used_filter_evicted(self):
+        ps._MAX_COMPILED_FILTERS = 2
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        collector.get_proxy({'code': 'us'})
+        collector.get_proxy({'code': 'uk'})
+        collector.get_proxy({'code': 'us'})
+        collector.get_proxy({'code': 'ca'})
+
+        self.assertListEqual([(('code', 'us'), ), (('code', 'ca'), )], list(collector._compiled_filters))
+
+
+class TestCollectorResultCache(ResourceTestCase):
+    def setUp(self):
+        super(TestCollectorResultCache, self).setUp()
+        self.proxy = self.create_proxy('10.0.0.1')
+        self.other_proxy = self.create_proxy('10.0.0.2')
+        self.proxies = [{self.proxy, self.other_proxy}, {self.proxy, }]
+
+    def test_get_proxies_returns_same_result_if_unchanged(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        first = collector.get_proxies({'code': 'us'})
+        second = collector.get_proxies({'code': 'us'})
+
+        self.assertIs(first, second)
+        self.assertSetEqual({self.proxy, self.other_proxy}, set(first))
+
+    def test_get_proxies_returns_same_empty_result_if_unchanged(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        self.assertIsNone(collector.get_proxies({'code': 'uk'}))
+        collector._store = Mock(wraps=collector._store, version=collector._store.version)
+
+        self.assertIsNone(collector.get_proxies({'code': 'uk'}))
+        collector._store.get_proxies.assert_not_called()
+
+    def test_refresh_invalidates_result(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        collector.get_proxies()
+        collector.refresh_proxies()
+
+        self.assertTupleEqual((self.proxy, ), collector.get_proxies())
+
+    def test_remove_proxy_invalidates_result(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        collector.get_proxies()
+        collector.remove_proxy(self.other_proxy)
+
+        self.assertTupleEqual((self.proxy, ), collector.get_proxies())
+
+    def test_blacklist_invalidates_result(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        collector.get_proxies()
+        collector.blacklist_proxy(self.other_proxy)
+        self.assertTupleEqual((self.proxy, ), collector.get_proxies())
+
+        collector.remove_blacklist(self.other_proxy)
+        self.assertEqual(2, len(collector.get_proxies()))
+
+        collector.blacklist_proxy(self.other_proxy)
+        collector.get_proxies()
+        collector.clear_blacklist()
+        self.assertEqual(2, len(collector.get_proxies()))
+
+
+class TestCollectorSelectiveRefresh(ResourceTestCase):
+    def setUp(self):
+        super(TestCollectorSelectiveRefresh, self).setUp()
+        self.proxies = [{self.create_proxy('10.0.0.1'), }]
+        self.socks_resource_name = self.resource_name + '-socks'
+        self.socks_calls = 0
+
+        def func():
+            self.socks_calls += 1
+            return {Proxy('10.0.0.2', '1080', 'uk', 'united kingdom', True, 'socks5', self.socks_resource_name), }
+
+        ps.RESOURCE_MAP[self.socks_resource_name] = func
+        ps.RESOURCE_TYPE_MAP['socks5'].add(self.socks_resource_name)
+        ps.RESOURCE_ATTRIBUTE_MAP[self.resource_name] = {'type': {'http', }, 'code': {'us', }}
+        ps.RESOURCE_ATTRIBUTE_MAP[self.socks_resource_name] = {'type': {'socks5', }}
+        self.resource_type_name = self.resource_name + '-type'
+
+    def tearDown(self):
+        super(TestCollectorSelectiveRefresh, self).tearDown()
+        ps.RESOURCE_MAP.pop(self.socks_resource_name, None)
+        ps.RESOURCE_TYPE_MAP['socks5'].discard(self.socks_resource_name)
+        ps.RESOURCE_TYPE_MAP.pop(self.resource_type_name, None)
+        ps.RESOURCE_ATTRIBUTE_MAP.pop(self.resource_name, None)
+        ps.RESOURCE_ATTRIBUTE_MAP.pop(self.socks_resource_name, None)
+
+    def create_collector(self):
+        return ps.Collector(None, 10, [self.resource_name, self.socks_resource_name], False, None)
+
+    def test_skips_resources_of_other_types(self):
+        collector = self.create_collector()
+
+        self.assertEqual('10.0.0.1', collector.get_proxy({'type': 'http'}).host)
+        self.assertEqual(1, self.calls)
+        self.assertEqual(0, self.socks_calls)
+
+    def test_skips_resources_of_other_codes(self):
+        collector = self.create_collector()
+
+        self.assertEqual('10.0.0.2', collector.get_proxy({'code': 'uk'}).host)
+        self.assertEqual(0, self.calls)
+        self.assertEqual(1, self.socks_calls)
+
+    def test_skips_resources_for_applied_filter(self):
+        collector = self.create_collector()
+        collector.apply_filter({'type': 'socks5'})
+
+        self.assertEqual(1, len(collector.get_proxies()))
+        self.assertEqual(0, self.calls)
+
+    def test_refreshes_all_resources_without_filter(self):
+        collector = self.create_collector()
+
+        self.assertEqual(2, len(collector.get_proxies()))
+        self.assertEqual(1, self.calls)
+        self.assertEqual(1, self.socks_calls)
+
+    def test_refresh_proxies_refreshes_all_resources(self):
+        collector = self.create_collector()
+        collector.refresh_proxies()
+
+        self.assertEqual(1, self.calls)
+        self.assertEqual(1, self.socks_calls)
+
+    def test_refreshes_skipped_resource_once_filter_matches(self):
+        collector = self.create_collector()
+
+        collector.get_proxy({'type': 'http'})
+        self.assertEqual('10.0.0.2', collector.get_proxy({'type': 'socks5'}).host)
+        self.assertEqual(1, self.socks_calls)
+
+    def test_resource_attributes(self):
+        collector = ps.Collector(None, 10, 'us-proxy', False, None)
+
+        self.assertDictEqual({'code': {'us', }, 'country': {'united states', }, 'type': {'http', 'https'}},
+                             collector._resource_map['us-proxy']['attributes'])
+
+    def test_resource_without_attributes(self):
+        ps.RESOURCE_ATTRIBUTE_MAP.pop(self.socks_resource_name)
+        collector = ps.Collector(None, 10, self.socks_resource_name, False, None)
+
+        # Belonging to the socks5 resource type says nothing about the types of the resource's proxies
+        self.assertDictEqual({}, collector._resource_map[self.socks_resource_name]['attributes'])
+
+    def test_refreshes_resources_of_custom_resource_type(self):
+        ps.RESOURCE_ATTRIBUTE_MAP.pop(self.resource_name)
+        ps.RESOURCE_TYPE_MAP[self.resource_type_name] = {self.resource_name, }
+        collector = ps.Collector(self.resource_type_name, 10, None, False, None)
+
+        self.assertEqual('10.0.0.1', collector.get_proxy({'type': 'http'}).host)
+        self.assertEqual(1, self.calls)
+
+
+class TestCollectorLeases(ResourceTestCase):
+    def setUp(self):
+        super(TestCollectorLeases, self).setUp()
+        self.proxies = [{self.create_proxy('10.0.0.1'), self.create_proxy('10.0.0.2')}]
+
+    def test_lease_proxy_leases_different_proxies(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        lease1 = collector.lease_proxy()
+        lease2 = collector.lease_proxy()
+
+        self.assertSetEqual(self.proxies[0], {lease1.proxy, lease2.proxy})
+
+    def test_lease_proxy_returns_none_if_all_leased_past_timeout(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+        collector.lease_proxy()
+        collector.lease_proxy()
+
+        start = time.time()
+        lease = collector.lease_proxy(timeout=0.1)
+
+        self.assertIsNone(lease)
+        self.assertGreaterEqual(time.time() - start, 0.1)
+
+    def test_lease_proxy_returns_none_if_none_match(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+        collector.lease_proxy()
+
+        self.assertIsNone(collector.lease_proxy({'code': 'uk'}))
+
+    def test_lease_proxy_doesnt_lease_blacklisted(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+        collector.blacklist_proxy(host='10.0.0.1', port='80')
+
+        self.assertEqual('10.0.0.2', collector.lease_proxy().proxy.host)
+        self.assertIsNone(collector.lease_proxy(timeout=0))
+
+    def test_release_allows_lease(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+        lease = collector.lease_proxy()
+        collector.lease_proxy()
+
+        lease.release()
+        lease.release()
+
+        self.assertEqual(lease.proxy, collector.lease_proxy(timeout=0).proxy)
+        self.assertIsNone(collector.lease_proxy(timeout=0))
+
+    def test_context_manager_releases(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+        collector.lease_proxy()
+
+        with collector.lease_proxy() as proxy:
+            self.assertIn(proxy, self.proxies[0])
+            self.assertIsNone(collector.lease_proxy(timeout=0))
+
+        self.assertEqual(proxy, collector.lease_proxy(timeout=0).proxy)
+
+    def test_lease_proxy_waits_for_release(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+        leases = [collector.lease_proxy(), collector.lease_proxy()]
+        Timer(0.1, leases[0].release).start()
+
+        start = time.time()
+        lease = collector.lease_proxy(timeout=5)
+
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(leases[0].proxy, lease.proxy)
+        self.assertDictEqual({}, collector._lease_waiters)
+
+    def test_lease_proxy_waits_for_expiry(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+        lease = collector.lease_proxy(lease_time=0.1)
+        collector.lease_proxy()
+
+        start = time.time()
+        actual = collector.lease_proxy(timeout=5)
+
+        self.assertTrue(lease.expired)
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(lease.proxy, actual.proxy)
+
+    def test_expired_lease_release_doesnt_release_new_lease(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+        self.proxies = [{self.create_proxy('10.0.0.1'), }]
+        lease = collector.lease_proxy(lease_time=0)
+        new_lease = collector.lease_proxy()
+
+        lease.release()
+
+        self.assertEqual(lease.proxy, new_lease.proxy)
+        self.assertIsNone(collector.lease_proxy(timeout=0))
+
+    def test_proxy_leased_by_one_holder_at_a_time(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+        holders = {}
+        conflicts = []
+
+        def work():
+            for _ in range(50):
+                with collector.lease_proxy(timeout=5) as proxy:
+                    if holders.setdefault(proxy, 0):
+                        conflicts.append(proxy)
+                    holders[proxy] += 1
+                    time.sleep(0.001)
+                    holders[proxy] -= 1
+
+        threads = [Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertListEqual([], conflicts)
+        self.assertEqual(0, len(collector._leases))
+
+
+class TestCollectorStrategies(ResourceTestCase):
+    def setUp(self):
+        super(TestCollectorStrategies, self).setUp()
+        self.proxies = [{self.create_proxy('10.0.0.%d' % i) for i in range(4)}]
+
+    def test_round_robin_strategy(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None, strategy='round-robin')
+
+        proxies = [collector.get_proxy() for _ in range(8)]
+
+        self.assertSetEqual(self.proxies[0], set(proxies[:4]))
+        self.assertListEqual(proxies[:4], proxies[4:])
+
+    def test_lru_strategy_with_leases(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None, strategy='lru')
+
+        leased = collector.lease_proxy().proxy
+        proxies = [collector.get_proxy() for _ in range(3)]
+
+        self.assertSetEqual(self.proxies[0] - {leased, }, set(proxies))
+
+    def test_weighted_strategy_with_reports(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None, strategy='weighted')
+        failing = collector.get_proxy()
+
+        for _ in range(20):
+            collector.report_failure(failing)
+        collector.report_success((self.proxies[0] - {failing, }).pop(), 0.1)
+        proxies = [collector.get_proxy() for _ in range(200)]
+
+        self.assertLess(proxies.count(failing), 10)
+
+    def test_invalid_strategy_raises(self):
+        with self.assertRaises(InvalidStrategyError):
+            ps.Collector(None, 10, self.resource_name, False, None, strategy='invalid')
+
+
+class TestCollectorStickyProxies(ResourceTestCase):
+    def setUp(self):
+        super(TestCollectorStickyProxies, self).setUp()
+        self.proxies = [{self.create_proxy('10.0.0.%d' % i) for i in range(20)}]
+
+    def test_get_proxy_same_proxy_for_key(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        first = [collector.get_proxy(key='session-%d' % i) for i in range(10)]
+        second = [collector.get_proxy(key='session-%d' % i) for i in range(10)]
+
+        self.assertListEqual(first, second)
+        self.assertGreater(len(set(first)), 1)
+
+    def test_get_proxy_key_respects_rate_limit(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None, rate_limit=0.001)
+
+        first = collector.get_proxy(key='session')
+        second = collector.get_proxy(key='session')
+
+        self.assertIsNotNone(second)
+        self.assertNotEqual(first, second)
+
+
+class TestCollectorSnapshots(ResourceTestCase):
+    def setUp(self):
+        super(TestCollectorSnapshots, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.snapshot = os.path.join(self.directory, 'proxies.snapshot')
+        self.proxies = [{self.create_proxy('10.0.0.1'), self.create_proxy('10.0.0.2')}]
+
+    def tearDown(self):
+        super(TestCollectorSnapshots, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def test_refresh_saves_snapshot(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None, snapshot=self.snapshot)
+        collector.refresh_proxies()
+
+        self.assertTrue(os.path.exists(self.snapshot))
+
+    def test_refresh_saves_snapshot_once_per_batch(self):
+        other_resource_name = self.resource_name + '-other'
+        ps.RESOURCE_MAP[other_resource_name] = lambda: {self.create_proxy('10.0.0.3')}
+
+        try:
+            for workers in (None, 1):
+                collector = ps.Collector(None, 10, [self.resource_name, other_resource_name], False, None,
+                                         refresh_workers=workers, snapshot=self.snapshot)
+                collector.save_snapshot = Mock(wraps=collector.save_snapshot)
+                collector.refresh_proxies()
+
+                self.assertEqual(1, collector.save_snapshot.call_count)
+
+            collector = ps.Collector(None, 10, [self.resource_name, other_resource_name], False, None,
+                                     snapshot=self.snapshot)
+            self.assertEqual(3, len(collector._store.get_proxies()))
+        finally:
+            ps.RESOURCE_MAP.pop(other_resource_name, None)
+
+    def test_snapshot_loaded_without_refresh(self):
+        ps.Collector(None, 10, self.resource_name, False, None, snapshot=self.snapshot).refresh_proxies()
+        collector = ps.Collector(None, 10, self.resource_name, False, None, snapshot=self.snapshot)
+
+        self.assertSetEqual(self.proxies[0], set(collector.get_proxies()))
+        self.assertEqual(1, self.calls)
+
+    def test_expired_snapshot_refreshed(self):
+        ps.Collector(None, 10, self.resource_name, False, None, snapshot=self.snapshot).refresh_proxies()
+        self.proxies = [{self.create_proxy('10.0.0.3')}]
+        collector = ps.Collector(None, 0, self.resource_name, False, None, snapshot=self.snapshot)
+
+        self.assertSetEqual(self.proxies[0], set(collector.get_proxies()))
+        self.assertEqual(2, self.calls)
+
+    def test_save_snapshot_after_remove(self):
+        proxy = self.create_proxy('10.0.0.1')
+        collector = ps.Collector(None, 10, self.resource_name, False, None, snapshot=self.snapshot)
+        collector.refresh_proxies()
+        collector.remove_proxy(proxy)
+        collector.save_snapshot()
+
+        collector = ps.Collector(None, 10, self.resource_name, False, None, snapshot=self.snapshot)
+
+        self.assertSetEqual({self.create_proxy('10.0.0.2')}, set(collector.get_proxies()))
+
+    def test_columnar_store_snapshot(self):
+        ps.Collector(None, 10, self.resource_name, False, None, store='columnar', snapshot=self.snapshot).refresh_proxies()
+        collector = ps.Collector(None, 10, self.resource_name, False, None, store='columnar', snapshot=self.snapshot)
+
+        self.assertSetEqual(self.proxies[0], set(collector.get_proxies()))
+        self.assertEqual(1, self.calls)
+
+    def test_invalid_snapshot_ignored(self):
+        with open(self.snapshot, 'w') as f:
+            f.write('not a snapshot')
+
+        collector = ps.Collector(None, 10, self.resource_name, False, None, snapshot=self.snapshot)
+
+        self.assertSetEqual(self.proxies[0], set(collector.get_proxies()))
+        self.assertEqual(1, self.calls)
+
+    def test_save_snapshot_without_snapshot_raises(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        with self.assertRaises(ValueError):
+            collector.save_snapshot()
+
+
+class TestCollectorSharedPools(ResourceTestCase):
+    def setUp(self):
+        super(TestCollectorSharedPools, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.pool = os.path.join(self.directory, 'pool')
+        self.proxies = [{self.create_proxy('10.0.0.1'), self.create_proxy('10.0.0.2')},
+                        {self.create_proxy('10.0.0.3')}]
+
+    def tearDown(self):
+        super(TestCollectorSharedPools, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def test_reader_doesnt_refresh(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None, shared_pool=self.pool)
+
+        self.assertIsNone(collector.get_proxy())
+        self.assertEqual(0, self.calls)
+
+    def test_reader_reads_refreshed_proxies(self):
+        refresher = ps.Collector(None, 10, self.resource_name, False, None, shared_pool=self.pool, refresher=True)
+        reader = ps.Collector(None, 10, self.resource_name, False, None, shared_pool=self.pool)
+
+        refresher.refresh_proxies()
+        self.assertSetEqual(self.proxies[0], set(reader.get_proxies()))
+
+        refresher.refresh_proxies()
+        self.assertSetEqual(self.proxies[1], set(reader.get_proxies()))
+        self.assertEqual(2, self.calls)
+
+    def test_refresher_publishes_once_per_batch(self):
+        other_resource_name = self.resource_name + '-other'
+        other_proxy = self.create_proxy('10.0.0.4')
+        ps.RESOURCE_MAP[other_resource_name] = lambda: {other_proxy, }
+
+        try:
+            refresher = ps.Collector(None, 10, [self.resource_name, other_resource_name], False, None,
+                                     shared_pool=self.pool, refresher=True)
+            reader = ps.Collector(None, 10, self.resource_name, False, None, shared_pool=self.pool)
+            publish = refresher._pool_publisher.publish = Mock(wraps=refresher._pool_publisher.publish)
+
+            refresher.refresh_proxies()
+
+            self.assertEqual(1, publish.call_count)
+            self.assertSetEqual(self.proxies[0] | {other_proxy, }, set(reader.get_proxies()))
+        finally:
+            ps.RESOURCE_MAP.pop(other_resource_name, None)
+
+    def test_unchanged_pool_not_published_again(self):
+        refresher = ps.Collector(None, 10, self.resource_name, False, None, shared_pool=self.pool, refresher=True)
+        refresher.refresh_proxies()
+        publish = refresher._pool_publisher.publish = Mock(wraps=refresher._pool_publisher.publish)
+
+        refresher._publish_pool_quietly()
+        self.assertEqual(0, publish.call_count)
+
+        refresher.publish_pool()
+        self.assertEqual(1, publish.call_count)
+
+    def test_reader_removes_proxies(self):
+        proxy = self.create_proxy('10.0.0.1')
+        ps.Collector(None, 10, self.resource_name, False, None, shared_pool=self.pool, refresher=True).refresh_proxies()
+        reader = ps.Collector(None, 10, self.resource_name, False, None, shared_pool=self.pool)
+
+        reader.remove_proxy(proxy)
+
+        self.assertSetEqual(self.proxies[0] - {proxy, }, set(reader.get_proxies()))
+
+    def test_publish_pool_without_pool_raises(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        with self.assertRaises(ValueError):
+            collector.publish_pool()
+
+
+class TestTokenBuckets(unittest.TestCase):
+    def test_take_allows_burst_then_rate(self):
+        buckets = ps._TokenBuckets(2, 3)
+        key = ('10.0.0.1', '80')
+
+        self.assertListEqual([True, True, True, False], [buckets.take(key, 100) for _ in range(4)])
+        self.assertEqual(100.5, buckets.available_at(key))
+        self.assertFalse(buckets.take(key, 100.4))
+        self.assertTrue(buckets.take(key, 100.5))
+        self.assertFalse(buckets.take(key, 100.5))
+
+    def test_take_limits_each_proxy_separately(self):
+        buckets = ps._TokenBuckets(1)
+
+        self.assertTrue(buckets.take(('10.0.0.1', '80'), 100))
+        self.assertTrue(buckets.take(('10.0.0.2', '80'), 100))
+        self.assertFalse(buckets.take(('10.0.0.1', '80'), 100))
+        self.assertEqual(0, buckets.available_at(('10.0.0.3', '80')))
+
+    def test_full_buckets_are_dropped(self):
+        buckets = ps._TokenBuckets(1)
+        buckets._prune_size = 2
+
+        buckets.take(('10.0.0.1', '80'), 100)
+        buckets.take(('10.0.0.2', '80'), 100)
+        buckets.take(('10.0.0.3', '80'), 101.5)
+
+        self.assertEqual(1, len(buckets))
+
+    def test_invalid_rate_raises(self):
+        with self.assertRaises(ValueError):
+            ps._TokenBuckets(0)
+
+        with self.assertRaises(ValueError):
+            ps._TokenBuckets(1, 0)
+
+
+class TestCollectorRateLimits(ResourceTestCase):
+    def setUp(self):
+        super(TestCollectorRateLimits, self).setUp()
+        self.proxies = [{self.create_proxy('10.0.0.1'), self.create_proxy('10.0.0.2')}]
+
+    def test_get_proxy_returns_only_proxies_with_tokens(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None, rate_limit=1)
+
+        proxies = {collector.get_proxy(), collector.get_proxy()}
+
+        self.assertSetEqual(self.proxies[0], proxies)
+        self.assertIsNone(collector.get_proxy())
+
+    def test_get_proxy_returns_proxy_once_refilled(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None, rate_limit=20)
+        collector.get_proxy()
+        collector.get_proxy()
+
+        available_at = collector.available_at()
+        self.assertGreater(available_at, time.time())
+
+        time.sleep(max(0, available_at - time.time()) + 0.01)
+        self.assertIsNotNone(collector.get_proxy())
+
+    def test_get_proxy_doesnt_return_blacklisted(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None, rate_limit=1)
+        collector.blacklist_proxy(host='10.0.0.1', port='80')
+
+        self.assertEqual('10.0.0.2', collector.get_proxy().host)
+        self.assertIsNone(collector.get_proxy())
+
+    def test_available_at_now_if_not_rate_limited(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None)
+        collector.get_proxy()
+
+        self.assertLessEqual(collector.available_at(), time.time())
+
+    def test_available_at_none_if_none_match(self):
+        collector = ps.Collector(None, 10, self.resource_name, False, None, rate_limit=1)
+
+        self.assertIsNone(collector.available_at({'code': 'uk'}))
+
+
 if __name__ == '__main__':
     unittest.main()
     cwd = os.getcwd()
@@ -23,7 +23,7 @@
 import os
 import sys
 import time
-from threading import Thread
+from threading import Event, Thread
 import unittest
 try:
     from unittest.mock import Mock, patch
@@ -31,20 +31,28 @@ except ImportError:
     from mock import Mock, patch
 
 from proxyscrape.errors import (
+    InvalidHTMLError,
     InvalidResourceError,
     InvalidResourceTypeError,
+    RequestFailedError,
+    RequestNotOKError,
     ResourceAlreadyDefinedError,
     ResourceTypeAlreadyDefinedError
 )
 from proxyscrape.scrapers import (
     add_resource,
     add_resource_type,
+    add_table_resource,
     get_resources,
     get_resource_types,
     _resource_lock,
     _resource_type_lock,
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
     ProxyResource,
-    RESOURCE_MAP
+    RESOURCE_MAP,
+    TableSpec
 )
 import proxyscrape.scrapers as pss
 from proxyscrape.shared import Proxy
@@ -84,6 +92,19 @@ class TestProxyResource(unittest.TestCase):
         self.assertEqual(True, refreshed)
         self.assertEqual(expected[0], actual[0])
 
+    def test_restore_marks_refreshed(self):
+        pr = ProxyResource(lambda: [], 10)
+
+        pr.restore(time.time() - 5)
+        self.assertFalse(pr.is_expired())
+
+        pr.restore(time.time() - 20)
+        self.assertFalse(pr.is_expired())
+
+        pr = ProxyResource(lambda: [], 10)
+        pr.restore(time.time() - 20)
+        self.assertTrue(pr.is_expired())
+
     def test_doesnt_refresh_if_not_expired(self):
         expected = [Proxy('host', 'port', 'code', 'country', 'anonymous', 'type', 'source')]
 
@@ -137,21 +158,104 @@ class TestProxyResource(unittest.TestCase):
             self.assertEqual(False, refreshed)
             self.assertIsNone(actual)
 
+    def test_skips_refresh_while_circuit_open(self):
+        calls = []
+
+        def func():
+            calls.append(True)
+            raise RequestFailedError()
+
+        pr = ProxyResource(func, -1)
+
+        self.assertEqual((False, None), pr.refresh())
+        self.assertEqual((False, None), pr.refresh())
+        self.assertEqual(1, len(calls))
+        self.assertEqual(1, pr.failures)
+        self.assertEqual(CIRCUIT_OPEN, pr.state)
+        self.assertFalse(pr.is_expired())
+
+    def test_backoff_grows_with_failures(self):
+        def func():
+            raise RequestFailedError()
+
+        pr = ProxyResource(func, -1, min_backoff=10, max_backoff=25)
+        backoffs = []
+
+        for _ in range(4):
+            pr._retry_time = 0
+            start = time.time()
+            pr.refresh()
+            backoffs.append(pr.retry_time - start)
+
+        self.assertEqual(4, pr.failures)
+        self.assertTrue(5 <= backoffs[0] <= 10.1)
+        self.assertTrue(10 <= backoffs[1] <= 20.1)
+        self.assertTrue(12.5 <= backoffs[2] <= 25.1)
+        self.assertTrue(12.5 <= backoffs[3] <= 25.1)
+
+    def test_closes_circuit_on_success_when_half_open(self):
+        expected = [Proxy('host', 'port', 'code', 'country', 'anonymous', 'type', 'source')]
+        results = [RequestNotOKError(), expected]
+
+        def func():
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        pr = ProxyResource(func, -1)
+        pr.refresh()
+        pr._retry_time = 0
+
+        self.assertEqual(CIRCUIT_HALF_OPEN, pr.state)
+
+        refreshed, actual = pr.refresh()
+
+        self.assertEqual(True, refreshed)
+        self.assertEqual(expected, actual)
+        self.assertEqual(0, pr.failures)
+        self.assertEqual(CIRCUIT_CLOSED, pr.state)
+
+    def test_forced_refresh_ignores_open_circuit(self):
+        expected = [Proxy('host', 'port', 'code', 'country', 'anonymous', 'type', 'source')]
+        results = [RequestNotOKError(), expected]
+
+        def func():
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        pr = ProxyResource(func, -1)
+        pr.refresh()
+
+        self.assertEqual(CIRCUIT_OPEN, pr.state)
+        self.assertEqual((True, expected), pr.refresh(True))
+        self.assertEqual(CIRCUIT_CLOSED, pr.state)
+
 
 class TestScrapers(unittest.TestCase):
     def setUp(self):
         self.requests_patcher = patch('proxyscrape.shared.requests')
         self.requests = self.requests_patcher.start()
 
+        # Requests are made through the mocked module rather than a pooled session
+        self.session_patcher = patch('proxyscrape.shared.get_session', return_value=self.requests)
+        self.session_patcher.start()
+
+        # Pages shouldn't be reused between tests
+        pss._clear_page_cache()
+
     def tearDown(self):
         self.requests_patcher.stop()
+        self.session_patcher.stop()
 
     def test_anonymous_proxies_success(self):
         with open(os.path.join(cwd, 'mock_pages', 'anonymous-proxy.html'), 'r') as html:
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             expected = {
                 Proxy('179.124.59.232', '53281', 'br', 'brazil', True, 'https', 'anonymous-proxy'),
@@ -170,7 +274,7 @@ class TestScrapers(unittest.TestCase):
     def test_anonymous_proxies_not_ok(self):
         response = Mock()
         response.ok = False
-        self.requests.get = lambda url: response
+        self.requests.get = lambda url, **kwargs: response
 
         func = RESOURCE_MAP['anonymous-proxy']
         pr = ProxyResource(func, 10)
@@ -181,7 +285,7 @@ class TestScrapers(unittest.TestCase):
         self.assertIsNone(proxies)
 
     def test_anonymous_proxies_request_exception(self):
-        def raise_exception(url):
+        def raise_exception(url, **kwargs):
             raise self.requests.RequestException()
 
         self.requests.RequestException = Exception
@@ -200,7 +304,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             func = RESOURCE_MAP['anonymous-proxy']
             pr = ProxyResource(func, 10)
@@ -215,7 +319,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             expected = {
                 Proxy('179.124.59.232', '53281', 'br', 'brazil', True, 'https', 'free-proxy-list'),
@@ -234,7 +338,7 @@ class TestScrapers(unittest.TestCase):
     def test_free_proxy_list_proxies_not_ok(self):
         response = Mock()
         response.ok = False
-        self.requests.get = lambda url: response
+        self.requests.get = lambda url, **kwargs: response
 
         func = RESOURCE_MAP['free-proxy-list']
         pr = ProxyResource(func, 10)
@@ -245,7 +349,7 @@ class TestScrapers(unittest.TestCase):
         self.assertIsNone(proxies)
 
     def test_free_proxy_list_proxies_request_exception(self):
-        def raise_exception(url):
+        def raise_exception(url, **kwargs):
             raise self.requests.RequestException()
 
         self.requests.RequestException = Exception
@@ -264,7 +368,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             func = RESOURCE_MAP['free-proxy-list']
             pr = ProxyResource(func, 10)
@@ -279,7 +383,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             expected = {
                 Proxy('93.190.253.50', '80', None, None, None, 'http', 'proxy-daily-http'),
@@ -298,7 +402,7 @@ class TestScrapers(unittest.TestCase):
     def test_proxy_daily_http_proxies_not_ok(self):
         response = Mock()
         response.ok = False
-        self.requests.get = lambda url: response
+        self.requests.get = lambda url, **kwargs: response
 
         func = RESOURCE_MAP['proxy-daily-http']
         pr = ProxyResource(func, 10)
@@ -309,7 +413,7 @@ class TestScrapers(unittest.TestCase):
         self.assertIsNone(proxies)
 
     def test_proxy_daily_http_proxies_request_exception(self):
-        def raise_exception(url):
+        def raise_exception(url, **kwargs):
             raise self.requests.RequestException()
 
         self.requests.RequestException = Exception
@@ -328,7 +432,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             func = RESOURCE_MAP['proxy-daily-http']
             pr = ProxyResource(func, 10)
@@ -343,7 +447,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             expected = {
                 Proxy('54.38.156.185', '8888', None, None, None, 'socks4', 'proxy-daily-socks4'),
@@ -362,7 +466,7 @@ class TestScrapers(unittest.TestCase):
     def test_proxy_daily_socks4_proxies_not_ok(self):
         response = Mock()
         response.ok = False
-        self.requests.get = lambda url: response
+        self.requests.get = lambda url, **kwargs: response
 
         func = RESOURCE_MAP['proxy-daily-socks4']
         pr = ProxyResource(func, 10)
@@ -373,7 +477,7 @@ class TestScrapers(unittest.TestCase):
         self.assertIsNone(proxies)
 
     def test_proxy_daily_socks4_proxies_request_exception(self):
-        def raise_exception(url):
+        def raise_exception(url, **kwargs):
             raise self.requests.RequestException()
 
         self.requests.RequestException = Exception
@@ -392,7 +496,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             func = RESOURCE_MAP['proxy-daily-socks4']
             pr = ProxyResource(func, 10)
@@ -407,7 +511,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             expected = {
                 Proxy('176.9.19.170', '1080', None, None, None, 'socks5', 'proxy-daily-socks5'),
@@ -426,7 +530,7 @@ class TestScrapers(unittest.TestCase):
     def test_proxy_daily_socks5_proxies_not_ok(self):
         response = Mock()
         response.ok = False
-        self.requests.get = lambda url: response
+        self.requests.get = lambda url, **kwargs: response
 
         func = RESOURCE_MAP['proxy-daily-socks5']
         pr = ProxyResource(func, 10)
@@ -437,7 +541,7 @@ class TestScrapers(unittest.TestCase):
         self.assertIsNone(proxies)
 
     def test_proxy_daily_socks5_proxies_request_exception(self):
-        def raise_exception(url):
+        def raise_exception(url, **kwargs):
             raise self.requests.RequestException()
 
         self.requests.RequestException = Exception
@@ -456,7 +560,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             func = RESOURCE_MAP['proxy-daily-socks5']
             pr = ProxyResource(func, 10)
@@ -471,7 +575,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             expected = {
                 Proxy('179.124.59.232', '53281', 'br', 'brazil', True, 'socks4', 'socks-proxy'),
@@ -490,7 +594,7 @@ class TestScrapers(unittest.TestCase):
     def test_socks_proxies_not_ok(self):
         response = Mock()
         response.ok = False
-        self.requests.get = lambda url: response
+        self.requests.get = lambda url, **kwargs: response
 
         func = RESOURCE_MAP['socks-proxy']
         pr = ProxyResource(func, 10)
@@ -501,7 +605,7 @@ class TestScrapers(unittest.TestCase):
         self.assertIsNone(proxies)
 
     def test_socks_proxies_request_exception(self):
-        def raise_exception(url):
+        def raise_exception(url, **kwargs):
             raise self.requests.RequestException()
 
         self.requests.RequestException = Exception
@@ -520,7 +624,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             func = RESOURCE_MAP['socks-proxy']
             pr = ProxyResource(func, 10)
@@ -535,7 +639,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             expected = {
                 Proxy('179.124.59.232', '53281', 'br', 'brazil', True, 'https', 'ssl-proxy'),
@@ -554,7 +658,7 @@ class TestScrapers(unittest.TestCase):
     def test_ssl_proxies_not_ok(self):
         response = Mock()
         response.ok = False
-        self.requests.get = lambda url: response
+        self.requests.get = lambda url, **kwargs: response
 
         func = RESOURCE_MAP['ssl-proxy']
         pr = ProxyResource(func, 10)
@@ -565,7 +669,7 @@ class TestScrapers(unittest.TestCase):
         self.assertIsNone(proxies)
 
     def test_ssl_proxies_request_exception(self):
-        def raise_exception(url):
+        def raise_exception(url, **kwargs):
             raise self.requests.RequestException()
 
         self.requests.RequestException = Exception
@@ -584,7 +688,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             func = RESOURCE_MAP['ssl-proxy']
             pr = ProxyResource(func, 10)
@@ -599,7 +703,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             expected = {
                 Proxy('179.124.59.232', '53281', 'uk', 'united kingdom', True, 'https', 'uk-proxy'),
@@ -618,7 +722,7 @@ class TestScrapers(unittest.TestCase):
     def test_uk_proxies_not_ok(self):
         response = Mock()
         response.ok = False
-        self.requests.get = lambda url: response
+        self.requests.get = lambda url, **kwargs: response
 
         func = RESOURCE_MAP['uk-proxy']
         pr = ProxyResource(func, 10)
@@ -629,7 +733,7 @@ class TestScrapers(unittest.TestCase):
         self.assertIsNone(proxies)
 
     def test_uk_proxies_request_exception(self):
-        def raise_exception(url):
+        def raise_exception(url, **kwargs):
             raise self.requests.RequestException()
 
         self.requests.RequestException = Exception
@@ -648,7 +752,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             func = RESOURCE_MAP['uk-proxy']
             pr = ProxyResource(func, 10)
@@ -663,7 +767,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             expected = {
                 Proxy('179.124.59.232', '53281', 'us', 'united states', True, 'https', 'us-proxy'),
@@ -682,7 +786,7 @@ class TestScrapers(unittest.TestCase):
     def test_us_proxies_not_ok(self):
         response = Mock()
         response.ok = False
-        self.requests.get = lambda url: response
+        self.requests.get = lambda url, **kwargs: response
 
         func = RESOURCE_MAP['us-proxy']
         pr = ProxyResource(func, 10)
@@ -693,7 +797,7 @@ class TestScrapers(unittest.TestCase):
         self.assertIsNone(proxies)
 
     def test_us_proxies_request_exception(self):
-        def raise_exception(url):
+        def raise_exception(url, **kwargs):
             raise self.requests.RequestException()
 
         self.requests.RequestException = Exception
@@ -712,7 +816,7 @@ class TestScrapers(unittest.TestCase):
             response = Mock()
             response.content = html
             response.ok = True
-            self.requests.get = lambda url: response
+            self.requests.get = lambda url, **kwargs: response
 
             func = RESOURCE_MAP['us-proxy']
             pr = ProxyResource(func, 10)
@@ -723,6 +827,215 @@ class TestScrapers(unittest.TestCase):
             self.assertIsNone(proxies)
 
 
+class TestFetchPage(unittest.TestCase):
+    def setUp(self):
+        self.requests_patcher = patch('proxyscrape.shared.requests')
+        self.requests = self.requests_patcher.start()
+        self.session_patcher = patch('proxyscrape.shared.get_session', return_value=self.requests)
+        self.session_patcher.start()
+        pss._clear_page_cache()
+
+        self.urls = []
+        self.response = Mock()
+        self.response.ok = True
+
+        def get(url, **kwargs):
+            self.urls.append(url)
+            return self.response
+
+        self.requests.get = get
+
+    def tearDown(self):
+        self.requests_patcher.stop()
+        self.session_patcher.stop()
+
+    def test_proxy_daily_resources_share_page(self):
+        with open(os.path.join(cwd, 'mock_pages', 'proxy-daily-proxy.html'), 'r') as html:
+            self.response.content = html.read()
+
+        types = set()
+        for resource in ('proxy-daily-http', 'proxy-daily-socks4', 'proxy-daily-socks5'):
+            for proxy in ProxyResource(RESOURCE_MAP[resource], 10).refresh()[1]:
+                types.add(proxy.type)
+
+        self.assertEqual(1, len(self.urls))
+        self.assertSetEqual({'http', 'socks4', 'socks5'}, types)
+
+    def test_concurrent_callers_share_request(self):
+        started = Event()
+        release = Event()
+        results = []
+
+        def parse(response):
+            started.set()
+            release.wait()
+            return 'page'
+
+        def fetch():
+            results.append(pss.fetch_page('url', parse))
+
+        threads = [Thread(target=fetch) for _ in range(4)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(self.urls))
+        self.assertListEqual(['page'] * 4, results)
+
+    def test_failures_not_cached(self):
+        self.response.ok = False
+        with self.assertRaises(RequestNotOKError):
+            pss.fetch_page('url', lambda response: 'page')
+
+        self.response.ok = True
+        self.assertEqual('page', pss.fetch_page('url', lambda response: 'page'))
+        self.assertEqual(2, len(self.urls))
+
+    def test_refetches_once_expired(self):
+        def parse(response):
+            return 'page'
+
+        pss.fetch_page('url', parse, ttl=0)
+        pss.fetch_page('url', parse, ttl=0)
+        pss.fetch_page('other-url', parse, ttl=0)
+
+        self.assertListEqual(['url', 'url', 'other-url'], self.urls)
+
+    def test_fresh_pages_bypass_cache(self):
+        def parse(response):
+            return 'page'
+
+        pss.fetch_page('url', parse)
+        with pss.fresh_pages():
+            pss.fetch_page('url', parse)
+        pss.fetch_page('url', parse)
+
+        self.assertListEqual(['url', 'url'], self.urls)
+
+    def test_forced_refresh_bypasses_cache(self):
+        with open(os.path.join(cwd, 'mock_pages', 'proxy-daily-proxy.html'), 'r') as html:
+            self.response.content = html.read()
+
+        resource = ProxyResource(RESOURCE_MAP['proxy-daily-http'], 10)
+        resource.refresh()
+        ProxyResource(RESOURCE_MAP['proxy-daily-socks4'], 10).refresh()
+        self.assertEqual(1, len(self.urls))
+
+        refreshed, proxies = resource.refresh(True)
+
+        self.assertTrue(refreshed)
+        self.assertTrue(proxies)
+        self.assertEqual(2, len(self.urls))
+
+    def test_fresh_callers_share_request(self):
+        started = Event()
+        release = Event()
+        results = []
+
+        def parse(response):
+            started.set()
+            release.wait()
+            return 'page'
+
+        def fetch():
+            with pss.fresh_pages():
+                results.append(pss.fetch_page('url', parse))
+
+        threads = [Thread(target=fetch) for _ in range(4)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(self.urls))
+        self.assertListEqual(['page'] * 4, results)
+
+
+class TestTableResource(unittest.TestCase):
+    def setUp(self):
+        self.requests_patcher = patch('proxyscrape.shared.requests')
+        self.requests = self.requests_patcher.start()
+        self.session_patcher = patch('proxyscrape.shared.get_session', return_value=self.requests)
+        self.session_patcher.start()
+        pss._clear_page_cache()
+
+        # Revert constants to defaults before each test
+        pss.RESOURCE_MAP = RESOURCE_MAP_COPY.copy()
+        pss.RESOURCE_TYPE_MAP = {k: v.copy() for k, v in RESOURCE_TYPE_MAP_COPY.items()}
+        self.resource_name = get_random_resource_name(self)
+
+        self.urls = []
+        with open(os.path.join(cwd, 'mock_pages', 'socks-proxy.html'), 'r') as html:
+            self.response = Mock()
+            self.response.content = html.read()
+            self.response.ok = True
+
+        def get(url, **kwargs):
+            self.urls.append(url)
+            return self.response
+
+        self.requests.get = get
+
+    def tearDown(self):
+        self.requests_patcher.stop()
+        self.session_patcher.stop()
+
+    def test_add_table_resource_adds_resource(self):
+        add_table_resource(self.resource_name, TableSpec('url', {'host': 0, 'port': 1}), 'http')
+
+        self.assertIn(self.resource_name, pss.RESOURCE_MAP)
+        self.assertIn(self.resource_name, pss.RESOURCE_TYPE_MAP['http'])
+
+    def test_maps_columns_to_fields(self):
+        spec = TableSpec('url', {'host': 0, 'port': 1, 'country': 3, 'type': 4, 'anonymous': 5})
+        add_table_resource(self.resource_name, spec)
+
+        proxies = pss.RESOURCE_MAP[self.resource_name]()
+
+        self.assertIn(Proxy('179.124.59.232', '53281', None, 'brazil', True, 'socks4', self.resource_name), proxies)
+        self.assertEqual(3, len(proxies))
+
+    def test_derives_type(self):
+        spec1 = TableSpec('url', {'host': 0, 'port': 1}, 'socks')
+        spec2 = TableSpec('url', {'host': 0, 'port': 1}, lambda row: row[2].lower())
+        add_table_resource(self.resource_name + '1', spec1)
+        add_table_resource(self.resource_name + '2', spec2)
+
+        types1 = {proxy.type for proxy in pss.RESOURCE_MAP[self.resource_name + '1']()}
+        types2 = {proxy.type for proxy in pss.RESOURCE_MAP[self.resource_name + '2']()}
+
+        self.assertSetEqual({'socks'}, types1)
+        self.assertSetEqual({'br', 'ua', 'ru'}, types2)
+
+    def test_resources_sharing_page_parse_once(self):
+        add_table_resource(self.resource_name + '1', TableSpec('url', {'host': 0, 'port': 1}, 'socks4'))
+        add_table_resource(self.resource_name + '2', TableSpec('url', {'host': 0, 'port': 1}, 'socks5'))
+
+        with patch('proxyscrape.scrapers.parse_table_rows', wraps=pss.parse_table_rows) as parse_mock:
+            proxies1 = pss.RESOURCE_MAP[self.resource_name + '1']()
+            proxies2 = pss.RESOURCE_MAP[self.resource_name + '2']()
+
+        self.assertEqual(1, len(self.urls))
+        self.assertEqual(1, parse_mock.call_count)
+        self.assertSetEqual({'socks4'}, {proxy.type for proxy in proxies1})
+        self.assertSetEqual({self.resource_name + '2'}, {proxy.source for proxy in proxies2})
+
+    def test_invalid_html_if_missing_columns(self):
+        add_table_resource(self.resource_name, TableSpec('url', {'host': 0, 'port': 10}))
+
+        with self.assertRaises(InvalidHTMLError):
+            pss.RESOURCE_MAP[self.resource_name]()
+
+
 class TestResource(unittest.TestCase):
     def setUp(self):
         # Revert constants to defaults before each test
@@ -772,6 +1085,17 @@ class TestResource(unittest.TestCase):
         add_resource(self.resource_name, lambda: set(), None)
         self.assertIn(self.resource_name, pss.RESOURCE_MAP)
 
+    def test_add_resource_attributes(self):
+        add_resource(self.resource_name, lambda: set(), 'http', attributes={'code': 'us', 'country': ['united states']})
+        self.addCleanup(pss.RESOURCE_ATTRIBUTE_MAP.pop, self.resource_name)
+
+        self.assertDictEqual({'code': {'us', }, 'country': {'united states', }},
+                             pss.RESOURCE_ATTRIBUTE_MAP[self.resource_name])
+
+    def test_add_resource_no_attributes(self):
+        add_resource(self.resource_name, lambda: set(), 'http')
+        self.assertNotIn(self.resource_name, pss.RESOURCE_ATTRIBUTE_MAP)
+
     def test_add_resource_type_exception_if_duplicate(self):
         add_resource_type(self.resource_type_name)
 
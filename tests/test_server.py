@@ -0,0 +1,243 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import json
+import os
+import shutil
+import socket
+import struct
+import tempfile
+import unittest
+
+import proxyscrape.proxyscrape as ps
+from proxyscrape.errors import PoolServerError
+from proxyscrape.server import PoolServer, _parse_args
+from proxyscrape.shared import Proxy
+
+
+class TestPoolServer(unittest.TestCase):
+    def setUp(self):
+        self.resource_name = self._testMethodName + '-resource'
+        ps.RESOURCE_MAP[self.resource_name] = self.func
+        self.proxies = {Proxy('10.0.0.%d' % i, '80', ('us', 'uk')[i % 2], 'country', True, 'http', self.resource_name)
+                        for i in range(10)}
+        self.collector = ps.Collector(None, 10, self.resource_name, False, None)
+
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'pool.sock')
+        self.servers = []
+        self.sockets = []
+
+    def tearDown(self):
+        for sock in self.sockets:
+            sock.close()
+        for server in self.servers:
+            server.close()
+        shutil.rmtree(self.directory)
+        ps.RESOURCE_MAP.pop(self.resource_name, None)
+
+    def func(self):
+        return set(self.proxies)
+
+    def start_server(self, address=None):
+        server = PoolServer(self.collector, address or self.path).start()
+        self.servers.append(server)
+        return server
+
+    def connect(self, server):
+        if isinstance(server.address, str):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(server.address)
+        else:
+            sock = socket.create_connection(server.address)
+        sock.settimeout(5)
+        self.sockets.append(sock)
+        return sock
+
+    def receive(self, sock, size):
+        data = b''
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def call(self, sock, payload):
+        if not isinstance(payload, bytes):
+            payload = json.dumps(payload).encode('utf-8')
+        sock.sendall(struct.pack('!I', len(payload)) + payload)
+        size, = struct.unpack('!I', self.receive(sock, 4))
+        return json.loads(self.receive(sock, size).decode('utf-8'))
+
+    def test_get_proxy_over_unix_socket(self):
+        sock = self.connect(self.start_server())
+
+        status, fields = self.call(sock, ['get_proxy', [{'code': 'us'}]])
+
+        self.assertEqual(0, status)
+        self.assertIn(Proxy(*fields), self.proxies)
+        self.assertEqual('us', fields[2])
+
+    def test_get_proxy_over_tcp_socket(self):
+        server = self.start_server(('127.0.0.1', 0))
+        sock = self.connect(server)
+
+        status, fields = self.call(sock, ['get_proxy', []])
+
+        self.assertNotEqual(0, server.address[1])
+        self.assertEqual(0, status)
+        self.assertIn(Proxy(*fields), self.proxies)
+
+    def test_get_proxies(self):
+        sock = self.connect(self.start_server())
+
+        status, proxies = self.call(sock, ['get_proxies', [None]])
+
+        self.assertEqual(0, status)
+        self.assertSetEqual(self.proxies, {Proxy(*fields) for fields in proxies})
+
+    def test_get_proxies_reuses_encoding_until_changed(self):
+        server = self.start_server()
+        sock = self.connect(server)
+        self.call(sock, ['get_proxies', []])
+        self.assertEqual(1, len(server._encoded_proxies))
+
+        self.call(sock, ['get_proxies', []])
+        self.assertEqual(1, len(server._encoded_proxies))
+
+        proxy = next(iter(self.proxies))
+        self.call(sock, ['blacklist_proxy', [[[proxy.host, proxy.port]]]])
+        status, proxies = self.call(sock, ['get_proxies', []])
+
+        self.assertEqual(0, status)
+        self.assertEqual(len(self.proxies) - 1, len(proxies))
+        self.assertEqual(2, len(server._encoded_proxies))
+
+    def test_no_proxy_found(self):
+        sock = self.connect(self.start_server())
+
+        self.assertEqual([0, None], self.call(sock, ['get_proxy', [{'code': 'ca'}]]))
+        self.assertEqual([0, None], self.call(sock, ['get_proxies', [{'code': 'ca'}]]))
+
+    def test_requests_handled_in_order_on_connection(self):
+        sock = self.connect(self.start_server())
+        proxy = next(iter(self.proxies))
+
+        for _ in range(3):
+            self.assertEqual([0, None], self.call(sock, ['blacklist_proxy', [None, proxy.host, proxy.port]]))
+            self.assertNotIn(list(proxy), self.call(sock, ['get_proxies', []])[1])
+            self.assertEqual([0, None], self.call(sock, ['remove_blacklist', [None, proxy.host, proxy.port]]))
+            self.assertIn(list(proxy), self.call(sock, ['get_proxies', []])[1])
+
+    def test_collector_errors_returned(self):
+        sock = self.connect(self.start_server())
+
+        self.assertEqual([1, 'InvalidFilterOptionError', 'bad is an invalid filter option'],
+                         self.call(sock, ['get_proxy', [{'bad': 'us'}]]))
+        self.assertEqual([1, 'ValueError', 'Either proxies or host and port should be given'],
+                         self.call(sock, ['blacklist_proxy', []]))
+
+    def test_invalid_requests_returned_as_errors(self):
+        sock = self.connect(self.start_server())
+
+        self.assertEqual([1, 'ValueError', 'Invalid request'], self.call(sock, b'not json'))
+        self.assertEqual([1, 'ValueError', 'Invalid request'], self.call(sock, ['get_proxy']))
+        self.assertEqual([1, 'ValueError', 'Unknown method: \'close\''], self.call(sock, ['close', []]))
+        self.assertEqual('TypeError', self.call(sock, ['get_proxy', [None, None, None]])[1])
+
+        # The connection is still usable
+        self.assertEqual(0, self.call(sock, ['get_proxy', []])[0])
+
+    def test_oversized_frame_closes_connection(self):
+        sock = self.connect(self.start_server())
+
+        sock.sendall(struct.pack('!I', 1 << 30))
+
+        self.assertEqual(b'', self.receive(sock, 4))
+
+    def test_report_and_remove_proxies(self):
+        sock = self.connect(self.start_server())
+        proxy = next(iter(self.proxies))
+        self.call(sock, ['refresh_proxies', []])
+
+        self.assertEqual([0, None], self.call(sock, ['report_failure', [[proxy.host, proxy.port]]]))
+        self.assertEqual([0, None], self.call(sock, ['report_success', [[proxy.host, proxy.port], 0.5]]))
+        self.assertEqual([0, None], self.call(sock, ['remove_proxy', [[list(proxy)]]]))
+
+        self.assertNotIn(proxy, self.collector.get_proxies())
+        self.assertNotEqual(1.0, self.collector._scores.weight((proxy.host, proxy.port)))
+
+    def test_clients_share_collector(self):
+        server = self.start_server()
+        first, second = self.connect(server), self.connect(server)
+
+        self.call(first, ['apply_filter', [{'code': 'uk'}]])
+
+        self.assertEqual('uk', self.call(second, ['get_proxy', []])[1][2])
+        self.call(second, ['clear_filter', []])
+        self.assertEqual(len(self.proxies), len(self.call(first, ['get_proxies', []])[1]))
+
+    def test_close_closes_connections_and_removes_socket(self):
+        server = self.start_server()
+        sock = self.connect(server)
+        self.call(sock, ['get_proxy', []])
+
+        server.close()
+
+        self.assertEqual(b'', self.receive(sock, 4))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_stale_socket_replaced(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()
+
+        sock = self.connect(self.start_server())
+
+        self.assertEqual(0, self.call(sock, ['get_proxy', []])[0])
+
+    def test_listening_socket_not_replaced(self):
+        self.start_server()
+
+        with self.assertRaises(PoolServerError):
+            PoolServer(self.collector, self.path)
+
+    def test_parse_args(self):
+        args = _parse_args(['--unix', self.path, '--resource-types', 'http', 'https', '--strategy', 'weighted'])
+
+        self.assertEqual(self.path, args.unix)
+        self.assertEqual(['http', 'https'], args.resource_types)
+        self.assertEqual('weighted', args.strategy)
+        self.assertEqual(3600, args.refresh_interval)
+
+    def test_parse_args_elite(self):
+        args = _parse_args(['--resources', 'didsoft-proxy-list', '--elite', '--external-url', 'https://example.com'])
+
+        self.assertTrue(args.elite)
+        self.assertEqual('https://example.com', args.external_url)
+
+        with self.assertRaises(SystemExit):
+            _parse_args(['--resources', 'didsoft-proxy-list', '--elite'])
+
+    def test_parse_args_requires_resources(self):
+        with self.assertRaises(SystemExit):
+            _parse_args(['--unix', self.path])
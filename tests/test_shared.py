@@ -0,0 +1,195 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from collections import namedtuple
+import pickle
+from threading import Thread
+import unittest
+try:
+    from unittest.mock import Mock, patch
+except ImportError:
+    from mock import Mock, patch
+
+from proxyscrape.errors import RequestFailedError, RequestNotOKError
+import proxyscrape.shared as shared
+from proxyscrape.scrapers import ProxyResource
+from proxyscrape.shared import (
+    configure_session,
+    get_session,
+    Proxy,
+    request_proxy_list,
+    request_timeout
+)
+
+ProxyTuple = namedtuple('ProxyTuple', ['host', 'port', 'code', 'country', 'anonymous', 'type', 'source'])
+
+
+class TestProxy(unittest.TestCase):
+    def setUp(self):
+        self.values = ('12.34.56.78', '8080', 'us', 'united states', True, 'http', 'source')
+        self.proxy = Proxy(*self.values)
+
+    def test_attribute_and_index_access(self):
+        for index, field in enumerate(Proxy._fields):
+            self.assertEqual(self.values[index], getattr(self.proxy, field))
+            self.assertEqual(self.values[index], self.proxy[index])
+
+        self.assertEqual('source', self.proxy[-1])
+        self.assertEqual(self.values[:2], self.proxy[:2])
+        self.assertEqual(7, len(self.proxy))
+
+    def test_unpacks_as_tuple(self):
+        host, port, code, country, anonymous, type, source = self.proxy
+        self.assertEqual(self.values, (host, port, code, country, anonymous, type, source))
+
+    def test_equals_and_hashes_as_tuple(self):
+        other = ProxyTuple(*self.values)
+
+        self.assertEqual(self.proxy, other)
+        self.assertEqual(other, self.proxy)
+        self.assertEqual(self.values, tuple(self.proxy))
+        self.assertEqual(hash(other), hash(self.proxy))
+        self.assertIn(other, {self.proxy, })
+        self.assertNotEqual(self.proxy, Proxy('12.34.56.78', '8081', 'us', 'united states', True, 'http', 'source'))
+
+    def test_packs_ipv4_address(self):
+        self.assertIsInstance(self.proxy._address, int)
+
+    def test_accessing_address_keeps_it_packed(self):
+        self.assertEqual('12.34.56.78', self.proxy.host)
+        self.assertEqual('8080', self.proxy[1])
+        self.assertEqual(self.values, tuple(self.proxy))
+
+        self.assertIsInstance(self.proxy._address, int)
+        self.assertFalse(hasattr(self.proxy, '__dict__'))
+
+    def test_unpacked_addresses_bounded(self):
+        proxies = [Proxy('10.0.%d.%d' % (i // 256, i % 256), '80', 'us', 'us', True, 'http', 'source')
+                   for i in range(shared._MAX_UNPACKED_ADDRESSES + 10)]
+
+        for proxy in proxies:
+            self.assertEqual('80', proxy.port)
+
+        self.assertLessEqual(len(shared._unpacked_addresses), shared._MAX_UNPACKED_ADDRESSES)
+        self.assertEqual(('10.0.0.1', '80'), shared._host_port(proxies[1]))
+        self.assertEqual(('host', 'port'), shared._host_port(('host', 'port', 'code')))
+
+    def test_keeps_non_canonical_address(self):
+        for host, port in (('host', 'port'), ('012.34.56.78', '80'), ('12.34.56.78', '080'), ('1.2.3', '80'),
+                           ('12.34.56.78', '65536'), ('12.34.56.78', 80)):
+            proxy = Proxy(host, port, None, None, None, None, None)
+            self.assertEqual((host, port), (proxy.host, proxy.port))
+            self.assertEqual((host, port), proxy._address)
+
+    def test_interns_categorical_fields(self):
+        proxy = Proxy('12.34.56.79', '80', ''.join(['u', 's']), ''.join(['united ', 'states']), True, 'http', 'x')
+        self.assertIs(self.proxy.code, proxy.code)
+        self.assertIs(self.proxy.country, proxy.country)
+
+    def test_namedtuple_helpers(self):
+        self.assertEqual(self.values, tuple(Proxy._make(self.values)))
+        self.assertEqual(dict(zip(Proxy._fields, self.values)), self.proxy._asdict())
+        self.assertEqual('80', self.proxy._replace(port='80').port)
+
+    def test_pickles(self):
+        self.assertEqual(self.proxy, pickle.loads(pickle.dumps(self.proxy)))
+
+    def test_repr(self):
+        self.assertEqual("Proxy(host='12.34.56.78', port='8080', code='us', country='united states', anonymous=True, "
+                         "type='http', source='source')", repr(self.proxy))
+
+
+class TestSession(unittest.TestCase):
+    def tearDown(self):
+        configure_session()
+
+    def test_get_session_reused_by_thread(self):
+        self.assertIs(get_session(), get_session())
+
+    def test_get_session_shares_connection_pool_across_threads(self):
+        sessions = []
+        thread = Thread(target=lambda: sessions.append(get_session()))
+        thread.start()
+        thread.join()
+
+        session = get_session()
+
+        self.assertIsNot(session, sessions[0])
+        self.assertIs(session.get_adapter('http://a'), sessions[0].get_adapter('https://b'))
+
+    def test_get_session_recreated_after_fork(self):
+        session = get_session()
+        shared._adapter_pid = -1
+
+        self.assertIsNot(session, get_session())
+
+    def test_configure_session_sets_pool_and_retries(self):
+        configure_session(pool_connections=2, pool_maxsize=3, max_retries=4)
+        adapter = get_session().get_adapter('http://a')
+
+        self.assertEqual(3, adapter._pool_maxsize)
+        self.assertEqual(4, adapter.max_retries.total)
+
+
+class TestRequestProxyList(unittest.TestCase):
+    def setUp(self):
+        self.session = Mock()
+        self.session.get.return_value.ok = True
+        self.session_patcher = patch('proxyscrape.shared.get_session', return_value=self.session)
+        self.session_patcher.start()
+
+    def tearDown(self):
+        self.session_patcher.stop()
+        configure_session()
+
+    def test_uses_default_timeout(self):
+        configure_session(timeout=(1, 2))
+        request_proxy_list('url')
+        self.session.get.assert_called_once_with('url', timeout=(1, 2))
+
+    def test_uses_context_timeout(self):
+        with request_timeout(3):
+            request_proxy_list('url')
+        request_proxy_list('url')
+
+        self.assertEqual(3, self.session.get.call_args_list[0][1]['timeout'])
+        self.assertEqual((5, 30), self.session.get.call_args_list[1][1]['timeout'])
+
+    def test_uses_resource_timeout(self):
+        pr = ProxyResource(lambda: request_proxy_list('url'), 10, timeout=(2, 4))
+        pr.refresh()
+        self.session.get.assert_called_once_with('url', timeout=(2, 4))
+
+    def test_exception_if_not_ok(self):
+        self.session.get.return_value.ok = False
+        with self.assertRaises(RequestNotOKError):
+            request_proxy_list('url')
+
+    def test_exception_if_request_failed(self):
+        self.session.get.side_effect = shared.requests.ConnectionError()
+        with self.assertRaises(RequestFailedError):
+            request_proxy_list('url')
+
+
+if __name__ == '__main__':
+    unittest.main()
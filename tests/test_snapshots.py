@@ -0,0 +1,67 @@
+# MIT License
+#
+# Copyright (c) 2018 Jared Gillespie
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from proxyscrape.shared import Proxy
+from proxyscrape.snapshots import load_snapshot, save_snapshot
+
+
+class TestSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'proxies.snapshot')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_save_and_load(self):
+        proxies = {Proxy('10.0.0.1', '80', 'us', 'united states', True, 'http', 'source'),
+                   Proxy('::1', '8080', None, None, False, 'https', 'source')}
+
+        save_snapshot(self.path, [('a', 100.5, proxies), ('b', 200, [])])
+
+        self.assertDictEqual({'a': (100.5, proxies), 'b': (200, set())}, load_snapshot(self.path))
+        self.assertListEqual(['proxies.snapshot'], os.listdir(self.directory))
+
+    def test_save_replaces_snapshot(self):
+        save_snapshot(self.path, [('a', 100, [])])
+        save_snapshot(self.path, [('b', 200, [])])
+
+        self.assertDictEqual({'b': (200, set())}, load_snapshot(self.path))
+
+    def test_load_missing_snapshot_raises(self):
+        with self.assertRaises((IOError, OSError)):
+            load_snapshot(self.path)
+
+    def test_load_invalid_snapshot_raises(self):
+        for content in (b'', b'not a snapshot\n', b'{"format":"proxyscrape-snapshot","version":1}\n{"resource":"a"}\n'):
+            with io.open(self.path, 'wb') as f:
+                f.write(content)
+
+            with self.assertRaises(ValueError):
+                load_snapshot(self.path)
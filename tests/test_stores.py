@@ -21,10 +21,27 @@
 # SOFTWARE.
 
 
+import gc
 import os
+from threading import Thread
 import unittest
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
 from proxyscrape.scrapers import Proxy
-from proxyscrape.stores import Store
+import proxyscrape.stores as stores
+from proxyscrape.stores import (
+    ColumnarStore,
+    ConsistentHashing,
+    HealthScores,
+    LeastRecentlyUsedStrategy,
+    RoundRobinStrategy,
+    SQLiteStore,
+    Store,
+    WeightedStrategy
+)
 
 
 class TestStores(unittest.TestCase):
@@ -106,6 +123,62 @@ class TestStores(unittest.TestCase):
 
         self.assertEqual(actual, expected)
 
+    def test_get_proxy_returns_unblacklisted_if_mostly_blacklisted(self):
+        store = Store()
+        id = store.add_store()
+        proxies = {Proxy('host%d' % i, 'port', 'us', 'united states', True, 'http', 'source') for i in range(100)}
+        expected = Proxy('host', 'port', 'us', 'united states', True, 'http', 'source')
+
+        store.update_store(id, proxies | {expected, })
+        actual = store.get_proxy(blacklist={(p[0], p[1]) for p in proxies})
+
+        self.assertEqual(expected, actual)
+
+    def test_get_proxy_samples_all_matching_proxies(self):
+        store = Store()
+        id1 = store.add_store()
+        id2 = store.add_store()
+        proxy1 = Proxy('host1', 'port', 'us', 'united states', True, 'http', 'source1')
+        proxy2 = Proxy('host2', 'port', 'us', 'united states', False, 'http', 'source1')
+        proxy3 = Proxy('host3', 'port', 'us', 'united states', True, 'https', 'source2')
+        proxy4 = Proxy('host4', 'port', 'uk', 'united kingdom', True, 'http', 'source2')
+
+        store.update_store(id1, {proxy1, proxy2})
+        store.update_store(id2, {proxy3, proxy4})
+        actual = {store.get_proxy(filter_opts={'code': {'us', }}) for _ in range(200)}
+
+        self.assertSetEqual({proxy1, proxy2, proxy3}, actual)
+
+    def test_get_proxy_uniform_across_partitions(self):
+        store = Store()
+        id = store.add_store()
+        other_id = store.add_store()
+        proxies = [Proxy('host%d' % i, 'port', 'us', 'united states', True, 'http', 'source') for i in range(3)]
+        proxies.append(Proxy('host3', 'port', 'uk', 'united kingdom', False, 'https', 'source'))
+        proxies.append(Proxy('host4', 'port', 'ca', 'canada', True, 'http', 'other'))
+
+        store.update_store(id, set(proxies[:4]))
+        store.update_store(other_id, {proxies[4], })
+        counts = dict.fromkeys(proxies, 0)
+        for _ in range(5000):
+            counts[store.get_proxy()] += 1
+
+        for proxy in proxies:
+            self.assertGreater(counts[proxy], 800)
+            self.assertLess(counts[proxy], 1200)
+
+    def test_get_proxy_after_removing_proxies(self):
+        store = Store()
+        id = store.add_store()
+        proxies = [Proxy('host%d' % i, 'port', 'us', 'united states', True, 'http', 'source') for i in range(5)]
+
+        store.update_store(id, set(proxies))
+        for proxy in proxies[:4]:
+            store.remove_proxy(id, proxy)
+        actual = {store.get_proxy() for _ in range(20)}
+
+        self.assertSetEqual({proxies[4], }, actual)
+
     def test_get_proxies_returns_empty_if_no_stores(self):
         store = Store()
         proxies = store.get_proxies()
@@ -179,6 +252,57 @@ class TestStores(unittest.TestCase):
 
         self.assertEqual(actual[0], expected)
 
+    def test_get_proxies_filters_on_multiple_options(self):
+        store = Store()
+        id = store.add_store()
+        proxy1 = Proxy('host1', 'port', 'us', 'united states', True, 'http', 'source')
+        proxy2 = Proxy('host2', 'port', 'us', 'united states', False, 'http', 'source')
+        proxy3 = Proxy('host3', 'port', 'uk', 'united kingdom', True, 'https', 'source')
+
+        store.update_store(id, {proxy1, proxy2, proxy3})
+        actual = store.get_proxies(filter_opts={'code': {'us', 'uk'}, 'anonymous': {True, }})
+
+        self.assertSetEqual({proxy1, proxy3}, set(actual))
+
+    def test_get_proxies_filters_on_options_of_different_selectivity(self):
+        store = Store()
+        id = store.add_store()
+        proxies = {Proxy('host%d' % i, 'port', ('us', 'uk', 'ca')[i % 3], 'country%d' % (i % 10), i % 2 == 0,
+                         ('http', 'https')[i % 2], 'source') for i in range(60)}
+
+        store.update_store(id, proxies)
+        actual = store.get_proxies(filter_opts={'type': {'http', }, 'code': {'us', 'ca'}, 'country': {'country4', }})
+
+        expected = {p for p in proxies if p.type == 'http' and p.code in ('us', 'ca') and p.country == 'country4'}
+        self.assertTrue(expected)
+        self.assertSetEqual(expected, set(actual))
+
+    def test_get_proxies_filters_across_stores(self):
+        store = Store()
+        id1 = store.add_store()
+        id2 = store.add_store()
+        proxy1 = Proxy('host1', 'port', 'us', 'united states', True, 'http', 'source1')
+        proxy2 = Proxy('host2', 'port', 'uk', 'united kingdom', True, 'http', 'source2')
+        proxy3 = Proxy('host3', 'port', 'us', 'united states', True, 'https', 'source2')
+
+        store.update_store(id1, {proxy1, })
+        store.update_store(id2, {proxy2, proxy3})
+        actual = store.get_proxies(filter_opts={'code': {'us', }, 'type': {'http', 'https'}})
+
+        self.assertSetEqual({proxy1, proxy3}, set(actual))
+
+    def test_remove_proxy_removes_from_filter(self):
+        store = Store()
+        id = store.add_store()
+        proxy1 = Proxy('host1', 'port', 'us', 'united states', True, 'http', 'source')
+        proxy2 = Proxy('host2', 'port', 'uk', 'united kingdom', True, 'http', 'source')
+
+        store.update_store(id, {proxy1, proxy2})
+        store.remove_proxy(id, proxy1)
+
+        self.assertIsNone(store.get_proxies(filter_opts={'code': {'us', }}))
+        self.assertEqual([proxy2], store.get_proxies(filter_opts={'type': {'http', }}))
+
     def test_remove_proxy_removes_from_set(self):
         store = Store()
         id = store.add_store()
@@ -225,6 +349,94 @@ class TestStores(unittest.TestCase):
 
         self.assertEqual(proxy, actual)
 
+    def test_update_store_readers_never_see_empty_store(self):
+        store = Store()
+        id = store.add_store()
+        proxies = [{Proxy('host%d' % i, str(j), 'us', 'united states', True, 'http', 'source') for i in range(50)}
+                   for j in range(2)]
+        store.update_store(id, proxies[0])
+        misses = []
+
+        def update():
+            for i in range(200):
+                store.update_store(id, proxies[i % 2])
+
+        def read():
+            for _ in range(200):
+                if store.get_proxies() is None or store.get_proxy({'code': {'us', }}) is None:
+                    misses.append(True)
+
+        threads = [Thread(target=update)] + [Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertListEqual([], misses)
+
+    def test_remove_proxy_doesnt_modify_previous_snapshot(self):
+        store = Store()
+        id = store.add_store()
+        proxy1 = Proxy('host1', 'port', 'us', 'united states', True, 'http', 'source')
+        proxy2 = Proxy('host2', 'port', 'uk', 'united kingdom', True, 'http', 'source')
+
+        store.update_store(id, {proxy1, proxy2})
+        snapshot = store._stores[id]
+        store.remove_proxy(id, proxy1)
+
+        self.assertEqual(2, len(snapshot))
+        self.assertEqual(1, len(store._stores[id]))
+        self.assertEqual([proxy2], store.get_proxies())
+
+    def test_version_increases_when_proxies_change(self):
+        store = Store()
+        id = store.add_store()
+        proxy = Proxy('host', 'port', 'us', 'united states', True, 'http', 'source')
+        versions = [store.version]
+
+        store.update_store(id, {proxy, })
+        versions.append(store.version)
+        store.remove_proxy(id, proxy)
+        versions.append(store.version)
+
+        self.assertListEqual(sorted(set(versions)), versions)
+
+    def test_remove_proxies_publishes_once(self):
+        store = Store()
+        id = store.add_store()
+        proxies = [Proxy('host%d' % i, 'port', 'us', 'united states', i % 2 == 0, 'http', 'source')
+                   for i in range(4)]
+
+        store.update_store(id, set(proxies))
+        version = store.version
+        store.remove_proxies(id, proxies[:3])
+
+        self.assertEqual(version + 1, store.version)
+        self.assertEqual([proxies[3]], store.get_proxies())
+
+    def test_remove_proxies_none_stored_does_nothing(self):
+        store = Store()
+        id = store.add_store()
+        proxy = Proxy('host', 'port', 'us', 'united states', True, 'http', 'source')
+
+        store.update_store(id, {proxy, })
+        version = store.version
+        store.remove_proxies(id, [proxy._replace(port='other')])
+
+        self.assertEqual(version, store.version)
+
+    def test_get_store_proxies(self):
+        store = Store()
+        id = store.add_store()
+        other_id = store.add_store()
+        proxy = Proxy('host', 'source', 'us', 'united states', True, 'type', 'source')
+
+        store.update_store(id, {proxy, })
+        store.update_store(other_id, {proxy._replace(host='other'), })
+
+        self.assertListEqual([proxy], store.get_store_proxies(id))
+        self.assertListEqual([], store.get_store_proxies(1))
+
     def test_update_store_invalid_id_does_nothing(self):
         store = Store()
         proxy = Proxy('host', 'source', 'us', 'united states', True, 'type', 'source')
@@ -234,6 +446,588 @@ class TestStores(unittest.TestCase):
         self.assertIsNone(proxy)
 
 
+class TestColumnarStores(unittest.TestCase):
+    def setUp(self):
+        self.proxies = {Proxy('10.0.0.%d' % i, str(8000 + i), code, country, i % 2 == 0, type, 'source')
+                        for i, (code, country, type) in enumerate([('us', 'united states', 'http'),
+                                                                   ('us', 'united states', 'https'),
+                                                                   ('uk', 'united kingdom', 'http'),
+                                                                   ('ca', 'canada', 'socks5')])}
+
+    def test_get_proxies_returns_all_proxies(self):
+        store = ColumnarStore()
+        id = store.add_store()
+
+        store.update_store(id, self.proxies)
+        actual = store.get_proxies()
+
+        self.assertSetEqual(self.proxies, set(actual))
+
+    def test_get_proxies_filters_on_multiple_options(self):
+        store = ColumnarStore()
+        id = store.add_store()
+
+        store.update_store(id, self.proxies)
+        actual = store.get_proxies({'code': {'us', 'uk'}, 'type': {'http', }})
+
+        self.assertSetEqual({p for p in self.proxies if p.code in ('us', 'uk') and p.type == 'http'}, set(actual))
+
+    def test_get_proxies_filters_on_anonymous(self):
+        store = ColumnarStore()
+        id = store.add_store()
+
+        store.update_store(id, self.proxies)
+        actual = store.get_proxies({'anonymous': {False, }})
+
+        self.assertSetEqual({p for p in self.proxies if not p.anonymous}, set(actual))
+
+    def test_get_proxies_returns_empty_if_value_not_stored(self):
+        store = ColumnarStore()
+        id = store.add_store()
+
+        store.update_store(id, self.proxies)
+        actual = store.get_proxies({'code': {'us', }, 'type': {'socks4', }})
+
+        self.assertIsNone(actual)
+
+    def test_get_proxies_repeated_filter_returns_same_proxies(self):
+        store = ColumnarStore()
+        id = store.add_store()
+
+        store.update_store(id, self.proxies)
+        first = store.get_proxies({'code': {'us', }})
+        second = store.get_proxies({'code': {'us', }})
+
+        self.assertSetEqual(set(first), set(second))
+
+    def test_get_proxy_returns_proxy_matching_filter(self):
+        store = ColumnarStore()
+        id = store.add_store()
+
+        store.update_store(id, self.proxies)
+        actual = store.get_proxy({'code': {'ca', }})
+
+        self.assertEqual('10.0.0.3', actual.host)
+        self.assertEqual('8003', actual.port)
+        self.assertEqual('socks5', actual.type)
+
+    def test_get_proxy_returns_proxy_with_unpacked_host(self):
+        store = ColumnarStore()
+        id = store.add_store()
+        proxy = Proxy('proxy.example.com', '080', 'us', 'united states', True, 'http', 'source')
+
+        store.update_store(id, {proxy, })
+        actual = store.get_proxy()
+
+        self.assertEqual(proxy, actual)
+
+    def test_get_proxy_returns_tuple_proxies(self):
+        store = ColumnarStore()
+        id = store.add_store()
+        proxy = ('10.0.0.1', '80', 'us', 'united states', True, 'http', 'source')
+
+        store.update_store(id, {proxy, })
+        actual = store.get_proxy({'code': {'us', }})
+
+        self.assertEqual(proxy, actual)
+
+    def test_remove_proxy_removes_only_that_proxy(self):
+        store = ColumnarStore()
+        id = store.add_store()
+        proxy = Proxy('10.0.0.1', '8001', 'us', 'united states', False, 'https', 'source')
+
+        store.update_store(id, self.proxies)
+        store.remove_proxy(id, proxy)
+
+        self.assertSetEqual(self.proxies - {proxy, }, set(store.get_proxies()))
+        self.assertIsNone(store.get_proxies({'type': {'https', }}))
+
+    def test_remove_proxy_with_different_fields_does_nothing(self):
+        store = ColumnarStore()
+        id = store.add_store()
+
+        store.update_store(id, self.proxies)
+        store.remove_proxy(id, Proxy('10.0.0.1', '8001', 'uk', 'united states', False, 'https', 'source'))
+
+        self.assertSetEqual(self.proxies, set(store.get_proxies()))
+
+    def test_remove_proxy_doesnt_modify_previous_snapshot(self):
+        store = ColumnarStore()
+        id = store.add_store()
+        proxy = Proxy('10.0.0.1', '8001', 'us', 'united states', False, 'https', 'source')
+
+        store.update_store(id, self.proxies)
+        snapshot = store._stores[id]
+        store.remove_proxy(id, proxy)
+
+        self.assertEqual(4, len(snapshot))
+        self.assertEqual(3, len(store._stores[id]))
+
+    def test_remove_proxies_removes_only_those_proxies(self):
+        store = ColumnarStore()
+        id = store.add_store()
+        irregular = {Proxy('proxy%d.example.com' % i, '80', 'us', 'united states', True, 'http', 'source')
+                     for i in range(3)}
+        removed = {Proxy('10.0.0.1', '8001', 'us', 'united states', False, 'https', 'source'),
+                   Proxy('10.0.0.3', '8003', 'ca', 'canada', False, 'socks5', 'source'),
+                   Proxy('proxy1.example.com', '80', 'us', 'united states', True, 'http', 'source')}
+
+        store.update_store(id, self.proxies | irregular)
+        store.remove_proxies(id, removed)
+
+        self.assertSetEqual((self.proxies | irregular) - removed, set(store.get_proxies()))
+        self.assertSetEqual({p for p in (self.proxies | irregular) - removed if p.type == 'http' and p.anonymous},
+                            set(store.get_proxies({'type': {'http', }, 'anonymous': {True, }})))
+
+    def test_update_store_matches_store(self):
+        proxies = {Proxy('%d.%d.%d.%d' % (i % 7, i % 11, i % 13, i % 17), str(i), code, code, i % 3 == 0, type,
+                         'source')
+                   for i in range(300) for code, type in [(('us', 'uk', 'ca')[i % 3], ('http', 'https')[i % 2])]}
+        filters = [None, {'code': {'us', }}, {'code': {'uk', 'ca'}, 'type': {'https', }},
+                   {'anonymous': {True, }, 'type': {'http', }, 'country': {'us', 'uk'}}]
+        store = Store()
+        columnar_store = ColumnarStore()
+
+        store.update_store(store.add_store(), proxies)
+        columnar_store.update_store(columnar_store.add_store(), proxies)
+
+        for filter_opts in filters:
+            self.assertSetEqual(set(store.get_proxies(filter_opts)), set(columnar_store.get_proxies(filter_opts)))
+
+    def test_get_store_proxies(self):
+        store = ColumnarStore()
+        id = store.add_store()
+
+        store.update_store(id, self.proxies)
+
+        self.assertSetEqual(self.proxies, set(store.get_store_proxies(id)))
+
+
+class TestSQLiteStores(unittest.TestCase):
+    def setUp(self):
+        self.proxies = {Proxy('10.0.0.%d' % i, str(8000 + i), code, code, i % 2 == 0, type, 'source')
+                        for i in range(40)
+                        for code, type in [(('us', 'uk', 'ca')[i % 3], ('http', 'https')[i % 4 // 2])]}
+        self.store = SQLiteStore()
+        self.id = self.store.add_store()
+
+    def tearDown(self):
+        self.store.close()
+
+    def count_rows(self):
+        connection = self.store._connect()
+        tables = [name for name, in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        return len(tables), sum(connection.execute('SELECT COUNT(*) FROM ' + name).fetchone()[0] for name in tables)
+
+    def test_get_proxies_returns_all_proxies(self):
+        irregular = {Proxy('::1', '80', 'us', 'us', True, 'http', None)}
+        self.store.update_store(self.id, self.proxies | irregular)
+
+        self.assertSetEqual(self.proxies | irregular, set(self.store.get_proxies()))
+
+    def test_get_proxy_matches_filter(self):
+        self.store.update_store(self.id, self.proxies)
+        expected = {p for p in self.proxies if p.code == 'us' and p.type == 'https'}
+
+        for _ in range(50):
+            self.assertIn(self.store.get_proxy({'code': {'us', }, 'type': {'https', }}), expected)
+
+        self.assertIsNone(self.store.get_proxy({'code': {'de', }}))
+
+    def test_update_store_matches_store(self):
+        store = Store()
+        store.update_store(store.add_store(), self.proxies)
+        self.store.update_store(self.id, self.proxies)
+
+        for filter_opts in [None, {'code': {'uk', 'ca'}}, {'anonymous': {True, }, 'type': {'http', }}]:
+            self.assertSetEqual(set(store.get_proxies(filter_opts)), set(self.store.get_proxies(filter_opts)))
+
+    def test_update_store_replaces_rows(self):
+        self.store.update_store(self.id, self.proxies)
+        self.store.update_store(self.id, None)
+
+        self.assertIsNone(self.store.get_proxy())
+        self.assertEqual((1, 0), self.count_rows())
+
+    def test_remove_proxies(self):
+        removed = {p for p in self.proxies if p.code == 'us'}
+        removed = set(list(removed)[:len(removed) // 2 + 1]) | {p for p in self.proxies if p.code == 'uk'}
+        self.store.update_store(self.id, self.proxies)
+        version = self.store.version
+
+        self.store.remove_proxies(self.id, removed)
+
+        self.assertEqual(version + 1, self.store.version)
+        self.assertSetEqual(self.proxies - removed, set(self.store.get_proxies()))
+        self.assertSetEqual(self.proxies - removed, set(self.store.get_store_proxies(self.id)))
+        self.assertEqual((1, len(self.proxies - removed)), self.count_rows())
+
+        for _ in range(50):
+            self.assertNotIn(self.store.get_proxy(), removed)
+
+    def test_remove_proxies_not_stored_does_nothing(self):
+        self.store.update_store(self.id, self.proxies)
+        version = self.store.version
+
+        self.store.remove_proxies(self.id, [Proxy('10.0.1.1', '80', 'us', 'us', True, 'http', 'source')])
+
+        self.assertEqual(version, self.store.version)
+
+    def test_readers_of_old_snapshot_see_no_removed_rows(self):
+        self.store.update_store(self.id, self.proxies)
+        partitions, _ = self.store._match(None)
+
+        self.store.update_store(self.id, None)
+
+        self.assertListEqual([None], list({partition[0] for partition in partitions}))
+
+    def test_reads_from_other_threads(self):
+        self.store.update_store(self.id, self.proxies)
+        results = []
+
+        thread = Thread(target=lambda: results.append(self.store.get_proxies()))
+        thread.start()
+        thread.join()
+
+        self.assertSetEqual(self.proxies, set(results[0]))
+
+    def test_connections_of_exited_threads_closed(self):
+        self.store.update_store(self.id, self.proxies)
+
+        for _ in range(20):
+            thread = Thread(target=self.store.get_proxies)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(1, len(self.store._connections))
+
+    def test_strategies(self):
+        self.store.update_store(self.id, self.proxies)
+
+        for strategy in (RoundRobinStrategy(), LeastRecentlyUsedStrategy(), WeightedStrategy()):
+            self.assertIn(strategy.get_proxy(self.store, {'code': {'us', }}), self.proxies)
+
+    def test_drops_existing_tables(self):
+        self.store.update_store(self.id, self.proxies)
+        store = SQLiteStore(self.store.path)
+
+        self.assertEqual((0, 0), self.count_rows())
+        store.close()
+
+    def test_close_removes_temporary_database(self):
+        self.store.close()
+
+        self.assertFalse(os.path.exists(self.store.path))
+
+    def test_collected_store_removes_temporary_database(self):
+        store = SQLiteStore()
+        store.update_store(store.add_store(), self.proxies)
+        path = store.path
+
+        del store
+        gc.collect()
+
+        self.assertFalse(os.path.exists(path))
+
+
+class TestStrategies(unittest.TestCase):
+    def setUp(self):
+        self.proxies = [Proxy('10.0.0.%d' % i, '80', ('us', 'uk')[i % 2], 'country', True, 'http', 'source')
+                        for i in range(6)]
+        self.store = Store()
+        self.id = self.store.add_store()
+        self.store.update_store(self.id, set(self.proxies))
+
+    def test_round_robin_returns_each_proxy_once_per_round(self):
+        strategy = RoundRobinStrategy()
+
+        first = [strategy.get_proxy(self.store) for _ in range(6)]
+        second = [strategy.get_proxy(self.store) for _ in range(6)]
+
+        self.assertSetEqual(set(self.proxies), set(first))
+        self.assertListEqual(first, second)
+
+    def test_round_robin_skips_blacklisted(self):
+        strategy = RoundRobinStrategy()
+        blacklist = {(p[0], p[1]) for p in self.proxies[:5]}
+
+        proxies = {strategy.get_proxy(self.store, blacklist=blacklist) for _ in range(3)}
+
+        self.assertSetEqual({self.proxies[5], }, proxies)
+        self.assertIsNone(strategy.get_proxy(self.store, blacklist={(p[0], p[1]) for p in self.proxies}))
+
+    def test_round_robin_filtered(self):
+        strategy = RoundRobinStrategy()
+        filter_opts = {'code': {'uk', }}
+
+        proxies = [strategy.get_proxy(self.store, filter_opts) for _ in range(6)]
+
+        self.assertSetEqual(set(self.proxies[1::2]), set(proxies))
+        self.assertListEqual(proxies[:3], proxies[3:])
+
+    def test_lru_returns_least_recently_used(self):
+        strategy = LeastRecentlyUsedStrategy()
+
+        first = [strategy.get_proxy(self.store) for _ in range(6)]
+        second = [strategy.get_proxy(self.store) for _ in range(6)]
+
+        self.assertSetEqual(set(self.proxies), set(first))
+        self.assertListEqual(first, second)
+
+    def test_lru_accounts_for_other_filters(self):
+        strategy = LeastRecentlyUsedStrategy()
+        strategy.get_proxy(self.store)
+
+        uk_proxies = [strategy.get_proxy(self.store, {'code': {'uk', }}) for _ in range(3)]
+        proxies = [strategy.get_proxy(self.store) for _ in range(6)]
+
+        self.assertListEqual(uk_proxies, [p for p in proxies if p.code == 'uk'][-3:])
+        self.assertSetEqual(set(self.proxies), set(proxies))
+
+    def test_lru_skips_blacklisted_without_using_them(self):
+        strategy = LeastRecentlyUsedStrategy()
+        blacklist = {(p[0], p[1]) for p in self.proxies[:5]}
+
+        self.assertEqual(self.proxies[5], strategy.get_proxy(self.store, blacklist=blacklist))
+
+        proxies = [strategy.get_proxy(self.store) for _ in range(6)]
+        self.assertSetEqual(set(self.proxies[:5]), set(proxies[:5]))
+        self.assertEqual(self.proxies[5], proxies[5])
+
+    def test_lru_keeps_last_use_across_refreshes(self):
+        strategy = LeastRecentlyUsedStrategy()
+        used = [strategy.get_proxy(self.store) for _ in range(6)]
+        new_proxy = Proxy('10.0.0.99', '80', 'us', 'country', True, 'http', 'source')
+
+        self.store.update_store(self.id, set(self.proxies[:3]) | {new_proxy, })
+        proxies = [strategy.get_proxy(self.store) for _ in range(4)]
+
+        self.assertEqual(new_proxy, proxies[0])
+        self.assertListEqual([p for p in used if p in self.proxies[:3]], proxies[1:])
+
+
+class TestFenwickTree(unittest.TestCase):
+    def test_find_returns_index_of_cumulative_weight(self):
+        tree = stores._FenwickTree([1, 0.5, 2, 0.5, 1])
+
+        self.assertListEqual([0, 0, 1, 2, 2, 3, 4, 4],
+                             [tree.find(value) for value in (0, 0.9, 1.2, 1.5, 3.4, 3.6, 4.0, 4.9)])
+        self.assertEqual(5, tree.total)
+
+    def test_add_updates_weights(self):
+        tree = stores._FenwickTree([1] * 7)
+        tree.add(3, 9)
+        tree.add(0, -1)
+
+        self.assertEqual(15, tree.total)
+        self.assertEqual(1, tree.find(0))
+        self.assertEqual(3, tree.find(2.5))
+        self.assertEqual(3, tree.find(11.9))
+        self.assertEqual(4, tree.find(12))
+
+
+class TestHealthScores(unittest.TestCase):
+    def setUp(self):
+        self.proxy = Proxy('10.0.0.1', '80', 'us', 'united states', True, 'http', 'source')
+        self.address = ('10.0.0.1', '80')
+
+    def test_unreported_proxies_are_healthy(self):
+        self.assertEqual(1, HealthScores().weight(self.address))
+
+    def test_failures_lower_weight_to_minimum(self):
+        scores = HealthScores(alpha=0.5)
+
+        scores.report_failure(self.proxy)
+        self.assertAlmostEqual(0.5, scores.weight(self.address))
+
+        for _ in range(20):
+            scores.report_failure(self.proxy)
+        self.assertAlmostEqual(stores._MIN_HEALTH_WEIGHT, scores.weight(self.address))
+
+        scores.report_success(self.proxy)
+        self.assertGreater(scores.weight(self.address), 0.4)
+
+    def test_latency_lowers_weight(self):
+        scores = HealthScores(alpha=0.5)
+
+        scores.report_success(self.proxy, 1)
+        self.assertAlmostEqual(0.5, scores.weight(self.address))
+
+        scores.report_success(self.proxy, 3)
+        self.assertAlmostEqual(1 / 3.0, scores.weight(self.address))
+
+    def test_listeners_called_with_new_weight(self):
+        scores = HealthScores(alpha=0.5)
+        calls = []
+        scores.add_listener(lambda address, weight: calls.append((address, weight)))
+
+        scores.report_failure(self.proxy)
+
+        self.assertListEqual([(self.address, 0.5)], calls)
+
+
+class TestWeightedStrategy(unittest.TestCase):
+    def setUp(self):
+        self.proxies = [Proxy('10.0.0.%d' % i, '80', ('us', 'uk')[i % 2], 'country', True, 'http', 'source')
+                        for i in range(4)]
+        self.store = Store()
+        self.id = self.store.add_store()
+        self.store.update_store(self.id, set(self.proxies))
+
+    def draw(self, strategy, filter_opts=None, blacklist=None, count=2000):
+        counts = dict.fromkeys(self.proxies, 0)
+        for _ in range(count):
+            counts[strategy.get_proxy(self.store, filter_opts, blacklist)] += 1
+        return counts
+
+    def test_draws_in_proportion_to_health(self):
+        strategy = WeightedStrategy()
+        strategy.get_proxy(self.store)
+
+        for _ in range(20):
+            strategy.scores.report_failure(self.proxies[0])
+        strategy.scores.report_success(self.proxies[1], 1)
+
+        counts = self.draw(strategy, count=4000)
+
+        self.assertLess(counts[self.proxies[0]], 40)
+        self.assertTrue(600 < counts[self.proxies[1]] < 1000)
+        self.assertTrue(1250 < counts[self.proxies[2]] < 1850)
+
+    def test_scores_survive_refresh(self):
+        strategy = WeightedStrategy()
+        for _ in range(20):
+            strategy.scores.report_failure(self.proxies[0])
+
+        self.store.update_store(self.id, set(self.proxies[:2]))
+        counts = self.draw(strategy)
+
+        self.assertLess(counts[self.proxies[0]], 40)
+        self.assertEqual(0, counts[self.proxies[2]])
+
+    def test_filtered_and_blacklisted(self):
+        strategy = WeightedStrategy()
+
+        counts = self.draw(strategy, {'code': {'us', }}, {('10.0.0.0', '80'), }, count=50)
+
+        self.assertEqual(50, counts[self.proxies[2]])
+        self.assertIsNone(strategy.get_proxy(self.store, {'code': {'us', }},
+                                             {('10.0.0.0', '80'), ('10.0.0.2', '80')}))
+
+
+class TestConsistentHashing(unittest.TestCase):
+    def setUp(self):
+        self.proxies = [Proxy('10.0.%d.%d' % (i // 256, i % 256), '80', ('us', 'uk')[i % 2], 'country', True, 'http',
+                              'source')
+                        for i in range(100)]
+        self.store = Store()
+        self.id = self.store.add_store()
+        self.store.update_store(self.id, set(self.proxies))
+        self.keys = ['session-%d' % i for i in range(2000)]
+
+    def assign(self, hashing, filter_opts=None, blacklist=None):
+        return {key: hashing.get_proxy(self.store, key, filter_opts, blacklist) for key in self.keys}
+
+    def test_same_key_same_proxy(self):
+        hashing = ConsistentHashing()
+
+        self.assertDictEqual(self.assign(hashing), self.assign(hashing))
+        self.assertDictEqual(self.assign(hashing), self.assign(ConsistentHashing()))
+
+    def test_keys_spread_over_proxies(self):
+        assigned = self.assign(ConsistentHashing())
+        counts = [list(assigned.values()).count(proxy) for proxy in self.proxies]
+
+        self.assertGreater(len([c for c in counts if c]), 90)
+        self.assertLess(max(counts), 80)
+
+    def test_removing_proxies_only_reassigns_their_keys(self):
+        hashing = ConsistentHashing()
+        before = self.assign(hashing)
+
+        self.store.update_store(self.id, set(self.proxies[5:]))
+        after = self.assign(hashing)
+
+        changed = {key for key in self.keys if before[key] != after[key]}
+        self.assertSetEqual({key for key in self.keys if before[key] in self.proxies[:5]}, changed)
+
+    def test_adding_proxies_only_assigns_keys_to_them(self):
+        hashing = ConsistentHashing()
+        self.store.update_store(self.id, set(self.proxies[5:]))
+        before = self.assign(hashing)
+
+        self.store.update_store(self.id, set(self.proxies))
+        after = self.assign(hashing)
+
+        changed = {key for key in self.keys if before[key] != after[key]}
+        self.assertTrue(changed)
+        self.assertTrue(all(after[key] in self.proxies[:5] for key in changed))
+
+    def test_filtered(self):
+        assigned = self.assign(ConsistentHashing(), {'code': {'uk', }})
+
+        self.assertTrue(all(proxy.code == 'uk' for proxy in assigned.values()))
+
+    def test_blacklisted_proxy_moves_key_to_next_proxy(self):
+        hashing = ConsistentHashing()
+        before = self.assign(hashing)
+        blacklisted = before[self.keys[0]]
+
+        after = self.assign(hashing, blacklist={(blacklisted[0], blacklisted[1]), })
+
+        self.assertNotEqual(blacklisted, after[self.keys[0]])
+        self.assertTrue(all(before[key] == after[key] for key in self.keys if before[key] != blacklisted))
+
+    def test_returns_none_if_none_match(self):
+        hashing = ConsistentHashing()
+
+        self.assertIsNone(hashing.get_proxy(self.store, 'key', {'code': {'ca', }}))
+        self.assertIsNone(hashing.get_proxy(self.store, 'key', blacklist={(p[0], p[1]) for p in self.proxies}))
+
+
+@unittest.skipUnless(stores.numpy, 'NumPy is not installed')
+class TestColumnarKernels(unittest.TestCase):
+    def setUp(self):
+        self.proxies = {Proxy('10.%d.%d.%d' % (i % 5, i % 7, i % 11), str(i), code, code, i % 3 == 0, type, 'source')
+                        for i in range(500)
+                        for code, type in [(('us', 'uk', 'ca')[i % 3], ('http', 'https', 'socks5')[i % 4 % 3])]}
+        self.proxies.add(Proxy('proxy.example.com', '80', 'us', 'us', True, 'http', 'source'))
+        self.filters = [None, {'code': {'us', }}, {'code': {'uk', 'ca'}, 'type': {'https', }},
+                        {'anonymous': {True, }, 'type': {'http', 'socks5'}, 'country': {'us', 'uk'}}]
+
+    def results(self):
+        store = ColumnarStore()
+        id = store.add_store()
+        store.update_store(id, self.proxies)
+
+        results = [set(store.get_proxies(filter_opts) or ()) for filter_opts in self.filters]
+        store.remove_proxies(id, [p for p in self.proxies if p.anonymous or p.port == '80'][::2])
+        results.extend(set(store.get_proxies(filter_opts) or ()) for filter_opts in self.filters)
+        return results
+
+    def test_numpy_matches_fallback(self):
+        expected = self.results()
+
+        with patch.object(stores, 'numpy', None):
+            actual = self.results()
+
+        self.assertListEqual(expected, actual)
+
+    def test_masks_match_fallback(self):
+        column = stores.array('B', [i % 5 for i in range(1000)])
+        other = stores.array('B', [i % 3 for i in range(1000)])
+
+        mask = stores._and_masks(stores._isin_mask(column, {1, 3}, 5), stores._isin_mask(other, {2}, 3))
+        expected = list(stores._mask_indexes(mask))
+
+        with patch.object(stores, 'numpy', None):
+            mask = stores._and_masks(stores._isin_mask(column, {1, 3}, 5), stores._isin_mask(other, {2}, 3))
+            actual = list(stores._mask_indexes(mask))
+
+        self.assertListEqual(expected, actual)
+        self.assertListEqual([i for i in range(1000) if i % 5 in (1, 3) and i % 3 == 2], actual)
+
+
 if __name__ == '__main__':
     unittest.main()
     cwd = os.getcwd()